@@ -0,0 +1,88 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Allow-list build and lookup cost at 100k rules.
+
+Compares :class:`AllowList` (hash set + segment trie) with a linear scan of a
+sorted list, i.e. what ``link.href in metadata.allowed_paths`` costs when the
+allow-list is handed to templates as a list::
+
+    python benchmarks/bench_allowlist.py [--rules 100000] [--lookups 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+from open_llms_txt.middleware.allowlist import AllowList
+
+
+def make_rules(n: int) -> List[str]:
+    """A third exact paths, a third prefixes and a third globs over 500 sections."""
+    rules = []
+    for i in range(n):
+        section = f"/s{i % 500}"
+        kind = i % 3
+        if kind == 0:
+            rules.append(f"{section}/page{i}")
+        elif kind == 1:
+            rules.append(f"{section}/p{i}/**")
+        else:
+            rules.append(f"{section}/g{i}/*.md")
+    return rules
+
+
+def make_paths(n: int, lookups: int) -> List[str]:
+    rng = random.Random(0)
+    paths = []
+    for _ in range(lookups):
+        kind = rng.randrange(4)
+        i = rng.randrange(n // 3) * 3 + min(kind, 2)
+        section = f"/s{i % 500}"
+        if kind == 0:
+            paths.append(f"{section}/page{i}")
+        elif kind == 1:
+            paths.append(f"{section}/p{i}/deep/page")
+        elif kind == 2:
+            paths.append(f"{section}/g{i}/notes.md")
+        else:
+            paths.append(f"{section}/missing{i}")  # a miss
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rules = make_rules(args.rules)
+    paths = make_paths(args.rules, args.lookups)
+
+    started = time.perf_counter()
+    allowed = AllowList(rules)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hits = sum(path in allowed for path in paths)
+    lookup = time.perf_counter() - started
+
+    # Baseline: exact rules only, scanned like a template list (1% of lookups)
+    listed = sorted(r for r in rules if "*" not in r)
+    sample = paths[: max(1, len(paths) // 100)]
+    started = time.perf_counter()
+    sum(path in listed for path in sample)
+    linear = (time.perf_counter() - started) / len(sample)
+
+    print(f"rules:          {len(rules):>10,}")
+    print(f"build:          {build * 1e3:>10.1f} ms")
+    print(f"lookup:         {lookup / len(paths) * 1e6:>10.2f} us/path ({hits} hits)")
+    print(f"list scan:      {linear * 1e6:>10.2f} us/path (exact rules only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Memory and speed of crawler visited sets at 1M URLs.
+
+Compares a plain ``set`` of URL strings with :class:`FingerprintSet` (64-bit
+fingerprints in an array) and :class:`BloomFilter` (0.1% false positives).
+Memory is the traced allocation growth while the set is filled, so the URL
+strings themselves only count for the ``set`` (the other two don't keep them)::
+
+    python benchmarks/bench_visited.py [--urls 1000000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from open_llms_txt.scrapers.visited import BloomFilter, FingerprintSet
+
+
+def urls(n: int) -> Iterator[str]:
+    for i in range(n):
+        yield f"https://example.com/section-{i % 1000}/page-{i}?lang=en"
+
+
+def measure(name: str, factory: Callable, n: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    visited = factory()
+    for url in urls(n):
+        visited.add(url)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    hits = sum(url in visited for url in urls(n // 10))
+    lookup = (time.perf_counter() - started) / (n // 10)
+
+    print(
+        f"{name:<16} {current / 2**20:>8.1f} MiB {current / n:>7.1f} B/url "
+        f"{elapsed / n * 1e6:>6.2f} us/add {lookup * 1e6:>6.2f} us/lookup "
+        f"({hits} hits)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.urls
+
+    print(f"{n:,} URLs")
+    measure("set[str]", set, n)
+    measure("FingerprintSet", lambda: FingerprintSet(capacity=n), n)
+    measure("BloomFilter", lambda: BloomFilter(n, error_rate=0.001), n)
+
+
+if __name__ == "__main__":
+    main()
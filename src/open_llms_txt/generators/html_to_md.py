@@ -1,14 +1,17 @@
 # Copyright (c) 2025 Ricardo Espantaleón Pérez
 # SPDX-License-Identifier: Apache-2.0
 
+import logging
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from jinja2 import Environment, FileSystemLoader
 
 from open_llms_txt.generators.template_engine import TemplateEngine
 from open_llms_txt.parsers.html import parse_html_to_json
 
+logger = logging.getLogger(__name__)
+
 
 class HtmlToMdGenerator:
     def __init__(
@@ -30,7 +33,12 @@ class HtmlToMdGenerator:
         self.template = self.env.get_template(template_name)
         self.engine: TemplateEngine = engine
 
-    def render(self, html: str, **metadata) -> str:
-        context = parse_html_to_json(html, **metadata)
-        print(context)
+    def parse(self, html: str, **metadata) -> Dict[str, Any]:
+        return parse_html_to_json(html, **metadata)
+
+    def render_context(self, context: Dict[str, Any]) -> str:
+        logger.debug("Rendering context: %s", context)
         return self.template.render(engine=self.engine, **context)
+
+    def render(self, html: str, **metadata) -> str:
+        return self.render_context(self.parse(html, **metadata))
@@ -0,0 +1,151 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, Iterator, List, Pattern, Set
+
+_GLOB_CHARS = frozenset("*?[")
+# Werkzeug rule converters: <name>, <int:id>, <string(length=2):code>, <path:rest>
+_CONVERTER = re.compile(r"<(?:(\w+)(?:\([^)]*\))?:)?\w+>")
+
+
+def _is_glob(segment: str) -> bool:
+    return any(c in _GLOB_CHARS for c in segment)
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """``*``/``?``/``[...]`` stay within one path segment; ``**`` spans segments."""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def rule_to_glob(rule: str) -> str:
+    """Glob matching the URLs of a Werkzeug rule (``/blog/<slug>`` -> ``/blog/*``)."""
+    return _CONVERTER.sub(lambda m: "**" if m.group(1) == "path" else "*", rule)
+
+
+class _Node:
+    __slots__ = ("children", "subtree", "globs", "_regex")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        # Everything strictly below this node is allowed ("/docs/**")
+        self.subtree = False
+        # Glob tails relative to this node ("*/spec" under "/api")
+        self.globs: List[str] = []
+        self._regex: Pattern[str] | None = None
+
+    def match_tail(self, tail: str) -> bool:
+        if self._regex is None:
+            self._regex = re.compile(
+                "|".join(f"(?:{_glob_to_regex(g)})" for g in self.globs)
+            )
+        return self._regex.fullmatch(tail) is not None
+
+
+class AllowList:
+    """
+    Set of allowed paths built from exact, prefix and glob rules.
+
+    - ``/docs`` allows exactly that path (hash lookup).
+    - ``/docs/**`` allows every path below ``/docs`` (segment trie walk).
+    - Any other rule with ``*``, ``?`` or ``[...]`` is a glob, e.g.
+      ``/api/*/spec``; ``*`` never crosses a ``/`` while ``**`` does.
+
+    Prefix and glob rules live in a trie keyed by their literal leading
+    segments, so a lookup costs O(path segments) plus the globs anchored along
+    that path, not O(rules). Instances are callable and support ``in``, so
+    templates can test ``link.href in metadata.allowed_paths``; iterating yields
+    the exact rules in sorted order (the paths worth listing in a manifest).
+    """
+
+    def __init__(self, rules: Iterable[str] = ()) -> None:
+        self._exact: Set[str] = set()
+        self._root = _Node()
+        self._sorted: List[str] | None = None
+        self.update(rules)
+
+    def add(self, rule: str) -> None:
+        """Add one rule (see the class docstring for its syntax)."""
+        segments = rule.lstrip("/").split("/")
+        if not any(_is_glob(s) for s in segments):
+            self._exact.add(rule)
+            self._sorted = None
+            return
+        node = self._root
+        for i, segment in enumerate(segments):
+            if segment == "**" and i == len(segments) - 1:
+                node.subtree = True
+                return
+            if _is_glob(segment):
+                node.globs.append("/".join(segments[i:]))
+                node._regex = None
+                return
+            node = node.children.setdefault(segment, _Node())
+
+    def update(self, rules: Iterable[str]) -> None:
+        for rule in rules:
+            self.add(rule)
+
+    def clear(self) -> None:
+        self._exact.clear()
+        self._root = _Node()
+        self._sorted = None
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, str):
+            return False
+        if path in self._exact:
+            return True
+        segments = path.lstrip("/").split("/")
+        node = self._root
+        for i, segment in enumerate(segments):
+            if node.globs and node.match_tail("/".join(segments[i:])):
+                return True
+            child = node.children.get(segment)
+            if child is None:
+                return False
+            node = child
+            if node.subtree and i < len(segments) - 1:
+                return True
+        return False
+
+    def __call__(self, path: str) -> bool:
+        return path in self
+
+    def __iter__(self) -> Iterator[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self._exact)
+        return iter(self._sorted)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def __repr__(self) -> str:
+        return f"AllowList({list(self)!r})"
@@ -0,0 +1,578 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+import re
+import threading
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Pattern,
+    Tuple,
+)
+from urllib.parse import urljoin
+
+from open_llms_txt.middleware.allowlist import AllowList
+from open_llms_txt.middleware.cache import (
+    CacheBackend,
+    CacheEntry,
+    CacheKey,
+    GeneratorCache,
+    RenderCache,
+)
+from open_llms_txt.middleware.compression import select_encoding
+from open_llms_txt.middleware.limiter import RenderLimiter
+from open_llms_txt.utils import content_hash
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+# (status, markdown body, extra headers) for responses that are not cached
+_Failure = Tuple[int, str, List[Tuple[bytes, bytes]]]
+
+# Attributes set on endpoint functions by the decorators below
+_MIRROR_ATTR = "__llms_html2md__"
+_MANIFEST_ATTR = "__llms_llmstxt__"
+
+# Request headers not forwarded to the downstream HTML render: the middleware
+# needs an uncompressed, complete, unconditional HTML body
+_DROPPED_HEADERS = {
+    b"accept",
+    b"accept-encoding",
+    b"if-modified-since",
+    b"if-none-match",
+    b"range",
+}
+
+# Starlette path parameters: {slug}, {id:int}, {rest:path}
+_PARAM = re.compile(r"{\w+(?::(\w+))?}")
+
+
+def _route_regex(route: Any, path: str) -> Pattern[str]:
+    """
+    Regex matching the concrete URLs of a parameterized route: Starlette's own
+    compiled ``path_regex`` when the route has one (it honours convertors),
+    else ``{name}`` matches one segment and ``{name:path}`` the rest.
+    """
+    regex = getattr(route, "path_regex", None)
+    if isinstance(regex, re.Pattern):
+        return regex
+    parts: List[str] = []
+    end = 0
+    for m in _PARAM.finditer(path):
+        parts.append(re.escape(path[end : m.start()]))
+        parts.append(".+" if m.group(1) == "path" else "[^/]+")
+        end = m.end()
+    parts.append(re.escape(path[end:]))
+    return re.compile(f"^{''.join(parts)}$")
+
+
+def _route_glob(path: str) -> str:
+    """Allow-list glob of a parameterized route (``/blog/{slug}`` -> ``/blog/*``)."""
+    return _PARAM.sub(lambda m: "**" if m.group(1) == "path" else "*", path)
+
+
+def html2md(
+    *, allow_param_routes: bool = False, cache_ttl: float | None = None
+) -> Callable[[Callable], Callable]:
+    """
+    Mark a FastAPI/Starlette endpoint as eligible for a Markdown mirror.
+
+    The endpoint is returned unchanged (so framework signature introspection
+    keeps working). :class:`LlmsTxtMiddleware` discovers marked endpoints from
+    the application's route table.
+
+    Parameters
+    ----------
+    allow_param_routes : bool, optional
+        If ``False`` (default), routes with path parameters (``{...}``) are not
+        mirrored. If ``True``, every concrete URL the route matches is, e.g.
+        ``/blog/hello.html.md`` for ``/blog/{slug}``.
+    cache_ttl : float | None, optional
+        Seconds a rendered mirror is served from cache without calling the
+        downstream app. ``None`` (default) revalidates by the HTML hash.
+
+    Examples
+    --------
+    ::
+
+        @app.get("/pricing", response_class=HTMLResponse)
+        @html2md()
+        async def pricing():
+            return render("pricing.html")
+        # -> /pricing.html.md (Markdown)
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(
+            endpoint,
+            _MIRROR_ATTR,
+            {"allow_param_routes": allow_param_routes, "cache_ttl": cache_ttl},
+        )
+        return endpoint
+
+    return decorator
+
+
+def llmstxt() -> Callable[[Callable], Callable]:
+    """Mark the endpoint whose HTML the ``llms.txt`` manifest is rendered from."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, _MANIFEST_ATTR, True)
+        return endpoint
+
+    return decorator
+
+
+def _find_routes(app: Any) -> List[Any] | None:
+    """Locate the route table, following the ``.app`` chain of wrapped middleware."""
+    for _ in range(32):
+        if app is None:
+            return None
+        routes = getattr(app, "routes", None)
+        if routes is not None:
+            return routes
+        app = getattr(app, "app", None)
+    return None
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers", ()):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _charset(content_type: str | None) -> str:
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+class LlmsTxtMiddleware:
+    """
+    Pure ASGI middleware serving Markdown mirrors (``<route>.html.md``) and an
+    ``llms.txt`` manifest for FastAPI, Starlette or any ASGI application.
+
+    The HTML is produced by calling the wrapped application in-process with a
+    rewritten scope and capturing its response messages asynchronously.
+    Parsing, templating and compression run in ``executor``, so the event loop
+    never blocks on CPU-bound work. Renders are cached in a
+    :class:`~open_llms_txt.middleware.cache.RenderCache`, or in any
+    ``CacheBackend`` such as the cross-process
+    :class:`~open_llms_txt.middleware.sqlite_cache.SqliteRenderCache`.
+    Concurrent misses for the same key share one render.
+
+    Mirrored routes come from endpoints decorated with :func:`html2md` (found
+    on the app's route table) plus any explicit ``paths``. The manifest source
+    is the endpoint decorated with :func:`llmstxt`, or ``manifest_source``.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        The wrapped application.
+    template_dir : str | None, optional
+        Directory holding the Jinja templates. ``None`` uses the packaged ones.
+    template_name : str, optional
+        Template used for mirrors. Defaults to ``"html_to_md.jinja"``.
+    manifest_template_name : str, optional
+        Template used for the manifest. Defaults to ``"llms.txt.jinja"``.
+    mount_prefix : str, optional
+        URL prefix of the mirrors, e.g. ``"/.llms"``. Defaults to ``""``.
+    manifest_path : str, optional
+        Path serving the manifest. Defaults to ``"/llms.txt"``.
+    paths : Iterable[str], optional
+        Extra concrete paths to mirror, for ASGI apps without a route table.
+    manifest_source : str | None, optional
+        Path of the page the manifest is rendered from when no endpoint is
+        decorated with :func:`llmstxt`.
+    cache_ttl : float | None, optional
+        Freshness for ``paths`` and the manifest (see :func:`html2md`).
+    cache : CacheBackend | None, optional
+        Render cache; a private in-process ``RenderCache`` by default.
+    executor : concurrent.futures.Executor | None, optional
+        Runs parse/render/compression. Defaults to a 4-thread pool, which also
+        caps concurrent renders.
+    limiter : RenderLimiter | None, optional
+        Concurrency cap for renders (downstream call included); shed requests
+        get a ``503``. Waiting for a slot happens off the event loop.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        template_dir: str | None = None,
+        template_name: str = "html_to_md.jinja",
+        manifest_template_name: str = "llms.txt.jinja",
+        mount_prefix: str = "",
+        manifest_path: str = "/llms.txt",
+        paths: Iterable[str] = (),
+        manifest_source: str | None = None,
+        cache_ttl: float | None = None,
+        cache: CacheBackend | None = None,
+        executor: Executor | None = None,
+        limiter: RenderLimiter | None = None,
+    ):
+        if not template_name or not manifest_template_name:
+            raise ValueError("template_name is required")
+        if not manifest_path.startswith("/"):
+            raise ValueError("manifest_path must start with '/'")
+        self.app = app
+        self.template_dir = template_dir
+        self.template_name = template_name
+        self.manifest_template_name = manifest_template_name
+        self.mount_prefix = (mount_prefix or "").rstrip("/")
+        self.manifest_path = manifest_path
+        self.paths = list(paths)
+        self.manifest_source = manifest_source
+        self.cache_ttl = cache_ttl
+        self.cache: CacheBackend = cache if cache is not None else RenderCache()
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="llms-render"
+        )
+        self.limiter = limiter
+        self._generators = GeneratorCache()
+
+        # Allow-list built from the route table, keyed by its signature: static
+        # paths are a dict lookup, parameterized routes a regex each
+        self._allowed: Dict[str, float | None] = {}
+        self._param_routes: List[Tuple[Pattern[str], float | None]] = []
+        self._allowlist = AllowList()
+        self._allowlist_digest = ""
+        self._source: str | None = None
+        self._signature: Tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        # In-flight renders per (cache key, limiter client class), on one loop
+        self._inflight: Dict[Tuple[CacheKey, str | None], asyncio.Future] = {}
+
+    def _refresh_allowed_paths(self) -> None:
+        routes = _find_routes(self.app) or []
+        signature = (id(routes), len(routes))
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            allowed: Dict[str, float | None] = {p: self.cache_ttl for p in self.paths}
+            param_routes: List[Tuple[Pattern[str], float | None]] = []
+            globs: List[str] = []
+            source = self.manifest_source
+            for route in routes:
+                path = getattr(route, "path", None)
+                endpoint = getattr(route, "endpoint", None)
+                if not isinstance(path, str) or endpoint is None:
+                    continue
+                policy = getattr(endpoint, _MIRROR_ATTR, None)
+                if policy is not None and "{" not in path:
+                    allowed[path] = policy["cache_ttl"]
+                elif policy is not None and policy["allow_param_routes"]:
+                    param_routes.append(
+                        (_route_regex(route, path), policy["cache_ttl"])
+                    )
+                    globs.append(_route_glob(path))
+                if source is None and getattr(endpoint, _MANIFEST_ATTR, False):
+                    if "{" not in path:
+                        source = path
+            allowlist = AllowList(allowed)
+            allowlist.update(globs)
+            self._allowed = allowed
+            self._param_routes = param_routes
+            self._allowlist = allowlist
+            self._allowlist_digest = content_hash(*sorted(allowed), *sorted(globs))
+            self._source = source
+            self._signature = signature
+
+    def _match(self, target: str) -> Tuple[bool, float | None]:
+        """Whether ``target`` may be mirrored, and its ``cache_ttl``."""
+        if target in self._allowed:
+            return True, self._allowed[target]
+        for regex, ttl in self._param_routes:
+            if regex.match(target):
+                return True, ttl
+        return False, None
+
+    def _mirror_target(self, path: str) -> str | None:
+        prefix = self.mount_prefix
+        if not path.endswith(".html.md") or not path.startswith(prefix + "/"):
+            return None
+        raw = path[len(prefix) + 1 : -len(".html.md")]
+        return f"/{raw}" if raw else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        target = self._mirror_target(path)
+        if path != self.manifest_path and target is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._refresh_allowed_paths()
+        if path == self.manifest_path:
+            if self._source is None:
+                await self.app(scope, receive, send)
+                return
+            await self._serve(
+                scope,
+                send,
+                source_path=self._source,
+                cache_path=self.manifest_path,
+                template_name=self.manifest_template_name,
+                ttl=self.cache_ttl,
+                error_message=f"Failed to render `{self._source}` for manifest.",
+            )
+            return
+
+        allowed, ttl = self._match(target) if target is not None else (False, None)
+        if target is None or not allowed:
+            await self._send(
+                scope,
+                send,
+                404,
+                b"# 404\nMarkdown mirror not enabled for this path.\n",
+            )
+            return
+        await self._serve(
+            scope,
+            send,
+            source_path=target,
+            cache_path=target,
+            template_name=self.template_name,
+            ttl=ttl,
+            error_message=f"Failed to render `{target}`.",
+        )
+
+    async def _serve(
+        self,
+        scope: Scope,
+        send: Send,
+        *,
+        source_path: str,
+        cache_path: str,
+        template_name: str,
+        ttl: float | None,
+        error_message: str,
+    ) -> None:
+        base = f"{scope.get('scheme', 'http')}://{self._host(scope)}"
+        key = (base, cache_path, f"{self.template_dir or ''}:{template_name}")
+        digest = self._generators.get(self.template_dir, template_name)[1]
+        deps = f"{self._allowlist_digest}:{digest}"
+
+        entry = self.cache.get(key)
+        if entry is None or entry.deps != deps or not entry.is_fresh(ttl):
+            # Shared per client class: the limiter's verdict holds for the class
+            client_class = self._client_class(scope)
+            flight = (key, client_class)
+            leader = self._inflight.get(flight)
+            if leader is None:
+                leader = asyncio.ensure_future(
+                    self._limited_render(
+                        client_class,
+                        scope,
+                        key,
+                        entry,
+                        deps,
+                        source_path,
+                        template_name,
+                        base,
+                        error_message,
+                    )
+                )
+                self._inflight[flight] = leader
+                leader.add_done_callback(lambda _: self._inflight.pop(flight, None))
+            result = await asyncio.shield(leader)
+            if not isinstance(result, CacheEntry):
+                status, body, headers = result
+                await self._send(
+                    scope, send, status, body.encode("utf-8"), headers=headers
+                )
+                return
+            entry = result
+
+        encoding = select_encoding(_header(scope, b"accept-encoding"), entry.variants)
+        await self._send(
+            scope,
+            send,
+            200,
+            entry.variants[encoding] if encoding else entry.body,
+            encoding=encoding,
+        )
+
+    def _client_class(self, scope: Scope) -> str | None:
+        if self.limiter is None:
+            return None
+        client = scope.get("client")
+        return self.limiter.classify(
+            _header(scope, b"user-agent"), client[0] if client else None
+        )
+
+    async def _limited_render(
+        self, client_class: str | None, scope: Scope, *args: Any
+    ) -> CacheEntry | _Failure:
+        limiter = self.limiter
+        if limiter is None or client_class is None:
+            return await self._render(scope, *args)
+        # RenderLimiter waits on a threading.Condition: keep it off the loop
+        if not await asyncio.to_thread(limiter.acquire, client_class):
+            return (
+                503,
+                "# 503\nMarkdown rendering is over capacity, retry later.\n",
+                [(b"retry-after", str(limiter.retry_after).encode("latin-1"))],
+            )
+        try:
+            return await self._render(scope, *args)
+        finally:
+            limiter.release(client_class)
+
+    async def _render(
+        self,
+        scope: Scope,
+        key: CacheKey,
+        entry: CacheEntry | None,
+        deps: str,
+        source_path: str,
+        template_name: str,
+        base: str,
+        error_message: str,
+    ) -> CacheEntry | _Failure:
+        status, html = await self._fetch_html(scope, source_path)
+        if status >= 400:
+            return status, f"# {status}\n{error_message}\n", []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            self._build_entry,
+            key,
+            entry,
+            html,
+            deps,
+            source_path,
+            template_name,
+            base,
+        )
+
+    def _build_entry(
+        self,
+        key: CacheKey,
+        entry: CacheEntry | None,
+        html: str,
+        deps: str,
+        source_path: str,
+        template_name: str,
+        base: str,
+    ) -> CacheEntry:
+        """Hash, parse, render and compress (runs in the executor)."""
+        source_hash = content_hash(html, deps)
+        if entry is not None and entry.source_hash == source_hash:
+            return self.cache.touch(key, entry)
+        generator, _ = self._generators.get(self.template_dir, template_name)
+        markdown = generator.render(
+            html,
+            root_url=base,
+            source_url=urljoin(base, source_path),
+            allowed_paths=self._allowlist,
+            mount_prefix=self.mount_prefix,
+        )
+        entry = CacheEntry.build(markdown, source_hash, deps=deps)
+        self.cache.set(key, entry)
+        return entry
+
+    async def _fetch_html(self, scope: Scope, path: str) -> Tuple[int, str]:
+        """Call the wrapped app for ``path`` and capture its response body."""
+        headers = [
+            (k, v)
+            for k, v in scope.get("headers", ())
+            if k.lower() not in _DROPPED_HEADERS
+        ]
+        headers.append((b"accept", b"text/html"))
+        sub_scope = dict(
+            scope,
+            method="GET",
+            path=path,
+            raw_path=path.encode("utf-8"),
+            query_string=b"",
+            headers=headers,
+        )
+        status = 500
+        content_type: str | None = None
+        chunks: List[bytes] = []
+        finished = asyncio.Event()
+        request_sent = False
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def capture(message: Message) -> None:
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for k, v in message.get("headers", ()):
+                    if k.lower() == b"content-type":
+                        content_type = v.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        try:
+            await self.app(sub_scope, receive, capture)
+        finally:
+            finished.set()
+        return status, b"".join(chunks).decode(_charset(content_type), "replace")
+
+    @staticmethod
+    def _host(scope: Scope) -> str:
+        host = _header(scope, b"host")
+        if host:
+            return host
+        server = scope.get("server")
+        return f"{server[0]}:{server[1]}" if server else "localhost"
+
+    @staticmethod
+    async def _send(
+        scope: Scope,
+        send: Send,
+        status: int,
+        body: bytes,
+        *,
+        encoding: str | None = None,
+        headers: List[Tuple[bytes, bytes]] | None = None,
+    ) -> None:
+        headers = [
+            (b"content-type", b"text/markdown; charset=utf-8"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *(headers or []),
+        ]
+        if status == 200:
+            headers.append((b"vary", b"Accept-Encoding"))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b"" if scope["method"] == "HEAD" else body,
+            }
+        )
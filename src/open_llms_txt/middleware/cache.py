@@ -0,0 +1,165 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from open_llms_txt.generators.html_to_md import HtmlToMdGenerator
+from open_llms_txt.middleware.compression import compress_variants
+from open_llms_txt.utils import content_hash
+
+# (root_url, path, template key): one rendered mirror or manifest
+CacheKey = Tuple[str, str, str]
+
+
+@dataclass
+class CacheEntry:
+    """
+    A rendered Markdown body plus its pre-compressed variants.
+
+    ``source_hash`` identifies the content version (upstream HTML + render
+    inputs); variants are computed once per version when the entry is built.
+    ``deps`` is the digest of the render inputs alone (allow-list, template), so
+    a changed dependency invalidates the entry even while it is fresh.
+    ``created_at`` is wall-clock time so ages stay comparable when entries are
+    shared between processes (see ``sqlite_cache.SqliteRenderCache``).
+    """
+
+    body: bytes
+    source_hash: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    deps: str = ""
+
+    @classmethod
+    def build(cls, markdown: str, source_hash: str, deps: str = "") -> "CacheEntry":
+        body = markdown.encode("utf-8")
+        return cls(
+            body=body,
+            source_hash=source_hash,
+            variants=compress_variants(body),
+            deps=deps,
+        )
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.created_at
+
+    def is_fresh(self, ttl: Optional[float], now: Optional[float] = None) -> bool:
+        """``ttl=None`` means the entry must always be revalidated by hash."""
+        return ttl is not None and self.age(now) < ttl
+
+
+class CacheBackend(Protocol):
+    """Interface the middleware expects from a render cache."""
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]: ...
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None: ...
+
+    def touch(self, key: CacheKey, entry: CacheEntry) -> CacheEntry: ...
+
+    def invalidate(self, key: Optional[CacheKey] = None) -> None: ...
+
+    def invalidate_matching(self, predicate: Callable[[CacheKey], bool]) -> int: ...
+
+    def __len__(self) -> int: ...
+
+
+class RenderCache:
+    """
+    Thread-safe, size-bounded (LRU) in-process cache of rendered mirrors and
+    manifests, keyed by ``(root_url, path, template_name)``.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, key: CacheKey, entry: CacheEntry) -> CacheEntry:
+        """Mark an entry as revalidated (same content version) without rebuilding."""
+        refreshed = CacheEntry(
+            body=entry.body,
+            source_hash=entry.source_hash,
+            variants=entry.variants,
+            deps=entry.deps,
+        )
+        self.set(key, refreshed)
+        return refreshed
+
+    def invalidate(self, key: Optional[CacheKey] = None) -> None:
+        """Drop one entry, or everything when ``key`` is ``None``."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[CacheKey], bool]) -> int:
+        """Drop every entry whose key satisfies ``predicate``; returns the count."""
+        with self._lock:
+            doomed = [key for key in self._entries if predicate(key)]
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class GeneratorCache:
+    """
+    Loaded generators keyed by ``(template_dir, template_name)``, each with a
+    digest of its template source. A generator is reloaded once its template
+    file changes on disk.
+    """
+
+    def __init__(self) -> None:
+        self._generators: Dict[
+            Tuple[Optional[str], str], Tuple[HtmlToMdGenerator, str]
+        ] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, template_dir: Optional[str], template_name: str
+    ) -> Tuple[HtmlToMdGenerator, str]:
+        """Return a loaded generator and its template digest."""
+        key = (template_dir, template_name)
+        cached = self._generators.get(key)
+        if cached is not None and cached[0].template.is_up_to_date:
+            return cached
+        generator = HtmlToMdGenerator(
+            template_dir=template_dir, template_name=template_name
+        )
+        loader = generator.env.loader
+        source = loader.get_source(generator.env, template_name)[0] if loader else ""
+        cached = (generator, content_hash(template_dir or "", template_name, source))
+        with self._lock:
+            self._generators[key] = cached
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generators.clear()
@@ -0,0 +1,101 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import gzip
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from open_llms_txt.middleware.negotiation import parse_qlist
+
+# Optional encoders: used only when the package is importable
+try:
+    import brotli  # type: ignore[import-not-found,import-untyped]
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        import brotlicffi as brotli  # type: ignore[import-not-found,no-redef]
+    except ImportError:
+        brotli = None  # type: ignore[assignment]
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None  # type: ignore[assignment]
+
+# Bodies smaller than this are not worth compressing (headers dominate)
+MIN_COMPRESS_SIZE = 256
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output deterministic for a given body
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def _zstd(data: bytes) -> bytes:
+    # Compressor objects are not thread-safe: renders run on many threads
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+
+def _encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encoders["br"] = _brotli
+    if zstandard is not None:
+        encoders["zstd"] = _zstd
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+# Server preference order, best ratio first
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = _encoders()
+AVAILABLE_ENCODINGS: Tuple[str, ...] = tuple(ENCODERS)
+
+
+def compress_variants(
+    body: bytes, *, min_size: int = MIN_COMPRESS_SIZE
+) -> Dict[str, bytes]:
+    """
+    Pre-compress ``body`` with every available encoder. Variants that do not
+    shrink the body are dropped, so callers can fall back to identity.
+    """
+    if len(body) < min_size:
+        return {}
+    variants: Dict[str, bytes] = {}
+    for name, encode in ENCODERS.items():
+        encoded = encode(body)
+        if len(encoded) < len(body):
+            variants[name] = encoded
+    return variants
+
+
+def select_encoding(
+    accept_encoding: Optional[str], available: Iterable[str]
+) -> Optional[str]:
+    """
+    Pick the best pre-compressed variant for an ``Accept-Encoding`` header.
+
+    Returns the encoding name, or ``None`` to send the identity body. Among the
+    encodings the client accepts with the highest q-value, server preference
+    (``AVAILABLE_ENCODINGS`` order) breaks ties; ``*`` matches any encoding not
+    listed explicitly and ``q=0`` refuses one.
+    """
+    if not accept_encoding:
+        return None
+    accepted = parse_qlist(accept_encoding)
+    explicit = {token: q for token, q in accepted if token != "*"}
+    wildcard = next((q for token, q in accepted if token == "*"), None)
+
+    best: Optional[str] = None
+    best_q = 0.0
+    candidates = set(available)
+    for name in AVAILABLE_ENCODINGS:
+        if name not in candidates:
+            continue
+        q = explicit.get(name, wildcard if wildcard is not None else 0.0)
+        if q > best_q:
+            best, best_q = name, q
+    return best
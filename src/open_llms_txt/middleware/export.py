@@ -0,0 +1,308 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Tuple
+from urllib.parse import urlsplit
+
+import click
+from flask import Flask, current_app, url_for
+from flask.cli import AppGroup
+
+from open_llms_txt.middleware import flask as _mw
+from open_llms_txt.middleware.shards import shard_path
+from open_llms_txt.utils import ExportReport, atomic_write, content_hash
+
+# Per-directory index of {relative output file -> upstream hash}
+STATE_FILENAME = ".llms-export.json"
+
+
+def load_state(out_dir: Path) -> Dict[str, str]:
+    """Read the previous export index, returning ``{}`` if missing or corrupt."""
+    try:
+        raw = json.loads((out_dir / STATE_FILENAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    files = raw.get("files") if isinstance(raw, dict) else None
+    if not isinstance(files, dict):
+        return {}
+    return {str(k): str(v) for k, v in files.items()}
+
+
+def save_state(out_dir: Path, files: Dict[str, str]) -> None:
+    payload = json.dumps({"files": dict(sorted(files.items()))}, indent=2)
+    atomic_write(out_dir / STATE_FILENAME, payload.encode("utf-8"))
+
+
+class _ExportTask(NamedTuple):
+    """
+    One file of ``export_static``: ``source`` is the route whose HTML is
+    rendered, or a callable producing the ``(status, payload)`` to render
+    (registry manifests, section manifests).
+    """
+
+    rel_file: str
+    source: str | Callable[[], Tuple[int, str]]
+    render: Callable[[str], str]
+    fingerprint: str
+
+
+def _export_one(
+    app: Flask, out_dir: Path, task: _ExportTask, previous_hash: str | None
+) -> Tuple[str, str, str]:
+    """Export a single file, returning ``(rel_file, outcome, hash_or_reason)``."""
+    rel_file, source, render, fingerprint = task
+    try:
+        if callable(source):
+            status, html = source()
+        else:
+            status, html = _mw._dispatch_html(app, source)
+    except Exception as e:
+        return rel_file, "failed", f"dispatch error: {e}"
+    if status >= 400:
+        return rel_file, "failed", f"HTTP {status} from `{source}`"
+
+    upstream_hash = content_hash(fingerprint, html)
+    target = out_dir / rel_file
+    if upstream_hash == previous_hash and target.is_file():
+        return rel_file, "unchanged", upstream_hash
+
+    try:
+        md = render(html)
+        atomic_write(target, md.encode("utf-8"))
+    except Exception as e:
+        return rel_file, "failed", f"render error: {e}"
+    return rel_file, "written", upstream_hash
+
+
+def _manifest_export_tasks(
+    app: Flask, base_url: str, allowed: List[str], report: ExportReport
+) -> List[_ExportTask]:
+    """Export tasks of the manifest and its shards (see ``export_static``)."""
+    if not _mw._MANIFEST_CONFIG:
+        return []
+    config = _mw._MANIFEST_CONFIG
+    tasks: List[_ExportTask] = []
+    with app.app_context():
+        page_path = (
+            None if config["from_registry"] else _mw._resolve_manifest_source(app)
+        )
+        shard_by = config["shard_by"]
+        shards = _mw._manifest_shards() if shard_by is not None else {}
+    extra = {"shards": _mw._shard_index(base_url)} if shard_by is not None else {}
+    fingerprint = content_hash(
+        _mw._template_fingerprint(config["template_dir"], config["template_name"]),
+        base_url,
+        *allowed,
+    )
+    rel_manifest = config["manifest_path"].lstrip("/")
+    if config["from_registry"]:
+        render = partial(
+            _mw._render_from_registry,
+            template_dir=config["template_dir"],
+            template_name=config["template_name"],
+            base=base_url,
+            mount_prefix=config["mount_prefix"],
+            title=config["title"] or urlsplit(base_url).netloc,
+            description=config["description"] or "",
+            extra_metadata=extra,
+        )
+        routes = _mw._registry_entries(base_url, config["mount_prefix"])
+        tasks.append(
+            _ExportTask(rel_manifest, partial(_ok, routes), render, fingerprint)
+        )
+    elif page_path:
+        render = partial(
+            _mw._render_markdown,
+            template_dir=config["template_dir"],
+            template_name=config["template_name"],
+            base=base_url,
+            source_path=page_path,
+            mount_prefix=config["mount_prefix"],
+            extra_metadata=extra,
+        )
+        tasks.append(_ExportTask(rel_manifest, page_path, render, fingerprint))
+    else:
+        report.failed[rel_manifest] = "unable to resolve source page"
+
+    shard_name = config["shard_template_name"]
+    shard_dir = _mw._shard_template_dir(config["template_dir"], shard_name)
+    for section, paths in shards.items():
+        render = partial(
+            _mw._render_shard,
+            section=section,
+            template_dir=shard_dir,
+            template_name=shard_name,
+            base=base_url,
+            mount_prefix=config["mount_prefix"],
+        )
+        tasks.append(
+            _ExportTask(
+                shard_path(config["manifest_path"], section).lstrip("/"),
+                partial(_ok, "\n".join(paths)),
+                render,
+                content_hash(
+                    _mw._template_fingerprint(shard_dir, shard_name), base_url
+                ),
+            )
+        )
+    return tasks
+
+
+def _ok(payload: str) -> Tuple[int, str]:
+    return 200, payload
+
+
+def export_static(
+    app: Flask,
+    out_dir: str | Path,
+    *,
+    base_url: str = "http://localhost",
+    jobs: int = 4,
+    force: bool = False,
+) -> ExportReport:
+    """
+    Render every allowed mirror and the manifest into ``out_dir`` so a static
+    server (e.g. nginx) can serve them without running any Python per request.
+
+    Files mirror the public URL layout, honoring ``mount_prefix`` and the
+    blueprint rule (``/docs`` -> ``<out_dir>/.llms/docs.html.md``; the manifest
+    -> ``<out_dir>/llms.txt``). Exports are incremental: an index of upstream
+    HTML hashes (combined with the template and allow-list fingerprint) is kept
+    in ``<out_dir>/.llms-export.json`` and only files whose hash changed are
+    re-rendered. Every write is atomic (temp file + ``os.replace``). Files from a
+    previous export whose route is no longer allowed are removed.
+
+    Parameters
+    ----------
+    app : flask.Flask
+        Application whose ``@html2md`` / ``@llmstxt`` registrations are exported.
+    out_dir : str | pathlib.Path
+        Destination directory (created if missing).
+    base_url : str, optional
+        Scheme and host used as ``root_url`` in rendered templates, since there is
+        no incoming request to take it from. Defaults to ``"http://localhost"``.
+    jobs : int, optional
+        Number of worker threads rendering files in parallel. Defaults to ``4``.
+    force : bool, optional
+        Re-render every file regardless of the stored hashes.
+
+    Returns
+    -------
+    ExportReport
+        Which files were written, left unchanged, removed or failed (with reason).
+    """
+    out = Path(out_dir)
+    base_url = base_url.rstrip("/")
+    # Loaded even with ``force``: it also lists the files to clean up
+    previous = load_state(out)
+
+    with app.app_context():
+        _mw._refresh_allowed_paths(app)
+    allowed = list(_mw._ALLOWLIST)
+
+    tasks: List[_ExportTask] = []
+    mirror = _mw._MIRROR_CONFIG
+    if mirror:
+        fingerprint = content_hash(
+            _mw._template_fingerprint(mirror["template_dir"], mirror["template_name"]),
+            base_url,
+            *allowed,
+        )
+        with app.test_request_context(base_url=base_url):
+            for path in allowed:
+                if "<" in path or path == "/":
+                    continue  # no concrete URL / not addressable by the mirror rule
+                mirror_url = url_for(_mw._MIRROR_ENDPOINT, raw=path.lstrip("/"))
+                render = partial(
+                    _mw._render_markdown,
+                    template_dir=mirror["template_dir"],
+                    template_name=mirror["template_name"],
+                    base=base_url,
+                    source_path=path,
+                    mount_prefix=mirror["mount_prefix"],
+                    capture=True,
+                )
+                tasks.append(
+                    _ExportTask(mirror_url.lstrip("/"), path, render, fingerprint)
+                )
+    report = ExportReport()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+
+        def export(task: _ExportTask) -> Tuple[str, str, str]:
+            previous_hash = None if force else previous.get(task.rel_file)
+            return _export_one(app, out, task, previous_hash)
+
+        results = list(pool.map(export, tasks))
+        # Manifests go second: mirrors rendered above fill the route registry
+        manifest_tasks = _manifest_export_tasks(app, base_url, allowed, report)
+        results += pool.map(export, manifest_tasks)
+    tasks += manifest_tasks
+
+    state: Dict[str, str] = {}
+    for rel_file, outcome, detail in results:
+        if outcome == "failed":
+            report.failed[rel_file] = detail
+            if rel_file in previous:
+                state[rel_file] = previous[rel_file]  # keep the last good file
+            continue
+        state[rel_file] = detail
+        (report.written if outcome == "written" else report.unchanged).append(rel_file)
+
+    exported = {task.rel_file for task in tasks}
+    for rel_file in previous:
+        if rel_file in exported or rel_file in report.failed:
+            continue
+        stale = out / rel_file
+        if stale.is_file():
+            stale.unlink()
+        report.removed.append(rel_file)
+
+    save_state(out, state)
+    return report
+
+
+llms_cli = AppGroup("llms", help="open-llms-txt commands for Markdown mirrors.")
+
+
+@llms_cli.command("export")
+@click.argument(
+    "out_dir", type=click.Path(file_okay=False, writable=True, path_type=Path)
+)
+@click.option(
+    "--base-url",
+    default="http://localhost",
+    show_default=True,
+    help="Site root used for absolute links in the rendered Markdown.",
+)
+@click.option(
+    "--jobs", "-j", default=4, show_default=True, help="Parallel render workers."
+)
+@click.option("--force", is_flag=True, help="Rewrite every file, ignoring hashes.")
+@click.option(
+    "--report",
+    "report_path",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Also write the JSON report to this file.",
+)
+def _export_command(
+    out_dir: Path, base_url: str, jobs: int, force: bool, report_path: Path | None
+) -> None:
+    """Render llms.txt and every .html.md mirror into OUT_DIR."""
+    report = export_static(
+        current_app._get_current_object(),  # type: ignore[attr-defined]
+        out_dir,
+        base_url=base_url,
+        jobs=jobs,
+        force=force,
+    )
+    if report_path is not None:
+        atomic_write(report_path, report.to_json().encode("utf-8"))
+    click.echo(report.to_json())
+    if report.failed:
+        raise click.exceptions.Exit(1)
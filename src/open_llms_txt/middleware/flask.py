@@ -3,20 +3,772 @@
 
 from __future__ import annotations
 
+from contextvars import ContextVar
+from dataclasses import dataclass
 from functools import wraps
-from typing import Callable, Dict, Set
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
 from urllib.parse import urljoin
 
-from flask import Blueprint, Response, current_app, request
+from flask import Blueprint, Flask, Response, current_app, g, request
+from jinja2 import TemplateNotFound
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, RequestRedirect, Rule
 
 from open_llms_txt.generators.html_to_md import HtmlToMdGenerator
+from open_llms_txt.middleware.allowlist import AllowList, rule_to_glob
+from open_llms_txt.middleware.cache import (
+    CacheBackend,
+    CacheEntry,
+    CacheKey,
+    GeneratorCache,
+    RenderCache,
+)
+from open_llms_txt.middleware.compression import select_encoding
+from open_llms_txt.middleware.limiter import RenderLimiter
+from open_llms_txt.middleware.metrics import MiddlewareMetrics
+from open_llms_txt.middleware.negotiation import prefers_markdown
+from open_llms_txt.middleware.registry import RouteMeta, RouteRegistry
+from open_llms_txt.middleware.shards import (
+    SHARD_MODES,
+    ShardBy,
+    group_shards,
+    shard_path,
+)
+from open_llms_txt.middleware.singleflight import SingleFlight, SingleFlightTimeoutError
+from open_llms_txt.utils import content_hash
+
+logger = logging.getLogger(__name__)
 
 # Only routes explicitly decorated can be mirrored
 _ALLOWED_PATHS: Set[str] = set()
 _DECORATED_ENDPOINTS: Set[str] = set()
 _ENDPOINT_POLICY: Dict[str, bool] = {}
+_ENDPOINT_CACHE_TTL: Dict[str, float | None] = {}
+# Per-endpoint (stale_while_revalidate, stale_if_error) windows, in seconds
+_ENDPOINT_STALE: Dict[str, Tuple[float, float]] = {}
+_PATH_ENDPOINTS: Dict[str, str] = {}
+# Per-endpoint callables yielding rule values for parameterized routes
+_ENDPOINT_URL_VALUES: Dict[str, Callable[[], Iterable[Dict[str, Any]]]] = {}
+# Declared and captured title/description/section/priority of mirrored routes
+_ROUTE_REGISTRY = RouteRegistry()
+# Paths advertised to templates (rules plus enumerated concrete URLs, iterated
+# sorted) that also matches any URL of an allowed parameterized rule
+_ALLOWLIST = AllowList()
+# Whether any allowed rule has parameters (requests then go through the matcher)
+_HAS_PARAM_RULES = False
+# Bumped whenever a decorator (re)registers an endpoint
+_DECORATED_VERSION = 0
+# (url_map id, rule count, decorated version) the allow-list was last built for
+_ALLOWLIST_SIGNATURE: Tuple[int, int, int] | None = None
+_ALLOWLIST_DIGEST = ""
+
+
+@dataclass
+class _ManifestMemos:
+    """
+    Manifest inputs derived from the allow-list, each stored as
+    ``(version, value)`` and reused while the version still matches.
+    """
+
+    routes: Tuple[Tuple[Any, ...], str] | None = None
+    shards: Tuple[Tuple[int, int, int] | None, Dict[str, List[str]]] | None = None
+    source: Tuple[Tuple[int, int], str | None] | None = None
+
+    def clear(self) -> None:
+        self.routes = self.shards = self.source = None
+
+
+_MANIFEST_MEMOS = _ManifestMemos()
+_ALLOWLIST_LOCK = threading.Lock()
 _BLUEPRINT_MOUNTED = False
 _MANIFEST_BP_MOUNTED = False
+# Render settings captured when each blueprint is mounted (reused by the exporter)
+_MIRROR_CONFIG: Dict[str, Any] = {}
+_MANIFEST_CONFIG: Dict[str, Any] = {}
+
+_MIRROR_ENDPOINT = "html2md_manifest._html2md_manifest"
+
+# Loaded generators and their template digest, reloaded when the template changes
+_GENERATORS = GeneratorCache()
+
+# Rendered bodies (+ pre-compressed variants) keyed by (root_url, path, template);
+# swapped for a cross-process backend by use_render_cache
+_RENDER_CACHE: CacheBackend = RenderCache()
+# Optional concurrency cap / load shedding for renders (cache hits are exempt)
+_RENDER_LIMITER: RenderLimiter | None = None
+# One in-flight render per (cache key, limiter client class); concurrent misses
+# share it
+_SINGLE_FLIGHT: SingleFlight[CacheEntry | Response] = SingleFlight()
+# Opt-in instrumentation (see enable_metrics); None means nothing is recorded
+_METRICS: MiddlewareMetrics | None = None
+# Per-render phase durations collected by _render_markdown for _render_and_store
+_PHASE_TIMINGS: ContextVar[Dict[str, float] | None] = ContextVar(
+    "llms_phase_timings", default=None
+)
+# Keys being re-rendered by a stale-while-revalidate background thread
+_REVALIDATING: Set[CacheKey] = set()
+_REVALIDATING_LOCK = threading.Lock()
+
+
+def _register_endpoint(
+    endpoint: str,
+    allow_param_routes: bool,
+    cache_ttl: float | None,
+    url_values: Callable[[], Iterable[Dict[str, Any]]] | None = None,
+    stale: Tuple[float, float] = (0.0, 0.0),
+    meta: RouteMeta | None = None,
+) -> None:
+    global _DECORATED_VERSION
+    _DECORATED_ENDPOINTS.add(endpoint)
+    _ROUTE_REGISTRY.declare(endpoint, meta or RouteMeta())
+    _ENDPOINT_POLICY[endpoint] = allow_param_routes
+    _ENDPOINT_CACHE_TTL[endpoint] = cache_ttl
+    _ENDPOINT_STALE[endpoint] = stale
+    if url_values is not None:
+        _ENDPOINT_URL_VALUES[endpoint] = url_values
+    else:
+        _ENDPOINT_URL_VALUES.pop(endpoint, None)
+    _DECORATED_VERSION += 1
+
+
+def _url_map_size(app: Flask) -> int:
+    rules = getattr(app.url_map, "_rules", None)
+    if rules is not None:
+        return len(rules)
+    return sum(1 for _ in app.url_map.iter_rules())
+
+
+def _refresh_allowed_paths(app: Flask) -> None:
+    """
+    Rebuild the allow-list of rules from the decorated endpoints. The rebuild
+    only happens when the URL map or the decorated set changed since last time.
+    Parameterized rules with ``url_values`` are expanded into concrete paths
+    here, so the user's generator runs once per rebuild.
+    """
+    global _ALLOWLIST, _ALLOWLIST_SIGNATURE, _ALLOWLIST_DIGEST, _HAS_PARAM_RULES
+    try:
+        signature = (id(app.url_map), _url_map_size(app), _DECORATED_VERSION)
+        if signature == _ALLOWLIST_SIGNATURE:
+            return
+        with _ALLOWLIST_LOCK:
+            if signature == _ALLOWLIST_SIGNATURE:
+                return
+            allowed: Set[str] = set()
+            endpoints: Dict[str, str] = {}
+            advertised: Set[str] = set()
+            for rule in app.url_map.iter_rules():
+                ep = rule.endpoint
+                if ep in _DECORATED_ENDPOINTS:
+                    if (not _ENDPOINT_POLICY.get(ep, False)) and "<" in rule.rule:
+                        continue
+                    allowed.add(rule.rule)
+                    endpoints[rule.rule] = ep
+                    if "<" not in rule.rule or ep not in _ENDPOINT_URL_VALUES:
+                        advertised.add(rule.rule)
+            enumerated = _enumerate_paths(app, endpoints)
+            advertised.update(enumerated)
+            _ALLOWED_PATHS.clear()
+            _ALLOWED_PATHS.update(allowed)
+            _PATH_ENDPOINTS.clear()
+            _PATH_ENDPOINTS.update(enumerated)
+            _PATH_ENDPOINTS.update(endpoints)
+            globs = sorted(rule_to_glob(rule) for rule in allowed if "<" in rule)
+            allowlist = AllowList(advertised)
+            allowlist.update(globs)
+            _ALLOWLIST = allowlist  # swapped whole: readers never see it half-built
+            _HAS_PARAM_RULES = bool(globs)
+            _ALLOWLIST_DIGEST = content_hash(*_ALLOWLIST, *globs)
+            _ALLOWLIST_SIGNATURE = signature
+    except Exception:
+        # Keep serving with the previous allow-list; retried on the next request
+        logger.exception("⚠️ Could not rebuild the Markdown mirror allow-list")
+
+
+def _enumerate_paths(app: Flask, endpoints: Dict[str, str]) -> Dict[str, str]:
+    """Build the concrete paths of parameterized rules from their ``url_values``."""
+    paths: Dict[str, str] = {}
+    adapter = app.url_map.bind("localhost")
+    for ep in set(endpoints.values()):
+        url_values = _ENDPOINT_URL_VALUES.get(ep)
+        if url_values is None:
+            continue
+        try:
+            for values in url_values():
+                try:
+                    path = adapter.build(ep, values, method="GET")
+                except Exception:
+                    continue  # values that don't fit any rule of the endpoint
+                if "?" not in path:  # extra values: a query string, not mirrorable
+                    paths[path] = ep
+        except Exception:
+            # User code: its rule still matches requests, it just isn't listed
+            logger.exception(f"⚠️ url_values() of endpoint {ep!r} failed")
+    return paths
+
+
+def _match_allowed_rule(path: str) -> str | None:
+    """
+    Return the allowed rule serving ``path`` (e.g. ``/blog/<slug>`` for
+    ``/blog/hello``), or ``None``. Static rules are a set lookup; parameterized
+    ones go through Werkzeug's compiled URL matcher, never a scan of the rules.
+    """
+    if path in _ALLOWED_PATHS and "<" not in path:
+        return path
+    if not _HAS_PARAM_RULES:
+        return None
+    try:
+        adapter = current_app.url_map.bind_to_environ(request.environ)
+        rule, _ = adapter.match(path, method="GET", return_rule=True)
+    except (HTTPException, RequestRedirect):
+        return None
+    if rule.rule in _ALLOWED_PATHS:
+        return rule.rule
+    return None
+
+
+def _get_generator(
+    template_dir: str | None, template_name: str
+) -> Tuple[HtmlToMdGenerator, str]:
+    """Return a loaded generator and its template digest (reloaded on change)."""
+    return _GENERATORS.get(template_dir, template_name)
+
+
+def _render_deps(template_dir: str | None, template_name: str) -> str:
+    """Digest of every render input other than the page HTML itself."""
+    return f"{_ALLOWLIST_DIGEST}:{_get_generator(template_dir, template_name)[1]}"
+
+
+def _dispatch_html(app: Flask, path: str) -> Tuple[int, str]:
+    """Render a route's HTML in-process, returning ``(status, body)``."""
+    client = app.test_client()
+    html_resp = client.get(path, headers={"Accept": "text/html"})
+    return html_resp.status_code, html_resp.get_data(as_text=True)
+
+
+def _render_markdown(
+    html: str,
+    *,
+    template_dir: str | None,
+    template_name: str,
+    base: str,
+    source_path: str,
+    mount_prefix: str,
+    capture: bool = False,
+    extra_metadata: Dict[str, Any] | None = None,
+) -> str:
+    """
+    Parse ``html`` and render it; with ``capture``, the page's title and
+    summary are recorded in the route registry for registry-built manifests.
+    ``extra_metadata`` is merged into the template's ``metadata``.
+    """
+    generator, _ = _get_generator(template_dir, template_name)
+    started = time.perf_counter()
+    context = generator.parse(
+        html,
+        root_url=base,
+        source_url=urljoin(base, source_path),
+        allowed_paths=_ALLOWLIST,
+        mount_prefix=mount_prefix,
+        **(extra_metadata or {}),
+    )
+    parsed = time.perf_counter()
+    if capture:
+        _ROUTE_REGISTRY.capture(source_path, context)
+    md = generator.render_context(context)
+    timings = _PHASE_TIMINGS.get()
+    if timings is not None:
+        timings["parse"] = parsed - started
+        timings["template"] = time.perf_counter() - parsed
+    return md
+
+
+def _registry_entries(base: str, mount_prefix: str) -> str:
+    """
+    ``metadata.routes`` of registry-built manifests as JSON, memoized per
+    registry and allow-list version.
+    """
+    version = (_ROUTE_REGISTRY.version, _ALLOWLIST_SIGNATURE, base, mount_prefix)
+    memo = _MANIFEST_MEMOS.routes
+    if memo is not None and memo[0] == version:
+        return memo[1]
+    payload = json.dumps(
+        _ROUTE_REGISTRY.entries(
+            _ALLOWLIST,
+            _PATH_ENDPOINTS,
+            lambda path: f"{base}{mount_prefix}{path}.html.md",
+        )
+    )
+    _MANIFEST_MEMOS.routes = (version, payload)
+    return payload
+
+
+def _render_from_registry(
+    payload: str,
+    *,
+    template_dir: str | None,
+    template_name: str,
+    base: str,
+    mount_prefix: str,
+    title: str,
+    description: str,
+    extra_metadata: Dict[str, Any] | None = None,
+) -> str:
+    """Render the manifest from serialized registry entries (no page HTML)."""
+    generator, _ = _get_generator(template_dir, template_name)
+    started = time.perf_counter()
+    md = generator.render_context(
+        {
+            "metadata": {
+                "root_url": base,
+                "source_url": base,
+                "allowed_paths": _ALLOWLIST,
+                "mount_prefix": mount_prefix,
+                "routes": json.loads(payload),
+                **(extra_metadata or {}),
+            },
+            "title": title,
+            "h1": "",
+            "headings": [],
+            "paragraphs": [description] if description else [],
+            "links": [],
+        }
+    )
+    timings = _PHASE_TIMINGS.get()
+    if timings is not None:
+        timings["template"] = time.perf_counter() - started
+    return md
+
+
+def _shard_template_dir(template_dir: str | None, template_name: str) -> str | None:
+    """Use ``template_dir`` when it has the shard template, else the packaged one."""
+    try:
+        _get_generator(template_dir, template_name)
+    except TemplateNotFound:
+        return None
+    return template_dir
+
+
+def _manifest_shards() -> Dict[str, List[str]]:
+    """Allowed paths grouped by section, memoized per allow-list version."""
+    memo = _MANIFEST_MEMOS.shards
+    if memo is not None and memo[0] == _ALLOWLIST_SIGNATURE:
+        return memo[1]
+    shards = group_shards(_ALLOWLIST, _PATH_ENDPOINTS, _MANIFEST_CONFIG["shard_by"])
+    _MANIFEST_MEMOS.shards = (_ALLOWLIST_SIGNATURE, shards)
+    return shards
+
+
+def _shard_index(base: str) -> List[Dict[str, Any]]:
+    """``metadata.shards`` for the root manifest template."""
+    manifest_path = _MANIFEST_CONFIG["manifest_path"]
+    index = []
+    for name, paths in _manifest_shards().items():
+        path = shard_path(manifest_path, name)
+        index.append(
+            {"name": name, "path": path, "url": base + path, "count": len(paths)}
+        )
+    return index
+
+
+def _render_shard(
+    payload: str,
+    *,
+    section: str,
+    template_dir: str | None,
+    template_name: str,
+    base: str,
+    mount_prefix: str,
+) -> str:
+    """Render one section manifest straight from its path list (no page HTML)."""
+    generator, _ = _get_generator(template_dir, template_name)
+    manifest_path = _MANIFEST_CONFIG["manifest_path"]
+    started = time.perf_counter()
+    md = generator.render_context(
+        {
+            "metadata": {
+                "root_url": base,
+                "source_url": base + shard_path(manifest_path, section),
+                "manifest_url": base + manifest_path,
+                "section": section,
+                "paths": payload.split("\n") if payload else [],
+                "allowed_paths": _ALLOWLIST,
+                "mount_prefix": mount_prefix,
+            }
+        }
+    )
+    timings = _PHASE_TIMINGS.get()
+    if timings is not None:
+        timings["template"] = time.perf_counter() - started
+    return md
+
+
+def _template_key(template_dir: str | None, template_name: str) -> str:
+    return f"{template_dir or ''}:{template_name}"
+
+
+def _markdown_response(entry: CacheEntry) -> Response:
+    """Serve the best pre-compressed variant for the request's Accept-Encoding."""
+    encoding = select_encoding(request.headers.get("Accept-Encoding"), entry.variants)
+    body = entry.variants[encoding] if encoding else entry.body
+    resp = Response(body, mimetype="text/markdown; charset=utf-8")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def _serve_cached(
+    key: CacheKey,
+    *,
+    ttl: float | None,
+    deps: str,
+    fetch: Callable[[], Tuple[int, str] | Response],
+    error_message: str,
+    render: Callable[[str], str],
+    stale: Tuple[float, float] = (0.0, 0.0),
+    refresh: Callable[[], Tuple[int, str]] | None = None,
+) -> Response:
+    """
+    Serve a rendered body from ``_RENDER_CACHE``. Fresh entries (within ``ttl``)
+    skip the view entirely; otherwise ``fetch`` produces the HTML and, when its
+    hash matches the cached version, the stored body and variants are reused
+    without re-parsing, re-rendering or re-compressing. ``fetch`` may return a
+    ``Response`` to short-circuit (it is served unchanged). Renders (but not
+    fresh hits) go through ``_RENDER_LIMITER`` when one is configured, and
+    concurrent renders of the same key are coalesced by ``_SINGLE_FLIGHT``.
+    ``deps`` (allow-list + template digest) invalidates entries regardless of age.
+
+    ``stale`` is ``(stale_while_revalidate, stale_if_error)`` in seconds past
+    ``ttl``: within the first window an expired entry is served at once while
+    ``refresh`` (a request-independent ``fetch``) re-renders it on a background
+    thread; within the second, it is served when the upstream fails with 5xx.
+    """
+    swr, sie = stale
+    entry = _RENDER_CACHE.get(key)
+    # Only entries rendered with the current allow-list/template may be served
+    current = entry if entry is not None and entry.deps == deps else None
+    if current is not None and current.is_fresh(ttl):
+        if _METRICS is not None:
+            _METRICS.cache_result(_metrics_route(key), "hit")
+        return _markdown_response(current)
+
+    if current is not None and ttl is not None and current.is_fresh(ttl + swr):
+        _revalidate_in_background(
+            key, current, deps, refresh or fetch, error_message, render
+        )
+        if _METRICS is not None:
+            _METRICS.cache_result(_metrics_route(key), "stale")
+        return _markdown_response(current)
+
+    fallback = None
+    if current is not None and ttl is not None and current.is_fresh(ttl + sie):
+        fallback = current
+
+    # Concurrent misses for the same key wait for a single render and share it,
+    # per client class: the limiter's verdict on the leader holds for its class
+    client_class = _client_class()
+    try:
+        result, shared = _SINGLE_FLIGHT.do(
+            (key, client_class),
+            lambda: _limited_render(
+                key, entry, deps, fetch, error_message, render, fallback, client_class
+            ),
+        )
+    except SingleFlightTimeoutError:
+        return _overloaded_response(retry_after=1)
+    if isinstance(result, CacheEntry):
+        # Each waiter still negotiates its own Content-Encoding
+        return _markdown_response(result)
+    if shared:
+        return Response(
+            result.get_data(), status=result.status, headers=result.headers.copy()
+        )
+    return result
+
+
+def _revalidate_in_background(
+    key: CacheKey,
+    entry: CacheEntry,
+    deps: str,
+    fetch: Callable[[], Tuple[int, str] | Response],
+    error_message: str,
+    render: Callable[[str], str],
+) -> None:
+    """Re-render ``key`` on one background thread (per key) while stale is served."""
+    with _REVALIDATING_LOCK:
+        if key in _REVALIDATING:
+            return
+        _REVALIDATING.add(key)
+
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    route = _metrics_route(key)
+
+    def failed() -> None:
+        # The stale entry stays until it ages out of the window
+        if _METRICS is not None:
+            _METRICS.revalidation_failed(route)
+
+    def run() -> None:
+        try:
+            with app.app_context():
+                g.llms_route = route
+                result, _ = _SINGLE_FLIGHT.do(
+                    (key, None),
+                    lambda: _render_and_store(
+                        key, entry, deps, fetch, error_message, render, entry
+                    ),
+                )
+            # Served back the stale entry (stale-if-error) or an error response
+            if result is entry or isinstance(result, Response):
+                logger.warning(
+                    f"⚠️ Background revalidation of {key[1]!r} failed upstream"
+                )
+                failed()
+        except Exception:
+            logger.exception(f"⚠️ Background revalidation of {key[1]!r} failed")
+            failed()
+        finally:
+            with _REVALIDATING_LOCK:
+                _REVALIDATING.discard(key)
+
+    threading.Thread(target=run, name="llms-revalidate", daemon=True).start()
+
+
+def _metrics_route(key: CacheKey) -> str:
+    # The matched rule keeps label cardinality bounded for parameterized routes
+    return g.get("llms_route") or key[1]
+
+
+def _overloaded_response(retry_after: int) -> Response:
+    resp = Response(
+        "# 503\nMarkdown rendering is over capacity, retry later.\n",
+        status=503,
+        mimetype="text/markdown",
+    )
+    resp.headers["Retry-After"] = str(retry_after)
+    return resp
+
+
+def _client_class() -> str | None:
+    """The request's ``_RENDER_LIMITER`` class, or ``None`` without a limiter."""
+    limiter = _RENDER_LIMITER
+    if limiter is None:
+        return None
+    return limiter.classify(request.headers.get("User-Agent"), request.remote_addr)
+
+
+def _limited_render(
+    key: CacheKey,
+    entry: CacheEntry | None,
+    deps: str,
+    fetch: Callable[[], Tuple[int, str] | Response],
+    error_message: str,
+    render: Callable[[str], str],
+    fallback: CacheEntry | None = None,
+    client_class: str | None = None,
+) -> CacheEntry | Response:
+    limiter = _RENDER_LIMITER
+    if limiter is None or client_class is None:
+        return _render_and_store(
+            key, entry, deps, fetch, error_message, render, fallback
+        )
+
+    with limiter.slot(client_class) as admitted:
+        if not admitted:
+            if fallback is not None:
+                return fallback
+            return _overloaded_response(limiter.retry_after)
+        return _render_and_store(
+            key, entry, deps, fetch, error_message, render, fallback
+        )
+
+
+def _render_and_store(
+    key: CacheKey,
+    entry: CacheEntry | None,
+    deps: str,
+    fetch: Callable[[], Tuple[int, str] | Response],
+    error_message: str,
+    render: Callable[[str], str],
+    fallback: CacheEntry | None = None,
+) -> CacheEntry | Response:
+    metrics = _METRICS
+    if metrics is None:
+        return _fetch_and_render(
+            key, entry, deps, fetch, error_message, render, fallback
+        )
+
+    route = _metrics_route(key)
+    timings: Dict[str, float] = {}
+    token = _PHASE_TIMINGS.set(timings)
+    metrics.in_flight.inc()
+    try:
+        result = _fetch_and_render(
+            key, entry, deps, fetch, error_message, render, fallback
+        )
+    finally:
+        metrics.in_flight.dec()
+        _PHASE_TIMINGS.reset(token)
+    for phase, seconds in timings.items():
+        metrics.observe_phase(route, phase, seconds)
+    if result is fallback and fallback is not None:
+        metrics.cache_result(route, "stale")
+    elif isinstance(result, CacheEntry):
+        revalidated = entry is not None and result.source_hash == entry.source_hash
+        metrics.cache_result(route, "revalidated" if revalidated else "miss")
+    return result
+
+
+def _fetch_and_render(
+    key: CacheKey,
+    entry: CacheEntry | None,
+    deps: str,
+    fetch: Callable[[], Tuple[int, str] | Response],
+    error_message: str,
+    render: Callable[[str], str],
+    fallback: CacheEntry | None = None,
+) -> CacheEntry | Response:
+    started = time.perf_counter()
+    try:
+        fetched = fetch()
+    except Exception:
+        if fallback is not None:
+            return fallback
+        raise
+    timings = _PHASE_TIMINGS.get()
+    if timings is not None:
+        timings["dispatch"] = time.perf_counter() - started
+    if isinstance(fetched, Response):
+        if fetched.status_code >= 500 and fallback is not None:
+            return fallback
+        return fetched
+    status, html = fetched
+    if status >= 500 and fallback is not None:
+        return fallback  # stale-if-error
+    if status >= 400:
+        return Response(
+            f"# {status}\n{error_message}\n",
+            status=status,
+            mimetype="text/markdown",
+        )
+
+    source_hash = content_hash(html, deps)
+    if entry is not None and entry.source_hash == source_hash:
+        return _RENDER_CACHE.touch(key, entry)
+    entry = CacheEntry.build(render(html), source_hash, deps=deps)
+    _RENDER_CACHE.set(key, entry)
+    return entry
+
+
+def _observe_response(route: str, resp: Response) -> Response:
+    if _METRICS is not None:
+        _METRICS.observe_response(
+            route, resp.status_code, resp.calculate_content_length() or 0
+        )
+    return resp
+
+
+def _observe_blueprint_response(resp: Response) -> Response:
+    return _observe_response(g.get("llms_route", "unmatched"), resp)
+
+
+def _serve_negotiated(
+    view_func: Callable,
+    args: tuple,
+    kwargs: dict,
+    *,
+    template_dir: str | None,
+    template_name: str,
+    mount_prefix: str,
+    ttl: float | None,
+    stale: Tuple[float, float],
+) -> Response:
+    """Convert the view's own HTML response to Markdown in-line (no re-dispatch)."""
+    _refresh_allowed_paths(current_app)
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    base = f"{request.scheme}://{request.host}"
+    path = request.path
+
+    def fetch() -> Tuple[int, str] | Response:
+        resp = current_app.make_response(view_func(*args, **kwargs))
+        if resp.status_code != 200 or resp.mimetype != "text/html":
+            return resp  # redirects, errors and non-HTML bodies pass through
+        return resp.status_code, resp.get_data(as_text=True)
+
+    return _serve_cached(
+        (base, path, _template_key(template_dir, template_name)),
+        ttl=ttl,
+        deps=_render_deps(template_dir, template_name),
+        fetch=fetch,
+        error_message=f"Failed to render `{path}`.",
+        stale=stale,
+        # Background refreshes have no request to call the view in
+        refresh=lambda: _dispatch_html(app, path),
+        render=lambda html: _render_markdown(
+            html,
+            template_dir=template_dir,
+            template_name=template_name,
+            base=base,
+            source_path=path,
+            mount_prefix=mount_prefix,
+            capture=True,
+        ),
+    )
+
+
+def _template_fingerprint(template_dir: str | None, template_name: str) -> str:
+    return _get_generator(template_dir, template_name)[1]
+
+
+def _resolve_manifest_source(app: Flask) -> str | None:
+    """Resolve the (non-parameterized) rule of the page the manifest is built from."""
+    page_path = _MANIFEST_CONFIG.get("source_rule")
+    source_endpoint = _MANIFEST_CONFIG.get("source_endpoint")
+    if page_path or not source_endpoint:
+        return page_path
+
+    # Memoized per URL map version: the lookup is a scan over every rule
+    signature = (id(app.url_map), _url_map_size(app))
+    resolved = _MANIFEST_MEMOS.source
+    if resolved is not None and resolved[0] == signature:
+        return resolved[1]
+    try:
+        for rule in app.url_map.iter_rules():
+            if rule.endpoint == source_endpoint and "<" not in rule.rule:
+                page_path = rule.rule
+                break
+    except Exception:
+        page_path = None
+    _MANIFEST_MEMOS.source = (signature, page_path)
+    return page_path
+
+
+def _check_stale(
+    cache_ttl: float | None, stale_while_revalidate: float, stale_if_error: float
+) -> None:
+    if stale_while_revalidate < 0 or stale_if_error < 0:
+        raise ValueError("stale windows must be >= 0")
+    if cache_ttl is None and (stale_while_revalidate or stale_if_error):
+        raise ValueError("stale windows require cache_ttl")
+
+
+def _set_limiter(limiter: RenderLimiter | None) -> None:
+    global _RENDER_LIMITER
+    if limiter is not None:
+        _RENDER_LIMITER = limiter
+
+
+def _ensure_cli(app: Flask) -> None:
+    """Expose ``flask llms ...`` once the middleware is attached to ``app``."""
+    # Imported lazily: the exporter itself builds on this module
+    from open_llms_txt.middleware.export import llms_cli
+
+    if llms_cli.name not in app.cli.commands:
+        app.cli.add_command(llms_cli)
 
 
 def _ensure_html2md_blueprint(
@@ -34,6 +786,9 @@ def _ensure_html2md_blueprint(
     if _BLUEPRINT_MOUNTED:
         return
 
+    _MIRROR_CONFIG.update(
+        template_dir=template_dir, template_name=template_name, mount_prefix=url_prefix
+    )
     bp = Blueprint("html2md_manifest", __name__, url_prefix=url_prefix)
 
     @bp.get(blueprint_rule)
@@ -41,53 +796,58 @@ def _ensure_html2md_blueprint(
         target_path = f"/{raw}"
 
         # Checking allowed paths
-        try:
-            rules = list(current_app.url_map.iter_rules())
-            _ALLOWED_PATHS.clear()
-            for rule in rules:
-                if rule.endpoint in _DECORATED_ENDPOINTS:
-                    if (
-                        not _ENDPOINT_POLICY.get(rule.endpoint, False)
-                        and "<" in rule.rule
-                    ):
-                        continue
-                    _ALLOWED_PATHS.add(rule.rule)
-        except Exception:
-            pass
+        _refresh_allowed_paths(current_app)
 
-        if target_path not in _ALLOWED_PATHS:
+        rule = _match_allowed_rule(target_path)
+        if rule is None:
             return Response(
                 "# 404\nMarkdown mirror not enabled for this path.\n",
                 status=404,
                 mimetype="text/markdown",
             )
 
-        client = current_app.test_client()
-        html_resp = client.get(target_path, headers={"Accept": "text/html"})
-        if html_resp.status_code >= 400:
-            return Response(
-                f"# {html_resp.status_code}\nFailed to render `{target_path}`.\n",
-                status=html_resp.status_code,
-                mimetype="text/markdown",
-            )
-
-        html = html_resp.get_data(as_text=True)
+        g.llms_route = rule
+        endpoint = _PATH_ENDPOINTS.get(rule, "")
         base = f"{request.scheme}://{request.host}"
-        source_url = urljoin(base, target_path)
-
-        generator = HtmlToMdGenerator(
-            template_dir=template_dir, template_name=template_name
+        return _serve_cached(
+            (base, target_path, _template_key(template_dir, template_name)),
+            ttl=_ENDPOINT_CACHE_TTL.get(endpoint),
+            stale=_ENDPOINT_STALE.get(endpoint, (0.0, 0.0)),
+            deps=_render_deps(template_dir, template_name),
+            fetch=lambda: _dispatch_html(current_app, target_path),
+            error_message=f"Failed to render `{target_path}`.",
+            render=lambda html: _render_markdown(
+                html,
+                template_dir=template_dir,
+                template_name=template_name,
+                base=base,
+                source_path=target_path,
+                mount_prefix=url_prefix,
+                capture=True,
+            ),
         )
-        md = generator.render(
-            html,
-            root_url=base,
-            source_url=source_url,
-            allowed_paths=sorted(_ALLOWED_PATHS),
-            mount_prefix=url_prefix,
-        )
-        return Response(md, mimetype="text/markdown; charset=utf-8")
 
+    # Werkzeug prefers an app rule such as `/blog/<slug>` over the mirror rule
+    # for `/blog/hello.html.md`: claim the request when its path is mirrored
+    prefixed = "/".join((url_prefix.rstrip("/"), blueprint_rule.lstrip("/")))
+    mirror_rules = Map([Rule(prefixed, endpoint=_MIRROR_ENDPOINT)]).bind("")
+
+    def _claim_shadowed_mirror() -> Response | None:
+        if request.endpoint == _MIRROR_ENDPOINT:
+            return None
+        try:
+            _, values = mirror_rules.match(request.path)
+        except HTTPException:
+            return None
+        _refresh_allowed_paths(current_app)
+        if _match_allowed_rule(f"/{values['raw']}") is None:
+            return None
+        return _observe_blueprint_response(_html2md_manifest(values["raw"]))
+
+    bp.after_request(_observe_blueprint_response)
     app.register_blueprint(bp)
+    app.before_request(_claim_shadowed_mirror)
+    _ensure_cli(app)
     _BLUEPRINT_MOUNTED = True
 
 
@@ -99,6 +859,16 @@ def html2md(
     mount_prefix: str = "",
     blueprint_rule: str = "/<path:raw>.html.md",
     allow_param_routes: bool = False,
+    cache_ttl: float | None = None,
+    negotiate: bool = False,
+    limiter: RenderLimiter | None = None,
+    url_values: Callable[[], Iterable[Dict[str, Any]]] | None = None,
+    stale_while_revalidate: float = 0.0,
+    stale_if_error: float = 0.0,
+    title: str = "",
+    description: str = "",
+    section: str = "",
+    priority: float = 0.0,
 ) -> Callable[[Callable], Callable]:
     """
     Opt-in decorator that exposes a Markdown "mirror" for a Flask endpoint.
@@ -135,7 +905,48 @@ def html2md(
     allow_param_routes : bool, optional
         If ``False`` (default), parameterized routes (containing ``<...>``) are
         **excluded** from the allow-list for safety and predictability. Set to
-        ``True`` to mirror concrete requests to dynamic routes you trust.
+        ``True`` to mirror concrete requests to dynamic routes you trust; they
+        are matched against the rule with Werkzeug's URL matcher (e.g.
+        ``/blog/hello.html.md`` for ``/blog/<slug>``). Mirror URLs that the
+        route itself would also match are answered by the mirror.
+    cache_ttl : float | None, optional
+        Seconds a rendered mirror is served from the render cache without calling
+        the view at all. If ``None`` (default), the view runs on every request and
+        the cached render is reused only while the HTML hash is unchanged.
+    negotiate : bool, optional
+        If ``True``, the original route also answers with Markdown when the
+        request's ``Accept`` header prefers ``text/markdown`` over HTML. The view's
+        own response is converted in-line (through the render cache, shared with
+        the ``.html.md`` mirror) and both representations carry ``Vary: Accept``.
+        Defaults to ``False``.
+    limiter : RenderLimiter | None, optional
+        Process-wide concurrency cap and bounded queue for mirror and manifest
+        renders. Requests that cannot get a slot receive a fast ``503`` with
+        ``Retry-After``; fresh cache hits never wait. The last limiter passed to
+        ``@html2md``/``@llmstxt`` wins.
+    url_values : Callable[[], Iterable[dict]] | None, optional
+        For parameterized routes, a callable yielding rule values (e.g.
+        ``{"slug": "hello"}``) whose concrete URLs are listed in the manifest,
+        passed to templates as ``allowed_paths`` and exported by
+        :func:`export_static`. It runs when the allow-list is rebuilt (URL map
+        or decorator changes, or :func:`invalidate`). Requires
+        ``allow_param_routes=True``.
+    stale_while_revalidate : float, optional
+        Seconds past ``cache_ttl`` during which an expired mirror is still
+        served immediately while a single background thread re-renders it.
+        Requires ``cache_ttl``. Defaults to ``0`` (disabled).
+    stale_if_error : float, optional
+        Seconds past ``cache_ttl`` during which an expired mirror is served
+        instead of an upstream 5xx (or an exception raised by the view, or a
+        shed request). Requires ``cache_ttl``. Defaults to ``0`` (disabled).
+    title, description : str, optional
+        How the page is listed in manifests (``metadata.routes``). When empty,
+        they are captured from the page's ``<h1>``/``<title>`` and first
+        paragraph the next time its mirror is rendered.
+    section : str, optional
+        Free-form group name for manifest templates. Defaults to ``""``.
+    priority : float, optional
+        Manifest ordering: higher values are listed first. Defaults to ``0``.
 
     Returns
     -------
@@ -146,7 +957,8 @@ def html2md(
     Raises
     ------
     ValueError
-        If ``template_name`` is empty.
+        If ``template_name`` is empty, ``url_values`` is given without
+        ``allow_param_routes``, or a stale window is set without ``cache_ttl``.
 
     Notes
     -----
@@ -155,12 +967,16 @@ def html2md(
       the internal blueprint once per process. Running multiple Flask apps in the
       same Python process is not supported without additional isolation.
     - **Performance:** Each Markdown request issues an internal HTTP request via
-      ``app.test_client()`` to render the original HTML; budget accordingly.
+      ``app.test_client()`` to render the original HTML (unless a fresh cache
+      entry exists); budget accordingly. Parse, template and compression work
+      happen once per content version.
     - **Security:** Only explicitly decorated endpoints are mirrored. If you
       enable ``allow_param_routes=True``, ensure your templates and routes handle
       untrusted parameters safely.
     - **Content Negotiation:** The mirror is served as
       ``text/markdown; charset=utf-8`` and returns 4xx/5xx Markdown bodies on error.
+      gzip (and brotli/zstd when installed) variants are stored with each cached
+      render and picked from ``Accept-Encoding`` (``Vary: Accept-Encoding``).
 
     Examples
     --------
@@ -183,7 +999,11 @@ def html2md(
     """
     if not template_name:
         raise ValueError("template_name is required")
+    if url_values is not None and not allow_param_routes:
+        raise ValueError("url_values requires allow_param_routes=True")
+    _check_stale(cache_ttl, stale_while_revalidate, stale_if_error)
 
+    _set_limiter(limiter)
     _ensure_html2md_blueprint(
         app,
         template_dir=template_dir,
@@ -195,12 +1015,41 @@ def html2md(
     def decorator(view_func: Callable) -> Callable:
         # Record that this endpoint has opted in (route may not be registered yet)
         endpoint = view_func.__name__
-        _DECORATED_ENDPOINTS.add(endpoint)
-        _ENDPOINT_POLICY[endpoint] = allow_param_routes
+        _register_endpoint(
+            endpoint,
+            allow_param_routes,
+            cache_ttl,
+            url_values,
+            (stale_while_revalidate, stale_if_error),
+            RouteMeta(title, description, section, priority),
+        )
 
         @wraps(view_func)
         def wrapper(*args, **kwargs):
-            return view_func(*args, **kwargs)
+            if not negotiate:
+                return view_func(*args, **kwargs)
+
+            rule = request.url_rule.rule if request.url_rule else ""
+            wants_md = prefers_markdown(request.headers.get("Accept")) and (
+                allow_param_routes or "<" not in rule
+            )
+            if wants_md:
+                g.llms_route = rule or request.path
+                resp = _serve_negotiated(
+                    view_func,
+                    args,
+                    kwargs,
+                    template_dir=template_dir,
+                    template_name=template_name,
+                    mount_prefix=mount_prefix or "",
+                    ttl=cache_ttl,
+                    stale=(stale_while_revalidate, stale_if_error),
+                )
+                _observe_response(rule or request.path, resp)
+            else:
+                resp = current_app.make_response(view_func(*args, **kwargs))
+            resp.vary.add("Accept")
+            return resp
 
         return wrapper
 
@@ -216,50 +1065,84 @@ def _ensure_llmstxt_blueprint(
     mount_prefix: str = "",
     source_endpoint: str | None = None,
     source_rule: str | None = None,
+    cache_ttl: float | None = None,
+    stale: Tuple[float, float] = (0.0, 0.0),
+    shard_by: ShardBy | None = None,
+    shard_template_name: str = "llms_shard.txt.jinja",
+    from_registry: bool = False,
+    title: str | None = None,
+    description: str | None = None,
 ) -> None:
     """
     Mount a manifest route (default '/llms.txt') that:
       1) rebuilds the same allow-list used by .html.md
       2) fetches the HTML of the *decorated* endpoint (index page)
       3) renders the manifest template *based on that HTML*
+    With ``shard_by``, also mount one sub-manifest per section
+    (``/llms/<section>.txt``), each rendered and cached on its own.
     """
     if not template_name:
         raise ValueError("template_name is required")
     if not manifest_path.startswith("/"):
         raise ValueError("manifest_path must start with '/'")
+    if not (shard_by is None or callable(shard_by) or shard_by in SHARD_MODES):
+        raise ValueError(f"shard_by must be one of {SHARD_MODES} or a callable")
 
     global _MANIFEST_BP_MOUNTED
     if _MANIFEST_BP_MOUNTED:
         return
 
+    _MANIFEST_MEMOS.clear()
+    _MANIFEST_CONFIG.update(
+        template_dir=template_dir,
+        template_name=template_name,
+        manifest_path=manifest_path,
+        mount_prefix=mount_prefix or "",
+        source_endpoint=source_endpoint,
+        source_rule=source_rule,
+        cache_ttl=cache_ttl,
+        stale=stale,
+        shard_by=shard_by,
+        shard_template_name=shard_template_name,
+        from_registry=from_registry,
+        title=title,
+        description=description,
+    )
     bp = Blueprint("llmstxt_manifest", __name__)
 
     @bp.get(manifest_path)
     def _llmstxt_manifest():
+        g.llms_route = manifest_path
         # 1) Rebuild concrete allowed paths from decorated endpoints
-        try:
-            rules = list(current_app.url_map.iter_rules())
-            _ALLOWED_PATHS.clear()
-            for rule in rules:
-                ep = rule.endpoint
-                if ep in _DECORATED_ENDPOINTS:
-                    if (not _ENDPOINT_POLICY.get(ep, False)) and "<" in rule.rule:
-                        continue
-                    _ALLOWED_PATHS.add(rule.rule)
-        except Exception:
-            pass
+        _refresh_allowed_paths(current_app)
 
-        # 2) Resolve the HTML source route for the manifest (the page you decorated)
-        page_path = source_rule
-        if not page_path and source_endpoint:
-            try:
-                for rule in current_app.url_map.iter_rules():
-                    if rule.endpoint == source_endpoint and "<" not in rule.rule:
-                        page_path = rule.rule
-                        break
-            except Exception:
-                page_path = None
+        base = f"{request.scheme}://{request.host}"
+        extra = {"shards": _shard_index(base)} if shard_by is not None else {}
+        if from_registry:
+            routes = _registry_entries(base, mount_prefix or "")
+            # Built from the route registry alone: no view runs, and the
+            # serialized entries play the part of the source HTML
+            return _serve_cached(
+                (base, manifest_path, _template_key(template_dir, template_name)),
+                ttl=cache_ttl,
+                stale=stale,
+                deps=_render_deps(template_dir, template_name),
+                fetch=lambda: (200, routes),
+                error_message="Failed to render the manifest.",
+                render=lambda payload: _render_from_registry(
+                    payload,
+                    template_dir=template_dir,
+                    template_name=template_name,
+                    base=base,
+                    mount_prefix=mount_prefix or "",
+                    title=title or request.host,
+                    description=description or "",
+                    extra_metadata=extra,
+                ),
+            )
 
+        # 2) Resolve the HTML source route for the manifest (the page you decorated)
+        page_path = _resolve_manifest_source(current_app)
         if not page_path:
             return Response(
                 "# 500\nUnable to resolve source page for llms.txt.\n",
@@ -267,38 +1150,69 @@ def _ensure_llmstxt_blueprint(
                 mimetype="text/markdown",
             )
 
-        # Fetch that page's HTML
-        client = current_app.test_client()
-        html_resp = client.get(page_path, headers={"Accept": "text/html"})
-        if html_resp.status_code >= 400:
-            return Response(
+        # 3) Render your llms.txt template based on that page's HTML (parser
+        # extracts links), using the *source page* as the canonical source_url
+        return _serve_cached(
+            (base, manifest_path, _template_key(template_dir, template_name)),
+            ttl=cache_ttl,
+            stale=stale,
+            deps=_render_deps(template_dir, template_name),
+            fetch=lambda: _dispatch_html(current_app, page_path),
+            error_message=f"Failed to render `{page_path}` for manifest.",
+            render=lambda html: _render_markdown(
+                html,
+                template_dir=template_dir,
+                template_name=template_name,
+                base=base,
+                source_path=page_path,
+                mount_prefix=mount_prefix or "",
+                extra_metadata=extra,
+            ),
+        )
+
+    if shard_by is not None:
+        shard_rule = shard_path(manifest_path, "<section>")
+
+        @bp.get(shard_rule)
+        def _llmstxt_shard(section: str):
+            g.llms_route = shard_rule
+            _refresh_allowed_paths(current_app)
+            paths = _manifest_shards().get(section)
+            if paths is None:
+                return Response(
+                    "# 404\nNo such manifest section.\n",
+                    status=404,
+                    mimetype="text/markdown",
+                )
+
+            shard_dir = _shard_template_dir(template_dir, shard_template_name)
+            base = f"{request.scheme}://{request.host}"
+            # The payload is the section's path list: only sections whose paths
+            # changed are re-rendered
+            return _serve_cached(
                 (
-                    f"# {html_resp.status_code}\n"
-                    f"Failed to render `{page_path}` for manifest.\n"
+                    base,
+                    shard_path(manifest_path, section),
+                    _template_key(shard_dir, shard_template_name),
+                ),
+                ttl=cache_ttl,
+                stale=stale,
+                deps=_template_fingerprint(shard_dir, shard_template_name),
+                fetch=lambda: (200, "\n".join(paths)),
+                error_message=f"Failed to render section `{section}`.",
+                render=lambda payload: _render_shard(
+                    payload,
+                    section=section,
+                    template_dir=shard_dir,
+                    template_name=shard_template_name,
+                    base=base,
+                    mount_prefix=mount_prefix or "",
                 ),
-                status=html_resp.status_code,
-                mimetype="text/markdown",
             )
 
-        html = html_resp.get_data(as_text=True)
-        base = f"{request.scheme}://{request.host}"
-        # Use the *source page* as the canonical source_url for the manifest render
-        source_url = urljoin(base, page_path)
-
-        # 3) Render your llms.txt template based on that HTML (parser extracts links)
-        generator = HtmlToMdGenerator(
-            template_dir=template_dir, template_name=template_name
-        )
-        md = generator.render(
-            html,
-            root_url=base,
-            source_url=source_url,
-            allowed_paths=sorted(_ALLOWED_PATHS),
-            mount_prefix=mount_prefix or "",
-        )
-        return Response(md, mimetype="text/markdown; charset=utf-8")
-
+    bp.after_request(_observe_blueprint_response)
     app.register_blueprint(bp)
+    _ensure_cli(app)
     _MANIFEST_BP_MOUNTED = True
 
 
@@ -309,6 +1223,15 @@ def llmstxt(
     template_name: str,
     mount_prefix: str = "",
     manifest_path: str = "/llms.txt",
+    cache_ttl: float | None = None,
+    limiter: RenderLimiter | None = None,
+    stale_while_revalidate: float = 0.0,
+    stale_if_error: float = 0.0,
+    shard_by: ShardBy | None = None,
+    shard_template_name: str = "llms_shard.txt.jinja",
+    from_registry: bool = False,
+    title: str | None = None,
+    description: str | None = None,
 ) -> Callable[[Callable], Callable]:
     """
     Decorator that keeps the original endpoint as-is (serving HTML) and also
@@ -339,6 +1262,36 @@ def llmstxt(
     manifest_path : str, optional
         Absolute URL rule at which the manifest is exposed. Must start with ``"/"``.
         Defaults to ``"/llms.txt"``.
+    cache_ttl : float | None, optional
+        Seconds the rendered manifest is served from cache without dispatching
+        the source page. ``None`` (default) revalidates by the source HTML hash.
+    limiter : RenderLimiter | None, optional
+        Concurrency cap shared with the mirrors (see ``html2md``).
+    stale_while_revalidate, stale_if_error : float, optional
+        Serve an expired manifest while it is re-rendered in the background, or
+        instead of an upstream failure (see ``html2md``).
+    shard_by : str | Callable[[str, str], str | None] | None, optional
+        Split the manifest for large sites: ``"prefix"`` groups mirrors by their
+        first path segment, ``"blueprint"`` by blueprint, and a callable maps
+        ``(path, endpoint)`` to a section name. The root manifest then gets
+        ``metadata.shards`` (name, path, url, count), which the packaged
+        template lists instead of every page. Each section is served at
+        ``/llms/<section>.txt`` (next to ``manifest_path``) and is rendered and
+        cached independently, so a change in one section only rebuilds that
+        shard. Defaults to ``None`` (a single manifest).
+    shard_template_name : str, optional
+        Template for section manifests, looked up in ``template_dir`` and then
+        in the packaged templates. It receives ``metadata.section``,
+        ``metadata.paths`` and the root manifest's ``metadata.manifest_url``.
+        Defaults to ``"llms_shard.txt.jinja"``.
+    from_registry : bool, optional
+        Build the manifest from the route registry only: the decorated view is
+        never executed and, instead of the page's links, the template gets
+        ``metadata.routes`` (see Notes). Defaults to ``False`` (render from the
+        decorated page's HTML).
+    title, description : str | None, optional
+        Heading and summary of a registry-built manifest (passed to the template
+        as ``title`` and ``paragraphs``). The title defaults to the request host.
 
     Returns
     -------
@@ -350,18 +1303,31 @@ def llmstxt(
     Raises
     ------
     ValueError
-        If ``template_name`` is empty or ``manifest_path`` does not start with ``"/"``.
+        If ``template_name`` is empty, ``manifest_path`` does not start with ``"/"``
+        or a stale window is set without ``cache_ttl``.
 
     Notes
     -----
     - The manifest uses the **decorated endpoint's HTML** as its canonical source,
       so your Jinja template can discover links (e.g., via parsing) and then
       cross-reference the allow-list to include only mirrored pages.
-    - The allow-list is rebuilt from the app's URL map on each manifest request,
-      so newly decorated routes appear without restarting.
+    - The allow-list is rebuilt from the app's URL map whenever the map or the
+      set of decorated endpoints changes, so newly decorated routes appear
+      without restarting.
+    - The rendered manifest is cached per host. It is rebuilt only when the URL
+      map, the decorated set, the template or the source page's HTML hash
+      changes; with ``cache_ttl`` the source page is not even dispatched until
+      the entry expires. Call :func:`invalidate` from deploy hooks to force a
+      rebuild.
     - Module-level state is used to mount the manifest blueprint once per process.
     - If multiple rules map to the decorated endpoint, a non-parameterized rule
       is preferred as the canonical ``source_url``.
+    - With ``from_registry=True`` the template receives ``metadata.routes``:
+      one dict per mirrored page (``path``, ``url``, ``title``,
+      ``description``, ``section``, ``priority``), highest priority first, built
+      in O(routes). Metadata declared on ``@html2md`` wins; missing titles and
+      descriptions are filled from the page's last mirror render in this
+      process (or export run), so declare them for a complete first manifest.
 
     Example
     -------
@@ -384,6 +1350,9 @@ def llmstxt(
     if not template_name:
         raise ValueError("template_name is required")
 
+    _check_stale(cache_ttl, stale_while_revalidate, stale_if_error)
+    _set_limiter(limiter)
+
     def decorator(view_func: Callable) -> Callable:
         # Discover a concrete rule for the decorated HTML endpoint
         # (prefer non-parameterized)
@@ -405,6 +1374,13 @@ def llmstxt(
             mount_prefix=mount_prefix,
             source_endpoint=endpoint,
             source_rule=discovered_rule,
+            cache_ttl=cache_ttl,
+            stale=(stale_while_revalidate, stale_if_error),
+            shard_by=shard_by,
+            shard_template_name=shard_template_name,
+            from_registry=from_registry,
+            title=title,
+            description=description,
         )
 
         @wraps(view_func)
@@ -415,3 +1391,131 @@ def llmstxt(
         return wrapper
 
     return decorator
+
+
+def enable_metrics(
+    app: Flask, path: str | None = "/.llms/metrics"
+) -> MiddlewareMetrics:
+    """
+    Opt in to middleware metrics and (optionally) expose them for scraping.
+
+    Records per-route render latency histograms split by phase (``dispatch``,
+    ``parse``, ``template``), render cache hits/revalidations/misses, response
+    bytes, 2xx/4xx/5xx counts and in-flight renders, plus the limiter and
+    request-coalescing counters. Nothing is recorded until this is called.
+
+    Parameters
+    ----------
+    app : flask.Flask
+        The Flask application instance.
+    path : str | None, optional
+        Rule serving the metrics in the Prometheus text format. Defaults to
+        ``"/.llms/metrics"``. Pass ``None`` to only get the registry object (e.g.
+        to render it from your own authenticated endpoint).
+
+    Returns
+    -------
+    MiddlewareMetrics
+        The process-wide instruments; ``.render()`` returns the exposition text.
+    """
+    global _METRICS
+    if _METRICS is None:
+        metrics = MiddlewareMetrics()
+        metrics.add_stats_source(
+            "llms_limiter",
+            lambda: _RENDER_LIMITER.stats() if _RENDER_LIMITER is not None else {},
+        )
+        metrics.add_stats_source("llms_coalescing", _SINGLE_FLIGHT.stats)
+        _METRICS = metrics
+
+    if path is not None and "llms_metrics" not in app.blueprints:
+        bp = Blueprint("llms_metrics", __name__)
+
+        @bp.get(path)
+        def _llms_metrics():
+            return Response(
+                _METRICS.render() if _METRICS is not None else "",
+                mimetype="text/plain; version=0.0.4; charset=utf-8",
+            )
+
+        app.register_blueprint(bp)
+    return _METRICS
+
+
+def use_render_cache(cache: CacheBackend) -> None:
+    """
+    Replace the in-process render cache, e.g. with a
+    :class:`~open_llms_txt.middleware.sqlite_cache.SqliteRenderCache` shared by
+    every worker process on the host. Call it at import time, before serving.
+
+    Parameters
+    ----------
+    cache : CacheBackend
+        Any object implementing the :class:`RenderCache` interface.
+    """
+    global _RENDER_CACHE
+    _RENDER_CACHE = cache
+
+
+def invalidate(path: str | None = None) -> int:
+    """
+    Drop cached renders so the next request rebuilds them, e.g. from a deploy
+    hook after content changed.
+
+    Parameters
+    ----------
+    path : str | None, optional
+        Only drop entries for this path (a mirrored rule such as ``"/docs"`` or
+        the manifest path such as ``"/llms.txt"``), for every host. If ``None``
+        (default), drop every cached mirror and manifest and force the
+        allow-list and templates to be reloaded. Captured route metadata for
+        the path (or every path) is forgotten as well.
+
+    Returns
+    -------
+    int
+        Number of cache entries dropped.
+    """
+    global _ALLOWLIST_SIGNATURE
+    if path is not None:
+        _ROUTE_REGISTRY.forget(path)
+        return _RENDER_CACHE.invalidate_matching(lambda key: key[1] == path)
+
+    _ROUTE_REGISTRY.forget()
+    dropped = len(_RENDER_CACHE)
+    _RENDER_CACHE.invalidate()
+    _GENERATORS.clear()
+    _ALLOWLIST_SIGNATURE = None
+    return dropped
+
+
+def _reset_state() -> None:
+    """Forget every registration and cached render (used by the test suite)."""
+    global _ALLOWLIST, _ALLOWLIST_SIGNATURE, _ALLOWLIST_DIGEST, _HAS_PARAM_RULES
+    global _BLUEPRINT_MOUNTED, _MANIFEST_BP_MOUNTED, _DECORATED_VERSION
+    global _RENDER_CACHE, _RENDER_LIMITER, _METRICS
+    for registered in (
+        _ALLOWED_PATHS,
+        _DECORATED_ENDPOINTS,
+        _ENDPOINT_POLICY,
+        _ENDPOINT_CACHE_TTL,
+        _ENDPOINT_STALE,
+        _PATH_ENDPOINTS,
+        _ENDPOINT_URL_VALUES,
+        _MIRROR_CONFIG,
+        _MANIFEST_CONFIG,
+        _REVALIDATING,
+    ):
+        registered.clear()
+    _ROUTE_REGISTRY.clear()
+    _MANIFEST_MEMOS.clear()
+    _GENERATORS.clear()
+    _ALLOWLIST = AllowList()
+    _ALLOWLIST_SIGNATURE = None
+    _ALLOWLIST_DIGEST = ""
+    _HAS_PARAM_RULES = False
+    _BLUEPRINT_MOUNTED = _MANIFEST_BP_MOUNTED = False
+    _DECORATED_VERSION = 0
+    _RENDER_CACHE = RenderCache()
+    _RENDER_LIMITER = None
+    _METRICS = None
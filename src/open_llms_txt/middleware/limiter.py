@@ -0,0 +1,159 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# User agents of well-known LLM / search crawlers
+CRAWLER_UA_PATTERN = re.compile(
+    r"bot|crawl|spider|slurp|gpt|claude|anthropic|perplexity|bytespider|ccbot",
+    re.IGNORECASE,
+)
+
+Classifier = Callable[[Optional[str], Optional[str]], str]
+
+
+def classify_by_user_agent(
+    user_agent: Optional[str], remote_addr: Optional[str]
+) -> str:
+    """Default classifier: ``crawler`` for bot-like user agents, else ``default``."""
+    if user_agent and CRAWLER_UA_PATTERN.search(user_agent):
+        return "crawler"
+    return "default"
+
+
+class RenderLimiter:
+    """
+    Concurrency cap with a bounded wait queue for expensive renders.
+
+    At most ``max_concurrency`` renders run at once (and at most
+    ``class_limits[cls]`` for a given client class). Up to ``max_queue`` further
+    requests wait for a slot for ``queue_timeout`` seconds; anything beyond that
+    is shed immediately so the worker can return a fast ``503``.
+
+    Parameters
+    ----------
+    max_concurrency : int
+        Global number of concurrent renders.
+    max_queue : int
+        Number of requests allowed to wait for a slot. ``0`` sheds as soon as
+        every slot is busy.
+    queue_timeout : float
+        Seconds a queued request waits before being shed.
+    retry_after : int
+        Value of the ``Retry-After`` header sent with shed responses.
+    class_limits : dict[str, int] | None
+        Per-client-class concurrency caps, e.g. ``{"crawler": 2}``.
+    classify : Callable[[str | None, str | None], str] | None
+        Maps ``(user_agent, remote_addr)`` to a client class. Defaults to
+        :func:`classify_by_user_agent`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        *,
+        max_queue: int = 16,
+        queue_timeout: float = 5.0,
+        retry_after: int = 1,
+        class_limits: Optional[Dict[str, int]] = None,
+        classify: Optional[Classifier] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be >= 0")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.class_limits: Dict[str, int] = dict(class_limits or {})
+        self.classify: Classifier = classify or classify_by_user_agent
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._in_flight_by_class: Counter[str] = Counter()
+        self._queued_by_class: Counter[str] = Counter()
+        self._admitted = 0
+        self._shed_by_class: Counter[str] = Counter()
+        self._max_queue_depth = 0
+
+    def _has_slot(self, client_class: str) -> bool:
+        if self._in_flight >= self.max_concurrency:
+            return False
+        limit = self.class_limits.get(client_class)
+        return limit is None or self._in_flight_by_class[client_class] < limit
+
+    def _take(self, client_class: str) -> None:
+        self._in_flight += 1
+        self._in_flight_by_class[client_class] += 1
+        self._admitted += 1
+
+    def acquire(self, client_class: str = "default") -> bool:
+        """Wait for a render slot; ``False`` means the request was shed."""
+        with self._cond:
+            if self._has_slot(client_class):
+                self._take(client_class)
+                return True
+            if self._queued >= self.max_queue:
+                self._shed_by_class[client_class] += 1
+                return False
+
+            self._queued += 1
+            self._queued_by_class[client_class] += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queued)
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while not self._has_slot(client_class):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._shed_by_class[client_class] += 1
+                        return False
+                    self._cond.wait(remaining)
+                self._take(client_class)
+                return True
+            finally:
+                self._queued -= 1
+                self._queued_by_class[client_class] -= 1
+
+    def release(self, client_class: str = "default") -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._in_flight_by_class[client_class] -= 1
+            # Waiters may be blocked on different class caps: wake them all
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, client_class: str = "default") -> Iterator[bool]:
+        """``with limiter.slot(cls) as admitted:`` releases only admitted slots."""
+        admitted = self.acquire(client_class)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(client_class)
+
+    def stats(self) -> Dict[str, Any]:
+        """Point-in-time counters (queue depth, in-flight, shed) for metrics."""
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queue_depth,
+                "admitted": self._admitted,
+                "shed": sum(self._shed_by_class.values()),
+                "in_flight_by_class": {
+                    k: v for k, v in self._in_flight_by_class.items() if v
+                },
+                "queued_by_class": {
+                    k: v for k, v in self._queued_by_class.items() if v
+                },
+                "shed_by_class": dict(self._shed_by_class),
+            }
@@ -0,0 +1,321 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, TypeVar
+
+# Seconds; tuned for renders that range from sub-millisecond cache work to
+# multi-second view dispatches
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f"{name}{{{rendered}}} {_format_value(value)}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                (f"{self.name}_total", self._labels(k), v)
+                for k, v in sorted(self._values.items())
+            ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                (self.name, self._labels(k), v) for k, v in sorted(self._values.items())
+            ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    samples.append(
+                        (
+                            f"{self.name}_bucket",
+                            {**labels, "le": _format_value(bound)},
+                            cumulative,
+                        )
+                    )
+                samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text format,
+    with no external library or service involved.
+
+    ``collectors`` are callables evaluated at scrape time, returning extra
+    ``(name, kind, documentation, samples)`` families (e.g. limiter stats).
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[
+            Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+        ] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: M) -> M:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name!r} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(
+        self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+    ) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [(m.name, m.kind, m.documentation, m.samples()) for m in metrics]
+        for collector in collectors:
+            families.extend(collector())
+
+        lines: List[str] = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(_format_sample(n, labels, v) for n, labels, v in samples)
+        return "\n".join(lines) + "\n"
+
+
+class MiddlewareMetrics:
+    """
+    Instruments shared by the framework adapters: per-route render latency split
+    by phase (``dispatch``, ``parse``, ``template``), cache results, response
+    bytes and status classes, in-flight renders and failed background
+    revalidations.
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None):
+        self.registry = registry or MetricsRegistry()
+        self.render_seconds = self.registry.histogram(
+            "llms_render_seconds",
+            "Mirror/manifest render latency by route and phase.",
+            ("route", "phase"),
+        )
+        self.cache_requests = self.registry.counter(
+            "llms_cache_requests",
+            "Render cache lookups by route and result (hit, revalidated, miss).",
+            ("route", "result"),
+        )
+        self.response_bytes = self.registry.counter(
+            "llms_response_bytes",
+            "Bytes sent in mirror/manifest responses by route.",
+            ("route",),
+        )
+        self.responses = self.registry.counter(
+            "llms_responses",
+            "Mirror/manifest responses by route and status class.",
+            ("route", "status"),
+        )
+        self.in_flight = self.registry.gauge(
+            "llms_renders_in_flight", "Renders currently running."
+        )
+        self.revalidation_failures = self.registry.counter(
+            "llms_revalidation_failures",
+            "Background (stale-while-revalidate) re-renders that failed, by route.",
+            ("route",),
+        )
+
+    def observe_phase(self, route: str, phase: str, seconds: float) -> None:
+        self.render_seconds.observe(seconds, route=route, phase=phase)
+
+    def cache_result(self, route: str, result: str) -> None:
+        self.cache_requests.inc(route=route, result=result)
+
+    def observe_response(self, route: str, status: int, nbytes: int) -> None:
+        self.responses.inc(route=route, status=f"{status // 100}xx")
+        self.response_bytes.inc(nbytes, route=route)
+
+    def revalidation_failed(self, route: str) -> None:
+        self.revalidation_failures.inc(route=route)
+
+    def add_stats_source(self, prefix: str, stats: Callable[[], Dict]) -> None:
+        """Expose the numeric values of a ``stats()`` dict as gauges."""
+
+        def collect() -> List[Tuple[str, str, str, List[Sample]]]:
+            families: List[Tuple[str, str, str, List[Sample]]] = []
+            for key, value in stats().items():
+                name = f"{prefix}_{key}"
+                if isinstance(value, dict):
+                    samples = [
+                        (name, {"key": str(k)}, float(v)) for k, v in value.items()
+                    ]
+                elif isinstance(value, (int, float)):
+                    samples = [(name, {}, float(value))]
+                else:
+                    continue
+                families.append((name, "gauge", f"{prefix} {key}", samples))
+            return families
+
+        self.registry.add_collector(collect)
+
+    def render(self) -> str:
+        return self.registry.render()
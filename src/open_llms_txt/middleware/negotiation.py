@@ -0,0 +1,80 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+MARKDOWN_MIMETYPES = ("text/markdown", "text/x-markdown")
+HTML_MIMETYPE = "text/html"
+
+
+def parse_qlist(header: str) -> List[Tuple[str, float]]:
+    """
+    Parse an ``Accept``-style header into ``[(token, q), ...]`` in header order.
+    Tokens are lower-cased; parameters other than ``q`` are dropped and an
+    unparsable q-value counts as ``0``.
+    """
+    parsed: List[Tuple[str, float]] = []
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        parsed.append((token, q))
+    return parsed
+
+
+def _match(
+    accepted: List[Tuple[str, float]], mimetypes: Tuple[str, ...]
+) -> Tuple[float, int, int]:
+    """
+    Best ``(q, specificity, -position)`` of any of ``mimetypes`` in ``accepted``.
+    Specificity: 2 exact, 1 ``type/*``, 0 ``*/*``.
+    """
+    best = (0.0, -1, 0)
+    for index, (token, q) in enumerate(accepted):
+        for mimetype in mimetypes:
+            major = mimetype.split("/", 1)[0]
+            if token == mimetype:
+                specificity = 2
+            elif token == f"{major}/*":
+                specificity = 1
+            elif token == "*/*":
+                specificity = 0
+            else:
+                continue
+            # The most specific matching range decides the quality (RFC 9110)
+            if specificity > best[1]:
+                best = (q, specificity, -index)
+    return best
+
+
+def prefers_markdown(accept: Optional[str]) -> bool:
+    """
+    Whether an ``Accept`` header prefers Markdown over HTML.
+
+    Markdown wins on a higher q-value; on equal q it wins only if the client
+    named it more specifically than HTML (``text/markdown, */*``) or, with both
+    named explicitly, listed it first. Wildcard-only headers keep HTML.
+    """
+    if not accept:
+        return False
+    accepted = parse_qlist(accept)
+    md_q, md_spec, md_pos = _match(accepted, MARKDOWN_MIMETYPES)
+    html_q, html_spec, html_pos = _match(accepted, (HTML_MIMETYPE,))
+    if md_q <= 0 or md_spec < 0:
+        return False
+    if md_q != html_q:
+        return md_q > html_q
+    if md_spec != html_spec:
+        return md_spec > html_spec
+    return md_spec == 2 and md_pos > html_pos
@@ -0,0 +1,118 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, TypedDict
+
+
+@dataclass(frozen=True)
+class RouteMeta:
+    """Manifest metadata of a mirrored route; empty fields are unknown."""
+
+    title: str = ""
+    description: str = ""
+    section: str = ""
+    priority: float = 0.0
+
+
+class RouteEntry(TypedDict):
+    """One route of ``metadata.routes`` in registry-built manifests."""
+
+    path: str
+    url: str
+    title: str
+    description: str
+    section: str
+    priority: float
+
+
+class RouteRegistry:
+    """
+    Per-route metadata used to build manifests without executing any view.
+
+    Metadata declared on an endpoint (``@html2md(title=...)``) always wins; the
+    blanks are filled from what the parser saw the last time each concrete path
+    was rendered. ``version`` changes whenever an entry does.
+    """
+
+    def __init__(self) -> None:
+        self._declared: Dict[str, RouteMeta] = {}
+        self._captured: Dict[str, RouteMeta] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def declare(self, endpoint: str, meta: RouteMeta) -> None:
+        with self._lock:
+            if self._declared.get(endpoint) != meta:
+                self._declared[endpoint] = meta
+                self.version += 1
+
+    def capture(self, path: str, context: Mapping[str, Any]) -> None:
+        """Record the title and first paragraph of a parsed page."""
+        paragraphs = context.get("paragraphs") or [""]
+        meta = RouteMeta(
+            title=context.get("h1") or context.get("title") or "",
+            description=paragraphs[0],
+        )
+        with self._lock:
+            if self._captured.get(path) != meta:
+                self._captured[path] = meta
+                self.version += 1
+
+    def forget(self, path: str | None = None) -> None:
+        """Drop captured metadata for ``path`` (or every path)."""
+        with self._lock:
+            if path is None:
+                self._captured.clear()
+            else:
+                self._captured.pop(path, None)
+            self.version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._declared.clear()
+            self._captured.clear()
+            self.version += 1
+
+    def get(self, path: str, endpoint: str) -> RouteMeta:
+        declared = self._declared.get(endpoint, RouteMeta())
+        captured = self._captured.get(path)
+        if captured is None:
+            return declared
+        return replace(
+            declared,
+            title=declared.title or captured.title,
+            description=declared.description or captured.description,
+        )
+
+    def entries(
+        self,
+        paths: Iterable[str],
+        endpoints: Mapping[str, str],
+        url_for: Callable[[str], str],
+    ) -> List[RouteEntry]:
+        """
+        One entry per concrete path (``path``, ``url``, ``title``,
+        ``description``, ``section``, ``priority``), highest priority first and
+        otherwise in the order of ``paths``.
+        """
+        entries: List[RouteEntry] = []
+        for path in paths:
+            if "<" in path or path == "/":
+                continue  # no concrete URL / not addressable by the mirror rule
+            meta = self.get(path, endpoints.get(path, ""))
+            entries.append(
+                RouteEntry(
+                    path=path,
+                    url=url_for(path),
+                    title=meta.title,
+                    description=meta.description,
+                    section=meta.section,
+                    priority=meta.priority,
+                )
+            )
+        entries.sort(key=lambda e: -e["priority"])
+        return entries
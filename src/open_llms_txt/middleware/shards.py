@@ -0,0 +1,66 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, List, Mapping
+
+# Section of paths that don't belong to any prefix/blueprint (e.g. "/about")
+ROOT_SECTION = "main"
+
+ShardBy = str | Callable[[str, str], str | None]
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def _slug(name: str) -> str:
+    return _UNSAFE.sub("-", name).strip("-") or ROOT_SECTION
+
+
+SHARD_MODES = ("prefix", "blueprint")
+
+
+def section_for(path: str, endpoint: str, shard_by: ShardBy) -> str | None:
+    """
+    Section (shard name) of a mirrored path.
+
+    ``shard_by`` is ``"prefix"`` (first path segment, e.g. ``/docs/intro`` ->
+    ``docs``), ``"blueprint"`` (the endpoint's blueprint, e.g. ``docs.intro`` ->
+    ``docs``) or a callable ``(path, endpoint) -> section``; returning ``None``
+    leaves the path out of every shard.
+    """
+    if callable(shard_by):
+        section = shard_by(path, endpoint)
+        return None if section is None else _slug(section)
+    if shard_by == "prefix":
+        segments = [s for s in path.split("/") if s]
+        return _slug(segments[0]) if len(segments) > 1 else ROOT_SECTION
+    if shard_by == "blueprint":
+        blueprint, _, _ = endpoint.rpartition(".")
+        return _slug(blueprint) if blueprint else ROOT_SECTION
+    raise ValueError(f"unknown shard_by {shard_by!r}")
+
+
+def group_shards(
+    paths: Iterable[str], endpoints: Mapping[str, str], shard_by: ShardBy
+) -> Dict[str, List[str]]:
+    """Group concrete paths by section; each section keeps the input order."""
+    shards: Dict[str, List[str]] = {}
+    for path in paths:
+        if "<" in path or path == "/":
+            continue  # no concrete URL / not addressable by the mirror rule
+        section = section_for(path, endpoints.get(path, ""), shard_by)
+        if section is not None:
+            shards.setdefault(section, []).append(path)
+    return dict(sorted(shards.items()))
+
+
+def shard_path(manifest_path: str, section: str) -> str:
+    """``/llms.txt`` + ``docs`` -> ``/llms/docs.txt``."""
+    stem = (
+        manifest_path[: -len(".txt")]
+        if manifest_path.endswith(".txt")
+        else manifest_path
+    )
+    return f"{stem}/{section}.txt"
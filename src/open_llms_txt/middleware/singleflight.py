@@ -0,0 +1,79 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlightTimeoutError(TimeoutError):
+    """A waiter gave up on a render still running in another thread."""
+
+
+class _Call(Generic[T]):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls for the same key: the first caller (the leader)
+    runs the function while later callers block until it finishes and then share
+    its result or exception. Works across threads of a threaded WSGI server.
+
+    Parameters
+    ----------
+    timeout : float
+        Seconds a waiter blocks before raising :class:`SingleFlightTimeoutError`.
+    """
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[T]] = {}
+        self._led = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run ``fn`` once per concurrent ``key``; returns ``(result, shared)``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._led += 1
+            else:
+                self._shared += 1
+
+        if not leader:
+            if not call.event.wait(self.timeout):
+                raise SingleFlightTimeoutError(f"timed out waiting for {key!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self._led,
+                "coalesced": self._shared,
+            }
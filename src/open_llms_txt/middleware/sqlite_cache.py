@@ -0,0 +1,291 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from open_llms_txt.middleware.cache import CacheEntry, CacheKey
+from open_llms_txt.utils import content_hash
+
+# Run as one transaction so concurrent first runs agree on the seeded total
+_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS entries (
+    key_hash TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    deps TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at);
+CREATE TABLE IF NOT EXISTS variants (
+    key_hash TEXT NOT NULL REFERENCES entries (key_hash) ON DELETE CASCADE,
+    encoding TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (key_hash, encoding)
+);
+-- Running total of entries.size, so eviction never has to scan the table
+CREATE TABLE IF NOT EXISTS meta (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (id, total_bytes)
+    SELECT 0, COALESCE(SUM(size), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_size_insert AFTER INSERT ON entries BEGIN
+    UPDATE meta SET total_bytes = total_bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_size_delete AFTER DELETE ON entries BEGIN
+    UPDATE meta SET total_bytes = total_bytes - OLD.size WHERE id = 0;
+END;
+COMMIT;
+"""
+
+
+class SqliteRenderCache:
+    """
+    Render cache shared by every process on a host through one SQLite file in
+    WAL mode, so a mirror rendered by one worker is served by the others.
+
+    Rows are keyed by the SHA-256 of the cache key. Readers never block
+    writers. Writers serialize on ``BEGIN IMMEDIATE`` and wait up to
+    ``busy_timeout`` seconds for the lock. Entries expire ``ttl`` seconds after
+    they were last stored or revalidated. Once the stored bytes (bodies plus
+    compressed variants) exceed ``max_bytes``, the least recently read entries
+    are evicted. Keys must be tuples of strings, which holds for the
+    middleware's ``(root_url, path, template)`` keys.
+
+    Parameters
+    ----------
+    path : str | Path
+        Database file, e.g. ``/run/llms/render-cache.db``; created on first use.
+    max_bytes : int
+        Upper bound for the stored bodies and variants.
+    ttl : float | None
+        Seconds an entry survives without being revalidated; ``None`` keeps it
+        until evicted or invalidated.
+    busy_timeout : float
+        Seconds a writer waits for another process to release the lock.
+    """
+
+    # Reads refresh ``accessed_at`` at most this often (seconds) to keep
+    # hot reads from turning into writes
+    ACCESS_RESOLUTION = 1.0
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float | None = 24 * 3600,
+        busy_timeout: float = 5.0,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # IF NOT EXISTS makes concurrent first runs from several workers safe
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after fork (gunicorn --preload)
+        cached: Tuple[int, sqlite3.Connection] | None = getattr(
+            self._local, "conn", None
+        )
+        if cached is not None and cached[0] == os.getpid():
+            return cached[1]
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        self._local.conn = (os.getpid(), conn)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close this thread's connection (other threads keep theirs)."""
+        cached = getattr(self._local, "conn", None)
+        if cached is not None:
+            cached[1].close()
+            self._local.conn = None
+
+    @staticmethod
+    def _encode_key(key: CacheKey) -> Tuple[str, str]:
+        encoded = json.dumps(list(key))
+        return content_hash(encoded), encoded
+
+    def _expired_before(self, now: float) -> float:
+        return float("-inf") if self.ttl is None else now - self.ttl
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        # Both lookups are indexed: cost grows with what is evicted, not stored
+        if self.ttl is not None:
+            conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (self._expired_before(now),)
+            )
+        (total,) = conn.execute("SELECT total_bytes FROM meta").fetchone()
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key_hash, size in conn.execute(
+            "SELECT key_hash, size FROM entries ORDER BY accessed_at"
+        ):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key_hash,))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key_hash = ?", doomed)
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        key_hash, _ = self._encode_key(key)
+        conn = self._conn()
+        now = time.time()
+        # One read transaction so the body and its variants come from one version
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(
+                "SELECT source_hash, deps, created_at, accessed_at, body FROM entries"
+                " WHERE key_hash = ? AND created_at >= ?",
+                (key_hash, self._expired_before(now)),
+            ).fetchone()
+            variants: Dict[str, bytes] = {
+                encoding: bytes(data)
+                for encoding, data in conn.execute(
+                    "SELECT encoding, data FROM variants WHERE key_hash = ?",
+                    (key_hash,),
+                )
+            }
+        finally:
+            conn.execute("COMMIT")
+        if row is None:
+            return None
+        source_hash, deps, created_at, accessed_at, body = row
+        if now - accessed_at >= self.ACCESS_RESOLUTION:
+            try:
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key_hash = ?",
+                    (now, key_hash),
+                )
+            except sqlite3.OperationalError:
+                pass  # recency is best effort; never fail a read on a busy lock
+        return CacheEntry(
+            body=bytes(body),
+            source_hash=source_hash,
+            variants=variants,
+            created_at=created_at,
+            deps=deps,
+        )
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        key_hash, encoded = self._encode_key(key)
+        size = len(entry.body) + sum(len(v) for v in entry.variants.values())
+        now = time.time()
+        with self._write() as conn:
+            conn.execute("DELETE FROM entries WHERE key_hash = ?", (key_hash,))
+            conn.execute(
+                "INSERT INTO entries (key_hash, key, source_hash, deps, created_at,"
+                " accessed_at, size, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key_hash,
+                    encoded,
+                    entry.source_hash,
+                    entry.deps,
+                    entry.created_at,
+                    now,
+                    size,
+                    entry.body,
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO variants (key_hash, encoding, data) VALUES (?, ?, ?)",
+                [(key_hash, enc, data) for enc, data in entry.variants.items()],
+            )
+            self._evict(conn, now)
+
+    def touch(self, key: CacheKey, entry: CacheEntry) -> CacheEntry:
+        """Mark an entry as revalidated (same content version) without rebuilding."""
+        key_hash, _ = self._encode_key(key)
+        now = time.time()
+        with self._write() as conn:
+            updated = conn.execute(
+                "UPDATE entries SET created_at = ?, accessed_at = ?"
+                " WHERE key_hash = ? AND source_hash = ?",
+                (now, now, key_hash, entry.source_hash),
+            ).rowcount
+        refreshed = CacheEntry(
+            body=entry.body,
+            source_hash=entry.source_hash,
+            variants=entry.variants,
+            created_at=now,
+            deps=entry.deps,
+        )
+        if not updated:
+            # Evicted or replaced by another process meanwhile: store it again
+            self.set(key, refreshed)
+        return refreshed
+
+    def invalidate(self, key: Optional[CacheKey] = None) -> None:
+        """Drop one entry, or everything when ``key`` is ``None``."""
+        with self._write() as conn:
+            if key is None:
+                conn.execute("DELETE FROM entries")
+            else:
+                conn.execute(
+                    "DELETE FROM entries WHERE key_hash = ?",
+                    (self._encode_key(key)[0],),
+                )
+
+    def invalidate_matching(self, predicate: Callable[[CacheKey], bool]) -> int:
+        """Drop every entry whose key satisfies ``predicate``; returns the count."""
+        with self._write() as conn:
+            doomed = [
+                (key_hash,)
+                for key_hash, encoded in conn.execute(
+                    "SELECT key_hash, key FROM entries"
+                ).fetchall()
+                if predicate(tuple(json.loads(encoded)))
+            ]
+            conn.executemany("DELETE FROM entries WHERE key_hash = ?", doomed)
+        return len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and stored bytes (bodies plus variants)."""
+        count, total = (
+            self._conn()
+            .execute("SELECT (SELECT COUNT(*) FROM entries), total_bytes FROM meta")
+            .fetchone()
+        )
+        return {"entries": count, "bytes": total}
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
@@ -0,0 +1,431 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+from http import HTTPStatus
+import io
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urljoin
+
+from open_llms_txt.middleware.allowlist import AllowList
+from open_llms_txt.middleware.cache import (
+    CacheBackend,
+    CacheEntry,
+    CacheKey,
+    GeneratorCache,
+    RenderCache,
+)
+from open_llms_txt.middleware.compression import select_encoding
+from open_llms_txt.middleware.limiter import RenderLimiter
+from open_llms_txt.middleware.singleflight import SingleFlight, SingleFlightTimeoutError
+from open_llms_txt.utils import content_hash
+
+Environ = Dict[str, Any]
+StartResponse = Callable[..., Callable[[bytes], Any]]
+WSGIApp = Callable[[Environ, StartResponse], Iterable[bytes]]
+# (status, markdown body, extra headers) for responses that are not cached
+_Failure = Tuple[int, str, List[Tuple[str, str]]]
+
+# Request headers not forwarded to the downstream HTML render: the middleware
+# needs an uncompressed, complete, unconditional HTML body
+_DROPPED_ENVIRON = (
+    "HTTP_ACCEPT_ENCODING",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_RANGE",
+)
+
+
+def _charset(content_type: str | None) -> str:
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+class BodyTooLargeError(ValueError):
+    """The downstream HTML exceeded ``max_body_bytes``."""
+
+
+class _HtmlCapture:
+    """
+    Consume a WSGI body chunk by chunk: each chunk updates the content hash
+    and is decoded incrementally, so the raw bytes are never joined and the
+    decoded text is built once.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._text = io.StringIO()
+        self._decoder: codecs.IncrementalDecoder | None = None
+
+    def start(self, content_type: str | None) -> None:
+        try:
+            factory = codecs.getincrementaldecoder(_charset(content_type))
+        except LookupError:
+            factory = codecs.getincrementaldecoder("utf-8")
+        self._decoder = factory(errors="replace")
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise BodyTooLargeError(f"body exceeds {self.max_bytes} bytes")
+        self._digest.update(chunk)
+        assert self._decoder is not None
+        self._text.write(self._decoder.decode(chunk))
+
+    def source_hash(self, deps: str) -> str:
+        # Same layout as content_hash(html, deps) for UTF-8 bodies
+        digest = self._digest.copy()
+        digest.update(b"\0")
+        digest.update(deps.encode("utf-8"))
+        digest.update(b"\0")
+        return digest.hexdigest()
+
+    def text(self) -> str:
+        if self._decoder is not None:
+            self._text.write(self._decoder.decode(b"", final=True))
+        return self._text.getvalue()
+
+
+class LlmsTxtWSGIMiddleware:
+    """
+    Framework-agnostic WSGI middleware serving Markdown mirrors
+    (``<route>.html.md``) and an ``llms.txt`` manifest for plain WSGI apps,
+    Django or any other WSGI framework.
+
+    Mirrors are opt-in through ``patterns``: exact paths, prefixes and globs
+    matched against the requested path, e.g. ``["/docs", "/blog/*",
+    "/api/**"]`` (see :class:`~open_llms_txt.middleware.allowlist.AllowList`).
+    The HTML is produced by re-dispatching to the wrapped app in-process. Its
+    response iterable is consumed incrementally: chunks are hashed and decoded
+    as they arrive, the iterable is closed as required by PEP 3333, and bodies
+    above ``max_body_bytes`` are rejected without being buffered. When the hash
+    matches the cached version, the stored render is reused without parsing.
+
+    Renders share the same caching features as the Flask adapter: any
+    ``CacheBackend`` (in-process by default, or the cross-process
+    :class:`~open_llms_txt.middleware.sqlite_cache.SqliteRenderCache`),
+    pre-compressed variants, request coalescing and an optional
+    :class:`~open_llms_txt.middleware.limiter.RenderLimiter`.
+
+    Parameters
+    ----------
+    app : WSGIApp
+        The wrapped application, e.g. ``get_wsgi_application()`` for Django.
+    patterns : Iterable[str]
+        Paths that may be mirrored. ``*`` matches within one path segment and
+        ``**`` across segments (``/api/**`` is everything below ``/api``).
+    template_dir : str | None, optional
+        Directory holding the Jinja templates. ``None`` uses the packaged ones.
+    template_name : str, optional
+        Template used for mirrors. Defaults to ``"html_to_md.jinja"``.
+    manifest_template_name : str, optional
+        Template used for the manifest. Defaults to ``"llms.txt.jinja"``.
+    mount_prefix : str, optional
+        URL prefix of the mirrors, e.g. ``"/.llms"``. Defaults to ``""``.
+    manifest_path : str, optional
+        Path serving the manifest. Defaults to ``"/llms.txt"``.
+    manifest_source : str | None, optional
+        Page the manifest is rendered from. ``None`` disables the manifest.
+    cache_ttl : float | None, optional
+        Seconds a render is served without calling the app. ``None`` (default)
+        revalidates every request by the HTML hash.
+    cache : CacheBackend | None, optional
+        Render cache; a private in-process ``RenderCache`` by default.
+    limiter : RenderLimiter | None, optional
+        Concurrency cap for renders; shed requests get a ``503``.
+    max_body_bytes : int, optional
+        Largest HTML body that will be converted. Defaults to 10 MiB.
+    """
+
+    def __init__(
+        self,
+        app: WSGIApp,
+        *,
+        patterns: Iterable[str],
+        template_dir: str | None = None,
+        template_name: str = "html_to_md.jinja",
+        manifest_template_name: str = "llms.txt.jinja",
+        mount_prefix: str = "",
+        manifest_path: str = "/llms.txt",
+        manifest_source: str | None = None,
+        cache_ttl: float | None = None,
+        cache: CacheBackend | None = None,
+        limiter: RenderLimiter | None = None,
+        max_body_bytes: int = 10 * 1024 * 1024,
+    ):
+        if not template_name or not manifest_template_name:
+            raise ValueError("template_name is required")
+        if not manifest_path.startswith("/"):
+            raise ValueError("manifest_path must start with '/'")
+        self.app = app
+        self.patterns = sorted(set(patterns))
+        self.template_dir = template_dir
+        self.template_name = template_name
+        self.manifest_template_name = manifest_template_name
+        self.mount_prefix = (mount_prefix or "").rstrip("/")
+        self.manifest_path = manifest_path
+        self.manifest_source = manifest_source
+        self.cache_ttl = cache_ttl
+        self.cache: CacheBackend = cache if cache is not None else RenderCache()
+        self.limiter = limiter
+        self.max_body_bytes = max_body_bytes
+
+        # Exact/prefix/glob lookup; templates iterate its literal patterns
+        self._allowed_paths = AllowList(self.patterns)
+        self._allowlist_digest = content_hash(*self.patterns)
+        self._generators = GeneratorCache()
+        self._flight: SingleFlight[CacheEntry | _Failure] = SingleFlight()
+
+    def is_allowed(self, path: str) -> bool:
+        return path in self._allowed_paths
+
+    def _mirror_target(self, path: str) -> str | None:
+        prefix = self.mount_prefix
+        if not path.endswith(".html.md") or not path.startswith(prefix + "/"):
+            return None
+        raw = path[len(prefix) + 1 : -len(".html.md")]
+        return f"/{raw}" if raw else None
+
+    def __call__(
+        self, environ: Environ, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        method = environ.get("REQUEST_METHOD", "GET")
+        path = environ.get("PATH_INFO") or "/"
+        if method not in ("GET", "HEAD"):
+            return self.app(environ, start_response)
+
+        if path == self.manifest_path and self.manifest_source:
+            return self._serve(
+                environ,
+                start_response,
+                source_path=self.manifest_source,
+                cache_path=self.manifest_path,
+                template_name=self.manifest_template_name,
+                error_message=f"Failed to render `{self.manifest_source}` "
+                "for manifest.",
+            )
+
+        target = self._mirror_target(path)
+        if target is None:
+            return self.app(environ, start_response)
+        if not self.is_allowed(target):
+            return self._respond(
+                environ,
+                start_response,
+                404,
+                b"# 404\nMarkdown mirror not enabled for this path.\n",
+            )
+        return self._serve(
+            environ,
+            start_response,
+            source_path=target,
+            cache_path=target,
+            template_name=self.template_name,
+            error_message=f"Failed to render `{target}`.",
+        )
+
+    def _serve(
+        self,
+        environ: Environ,
+        start_response: StartResponse,
+        *,
+        source_path: str,
+        cache_path: str,
+        template_name: str,
+        error_message: str,
+    ) -> Iterable[bytes]:
+        base = f"{environ.get('wsgi.url_scheme', 'http')}://{self._host(environ)}"
+        key = (base, cache_path, f"{self.template_dir or ''}:{template_name}")
+        digest = self._generators.get(self.template_dir, template_name)[1]
+        deps = f"{self._allowlist_digest}:{digest}"
+
+        entry = self.cache.get(key)
+        if entry is None or entry.deps != deps or not entry.is_fresh(self.cache_ttl):
+            # Shared per client class: the limiter's verdict holds for the class
+            client_class = self._client_class(environ)
+            try:
+                result, _ = self._flight.do(
+                    (key, client_class),
+                    lambda: self._limited_render(
+                        client_class,
+                        environ,
+                        key,
+                        entry,
+                        deps,
+                        source_path,
+                        template_name,
+                        base,
+                        error_message,
+                    ),
+                )
+            except SingleFlightTimeoutError:
+                result = self._overloaded(retry_after=1)
+            if not isinstance(result, CacheEntry):
+                status, body, headers = result
+                return self._respond(
+                    environ, start_response, status, body.encode("utf-8"), headers
+                )
+            entry = result
+
+        encoding = select_encoding(environ.get("HTTP_ACCEPT_ENCODING"), entry.variants)
+        return self._respond(
+            environ,
+            start_response,
+            200,
+            entry.variants[encoding] if encoding else entry.body,
+            encoding=encoding,
+        )
+
+    @staticmethod
+    def _overloaded(retry_after: int) -> _Failure:
+        return (
+            503,
+            "# 503\nMarkdown rendering is over capacity, retry later.\n",
+            [("Retry-After", str(retry_after))],
+        )
+
+    def _client_class(self, environ: Environ) -> str | None:
+        if self.limiter is None:
+            return None
+        return self.limiter.classify(
+            environ.get("HTTP_USER_AGENT"), environ.get("REMOTE_ADDR")
+        )
+
+    def _limited_render(
+        self, client_class: str | None, environ: Environ, *args: Any
+    ) -> CacheEntry | _Failure:
+        limiter = self.limiter
+        if limiter is None or client_class is None:
+            return self._render(environ, *args)
+        with limiter.slot(client_class) as admitted:
+            if not admitted:
+                return self._overloaded(limiter.retry_after)
+            return self._render(environ, *args)
+
+    def _render(
+        self,
+        environ: Environ,
+        key: CacheKey,
+        entry: CacheEntry | None,
+        deps: str,
+        source_path: str,
+        template_name: str,
+        base: str,
+        error_message: str,
+    ) -> CacheEntry | _Failure:
+        try:
+            status, capture = self._fetch_html(environ, source_path)
+        except BodyTooLargeError:
+            return 502, f"# 502\n{error_message}\n", []
+        if status >= 400:
+            return status, f"# {status}\n{error_message}\n", []
+
+        source_hash = capture.source_hash(deps)
+        if entry is not None and entry.source_hash == source_hash:
+            return self.cache.touch(key, entry)
+        generator, _ = self._generators.get(self.template_dir, template_name)
+        markdown = generator.render(
+            capture.text(),
+            root_url=base,
+            source_url=urljoin(base, source_path),
+            allowed_paths=self._allowed_paths,
+            mount_prefix=self.mount_prefix,
+        )
+        entry = CacheEntry.build(markdown, source_hash, deps=deps)
+        self.cache.set(key, entry)
+        return entry
+
+    def _fetch_html(self, environ: Environ, path: str) -> Tuple[int, _HtmlCapture]:
+        """Re-dispatch ``path`` to the wrapped app, streaming its body."""
+        sub_environ = {k: v for k, v in environ.items() if k not in _DROPPED_ENVIRON}
+        sub_environ.update(
+            {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "CONTENT_LENGTH": "0",
+                "HTTP_ACCEPT": "text/html",
+                "wsgi.input": io.BytesIO(b""),
+            }
+        )
+        sub_environ.pop("CONTENT_TYPE", None)
+
+        capture = _HtmlCapture(self.max_body_bytes)
+        status: List[int] = [500]
+
+        def start_response(
+            status_line: str,
+            headers: List[Tuple[str, str]],
+            exc_info: Optional[Any] = None,
+        ) -> Callable[[bytes], None]:
+            status[0] = int(status_line.split(" ", 1)[0])
+            content_type = next(
+                (v for k, v in headers if k.lower() == "content-type"), None
+            )
+            capture.start(content_type)
+            # Legacy ``write()`` callers stream into the same capture
+            return capture.feed
+
+        app_iter = self.app(sub_environ, start_response)
+        try:
+            for chunk in app_iter:
+                if status[0] >= 400:
+                    break  # error bodies are never converted
+                capture.feed(chunk)
+        finally:
+            close = getattr(app_iter, "close", None)
+            if close is not None:
+                close()
+        return status[0], capture
+
+    @staticmethod
+    def _host(environ: Environ) -> str:
+        host = environ.get("HTTP_HOST")
+        if host:
+            return host
+        server = environ.get("SERVER_NAME", "localhost")
+        return f"{server}:{environ.get('SERVER_PORT', '80')}"
+
+    @staticmethod
+    def _respond(
+        environ: Environ,
+        start_response: StartResponse,
+        status: int,
+        body: bytes,
+        headers: Optional[List[Tuple[str, str]]] = None,
+        *,
+        encoding: str | None = None,
+    ) -> Iterable[bytes]:
+        response_headers = [
+            ("Content-Type", "text/markdown; charset=utf-8"),
+            ("Content-Length", str(len(body))),
+            *(headers or []),
+        ]
+        if status == 200:
+            response_headers.append(("Vary", "Accept-Encoding"))
+        if encoding:
+            response_headers.append(("Content-Encoding", encoding))
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = "Unknown"
+        start_response(f"{status} {reason}", response_headers)
+        return [b""] if environ.get("REQUEST_METHOD") == "HEAD" else [body]
@@ -2,16 +2,27 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from abc import ABC, abstractmethod
+import asyncio
 import logging
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 
+def main_heading(html: str) -> str:
+    """Text of the page's first ``<h1>``, or ``"Untitled"``."""
+    heading = BeautifulSoup(html, "html.parser").find("h1")
+    return heading.get_text(strip=True) if heading else "Untitled"
+
+
 class BaseScraper(ABC):
-    def __init__(self, root: str):
+    def __init__(self, root: str, total_timeout: Optional[float] = None):
         self.root_page = root
         self.root_subpages: set[str] = set()
+        # Wall-clock budget (seconds) of one fetch_all call; None means unbounded
+        self.total_timeout = total_timeout
         # TODO: add a template atribute to set the gross text from the typical llms.txt
         # TODO: predefined initially
 
@@ -25,6 +36,36 @@ class BaseScraper(ABC):
     def root_page(self, root):
         self.__root_page = root.rstrip("/")
 
+    @property
+    def root_target(self) -> str:
+        """What ``fetch_content`` takes to load the root page."""
+        return self.root_page
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        """
+        Fetchable targets linked from ``html`` (loaded from ``source``), in
+        document order. Used by the recursive crawler; none by default.
+        """
+        return []
+
+    async def can_fetch(self, target: str) -> bool:
+        """Whether ``target`` may be fetched at all (e.g. per robots.txt)."""
+        return True
+
+    def resolve(self, target: str) -> str:
+        """
+        Identity of ``target`` used to dedupe crawls: two targets resolving to
+        the same string serve the same content. ``target`` itself by default.
+        """
+        return target
+
+    def page_identity(self, target: str, html: str) -> str:
+        """
+        Identity of a fetched page, which may differ from ``resolve(target)``
+        once the fetch revealed a redirect or a canonical link.
+        """
+        return self.resolve(target)
+
     @abstractmethod
     async def collect_root_subpages(self) -> Dict[str, str]:
         """Returns a dictionary of {url -> main header}"""
@@ -35,6 +76,32 @@ class BaseScraper(ABC):
         """Returns the HTML content from the path"""
         pass
 
+    async def fetch_all(self, targets: Iterable[str]) -> Dict[str, str]:
+        """
+        Fetch ``targets`` concurrently (each scraper bounds its own concurrency)
+        and return ``{target: content}`` in the order of ``targets``, skipping
+        empty results. Targets still pending after ``total_timeout`` are
+        cancelled and left out.
+        """
+        ordered = list(dict.fromkeys(targets))
+        if not ordered:
+            return {}
+        tasks = [asyncio.ensure_future(self.fetch_content(t)) for t in ordered]
+        done, pending = await asyncio.wait(tasks, timeout=self.total_timeout)
+        if pending:
+            logger.warning(
+                f"⚠️ Total timeout reached: {len(pending)} of {len(tasks)} not fetched"
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = {}
+        for target, task in zip(ordered, tasks):
+            if task in done and task.exception() is None and task.result():
+                results[target] = task.result()
+        return results
+
     async def close(self) -> None:
         """Optional async cleanup. Default: no-op"""
         return
@@ -0,0 +1,112 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    key TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    identity TEXT
+);
+"""
+
+# Page lifecycle: admitted to the frontier -> fetched and handed to the
+# consumer -> processed by it; or dropped without content
+QUEUED = "queued"
+FETCHED = "fetched"
+DONE = "done"
+FAILED = "failed"
+DUPLICATE = "duplicate"
+STATUSES = (QUEUED, FETCHED, DONE, FAILED, DUPLICATE)
+
+
+@dataclass(frozen=True)
+class PageState:
+    url: str  # what fetch_content takes
+    key: str  # scraper.resolve(url), the visited-set entry
+    depth: int
+    status: str
+    identity: Optional[str] = None  # scraper.page_identity, once fetched
+
+
+class CrawlCheckpoint:
+    """
+    Crawl state in one SQLite file: every admitted URL in admission order with
+    its depth and status (see ``STATUSES``). That is enough to rebuild the
+    visited set, the fetched identities and the frontier, so a resumed crawl
+    continues where it stopped.
+
+    The crawler buffers changes and writes them in one transaction per batch
+    of pages (WAL mode, no fsync per page), so a crash loses at most the batch
+    in progress, which is simply fetched again.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def record(self, pages: Iterable[PageState]) -> None:
+        """Insert or update ``pages`` atomically; first insertion fixes the order."""
+        rows = [(p.url, p.key, p.depth, p.status, p.identity) for p in pages]
+        if not rows:
+            return
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO pages (url, key, depth, status, identity)"
+                    " VALUES (?, ?, ?, ?, ?) ON CONFLICT (url) DO UPDATE SET"
+                    " status = excluded.status,"
+                    " identity = COALESCE(excluded.identity, pages.identity)",
+                    rows,
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def load(self) -> List[PageState]:
+        """Every page in admission order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, key, depth, status, identity FROM pages ORDER BY seq"
+            ).fetchall()
+        return [PageState(*row) for row in rows]
+
+    def status(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Pages per status, e.g. ``{"queued": 120, "done": 4000, ...}``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM pages GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
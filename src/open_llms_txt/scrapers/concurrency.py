@@ -0,0 +1,289 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import time
+from typing import AsyncIterator, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying, and those meaning "slow down"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+def host_key(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"circuit open for {host} ({retry_in:.1f}s left)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries with full-jitter exponential backoff: attempt ``n`` (from 0) waits
+    a random time up to ``base_delay * 2**n``, capped at ``max_delay``. A
+    server's ``Retry-After`` replaces the random delay (same cap).
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return rng() * min(self.max_delay, self.base_delay * 2**attempt)
+
+
+class Feedback:
+    """
+    Outcome of one request, reported inside a limiter slot. Leaving the slot
+    without a report counts as a success.
+    """
+
+    __slots__ = ("outcome", "retry_after")
+
+    def __init__(self) -> None:
+        self.outcome = "ok"
+        self.retry_after: Optional[float] = None
+
+    def overloaded(self, retry_after: Optional[float] = None) -> None:
+        """429/503 or a timeout: the host wants less load."""
+        self.outcome = "overloaded"
+        self.retry_after = retry_after
+
+    def failed(self) -> None:
+        """Other server or connection error: counts towards the circuit breaker."""
+        self.outcome = "failed"
+
+    def ignore(self) -> None:
+        """Not the host's doing (e.g. a cache miss offline)."""
+        self.outcome = "ignored"
+
+
+class HostLimiter:
+    """Caps in-flight requests globally and per host (``scheme://host:port``)."""
+
+    def __init__(self, max_concurrency: int, per_host: int):
+        if max_concurrency < 1 or per_host < 1:
+            raise ValueError("concurrency limits must be >= 1")
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[Feedback]:
+        host = host_key(url)
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        # Host first: a saturated host never holds global slots while it waits
+        async with semaphore, self._global:
+            yield Feedback()  # fixed limits: outcomes are not used
+
+
+class _HostState:
+    __slots__ = (
+        "limit",
+        "in_flight",
+        "latency",
+        "baseline",
+        "decreased_at",
+        "paused_until",
+        "failures",
+        "open_until",
+        "probing",
+        "cond",
+    )
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.latency: Optional[float] = None  # EWMA of successful requests
+        self.baseline: Optional[float] = None  # lowest EWMA since last backoff
+        self.decreased_at = float("-inf")
+        self.paused_until = 0.0
+        self.failures = 0  # consecutive
+        self.open_until: Optional[float] = None
+        self.probing = False
+        self.cond = asyncio.Condition()
+
+
+class AdaptiveLimiter:
+    """
+    Per-host concurrency found by AIMD instead of fixed, under a global cap.
+
+    - Additive increase: each success adds ``1 / limit`` (one slot per window
+      of ``limit`` successes) while the latency EWMA stays within
+      ``latency_tolerance`` times the best seen; rising latency stops growth.
+    - Multiplicative decrease: 429/503 or a timeout multiplies the limit by
+      ``backoff``, at most once per observed latency so one burst of errors
+      counts once. ``Retry-After`` also pauses the host.
+    - Circuit breaker: ``failure_threshold`` consecutive failures open the
+      host's circuit for ``reset_timeout`` seconds (requests raise
+      :class:`CircuitOpenError` without being sent); then one probe request is
+      let through, and its success closes the circuit.
+
+    Other hosts are unaffected by one host's backoff, pause or open circuit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        *,
+        initial: int = 1,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        backoff: float = 0.5,
+        latency_tolerance: float = 1.5,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit or max_concurrency < 1:
+            raise ValueError("expected 1 <= min_limit <= initial <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be in (0, 1)")
+        self.max_concurrency = max_concurrency
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts.setdefault(host, _HostState(float(self.initial)))
+        return state
+
+    def limit(self, url: str) -> int:
+        """Current concurrency allowed for the host of ``url``."""
+        return int(self._state(host_key(url)).limit)
+
+    def is_open(self, url: str) -> bool:
+        state = self._hosts.get(host_key(url))
+        return state is not None and state.open_until is not None
+
+    async def _acquire(self, host: str, state: _HostState) -> bool:
+        """Wait for a slot; returns whether this request is the circuit's probe."""
+        async with state.cond:
+            while True:
+                now = self.clock()
+                probe = False
+                if state.open_until is not None:
+                    if now < state.open_until or state.probing:
+                        retry_in = max(state.open_until - now, 0.0)
+                        raise CircuitOpenError(host, retry_in)
+                    probe = True
+                if now < state.paused_until:
+                    try:
+                        await asyncio.wait_for(
+                            state.cond.wait(), state.paused_until - now
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if state.in_flight < int(state.limit) or probe:
+                    state.in_flight += 1
+                    state.probing = probe
+                    return probe
+                await state.cond.wait()
+
+    def _record(self, host: str, state: _HostState, fb: Feedback, latency: float):
+        now = self.clock()
+        if fb.outcome == "ok":
+            state.failures = 0
+            if state.open_until is not None:
+                logger.info(f"Circuit closed for {host}")
+            state.open_until = None
+            state.latency = (
+                latency
+                if state.latency is None
+                else 0.8 * state.latency + 0.2 * latency
+            )
+            if state.baseline is None or state.latency < state.baseline:
+                state.baseline = state.latency
+            if state.latency <= state.baseline * self.latency_tolerance:
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+            return
+        if fb.outcome == "ignored":
+            return
+
+        state.failures += 1
+        if fb.outcome == "overloaded":
+            if fb.retry_after:
+                state.paused_until = max(state.paused_until, now + fb.retry_after)
+            if now - state.decreased_at >= (state.latency or 0.0):
+                state.limit = max(self.min_limit, state.limit * self.backoff)
+                state.decreased_at = now
+                state.baseline = state.latency  # re-learn under the new load
+                logger.debug(f"Backing off {host}: limit {state.limit:.2f}")
+        if state.probing or state.failures >= self.failure_threshold:
+            state.open_until = now + self.reset_timeout
+            logger.warning(f"⚠️ Circuit open for {host} after {state.failures} failures")
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[Feedback]:
+        host = host_key(url)
+        state = self._state(host)
+        await self._acquire(host, state)
+        feedback = Feedback()
+        started = self.clock()
+        try:
+            async with self._global:
+                started = self.clock()
+                yield feedback
+        except asyncio.CancelledError:
+            feedback.ignore()
+            raise
+        except BaseException:
+            if feedback.outcome == "ok":
+                feedback.failed()
+            raise
+        finally:
+            async with state.cond:
+                state.in_flight -= 1
+                self._record(host, state, feedback, self.clock() - started)
+                state.probing = False
+                state.cond.notify_all()
@@ -0,0 +1,255 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .base_scraper import BaseScraper, main_heading
+from .checkpoint import (
+    DONE,
+    DUPLICATE,
+    FAILED,
+    FETCHED,
+    QUEUED,
+    CrawlCheckpoint,
+    PageState,
+)
+from .visited import FingerprintSet, VisitedSet
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CrawledPage:
+    target: str  # identity (canonical URL, for web pages)
+    depth: int
+    html: str
+    url: str = ""  # what was fetched, when it differs from the identity
+
+
+class Crawler:
+    """
+    Breadth-first crawler over any :class:`BaseScraper`: it starts at the
+    scraper's root, follows ``extract_links`` and loads pages with
+    ``fetch_content``.
+
+    Each level is fetched by ``workers`` tasks draining an asyncio queue, in
+    batches so at most ``batch_size`` pages are held in memory. Pages are
+    yielded and their links followed in discovery order, so a crawl is
+    deterministic for a given site. The visited set is only written when a URL
+    is admitted to the frontier: ``max_pages`` bounds both fetches and memory.
+
+    URLs are deduped on ``scraper.resolve``, and every fetched page on
+    ``scraper.page_identity``: once a redirect or canonical link shows two URLs
+    serve the same content, the second is neither yielded nor, if still
+    queued, fetched. Pages are yielded under their identity.
+
+    Parameters
+    ----------
+    scraper : BaseScraper
+        Loads pages and extracts their links (and bounds its own concurrency).
+    max_depth : int, optional
+        Link hops from the root to follow; ``0`` fetches only the root.
+    max_pages : int, optional
+        Pages admitted to the frontier, root included.
+    workers : int, optional
+        Concurrent ``fetch_content`` calls.
+    visited : VisitedSet | None, optional
+        Seen-URL set; a :class:`FingerprintSet` by default. Pass a
+        :class:`BloomFilter` to cap memory regardless of the site size.
+    batch_size : int | None, optional
+        Pages fetched before they are yielded; ``4 * workers`` by default.
+    checkpoint : CrawlCheckpoint | None, optional
+        Where the frontier and per-URL status are saved after every batch.
+    resume : bool, optional
+        Continue the crawl saved in ``checkpoint`` instead of starting over
+        (which clears it).
+    confirm : bool, optional
+        Pages count as done only once the consumer calls :meth:`complete`
+        (e.g. after writing them), instead of once the consumer takes the
+        next page. Pages handed out but never confirmed are fetched again on
+        resume.
+    """
+
+    def __init__(
+        self,
+        scraper: BaseScraper,
+        *,
+        max_depth: int = 3,
+        max_pages: int = 1000,
+        workers: int = 8,
+        visited: Optional[VisitedSet] = None,
+        batch_size: Optional[int] = None,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        resume: bool = False,
+        confirm: bool = False,
+    ):
+        if max_depth < 0 or max_pages < 1 or workers < 1:
+            raise ValueError("max_depth must be >= 0, max_pages and workers >= 1")
+        self.scraper = scraper
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+        self.visited: VisitedSet = visited if visited is not None else FingerprintSet()
+        self.batch_size = batch_size or 4 * workers
+        # Identities of the pages already yielded
+        self.fetched: VisitedSet = FingerprintSet()
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.confirm = confirm
+        self._pending: Dict[str, PageState] = {}
+
+    async def _fetch_batch(self, targets: List[str]) -> List[str]:
+        """Fetch ``targets`` with a worker pool; results keep the input order."""
+        results = [""] * len(targets)
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(targets):
+            queue.put_nowait(item)
+
+        async def worker() -> None:
+            while not queue.empty():
+                index, target = queue.get_nowait()
+                results[index] = await self.scraper.fetch_content(target)
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.workers, len(targets))))
+        )
+        return results
+
+    def _mark(
+        self,
+        url: str,
+        depth: int,
+        status: str,
+        identity: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> None:
+        if self.checkpoint is None:
+            return
+        # Later changes to a URL replace earlier ones but keep its position
+        self._pending[url] = PageState(
+            url, key or self.scraper.resolve(url), depth, status, identity
+        )
+
+    def flush(self) -> None:
+        """Write buffered state changes to the checkpoint (one transaction)."""
+        if self.checkpoint is not None and self._pending:
+            self.checkpoint.record(self._pending.values())
+            self._pending.clear()
+
+    def complete(self, page: CrawledPage, ok: bool = True) -> None:
+        """Mark ``page`` processed (``confirm`` mode: nothing else does)."""
+        self._mark(page.url, page.depth, DONE if ok else FAILED, page.target)
+
+    def _restore(self) -> Tuple[int, List[str], List[str], List[PageState], int]:
+        """``(depth, frontier, next frontier, pages to redo, admitted)``."""
+        assert self.checkpoint is not None
+        rows = self.checkpoint.load()
+        queued: Dict[int, List[str]] = {}
+        redo: List[PageState] = []
+        for row in rows:
+            self.visited.add(row.key)
+            if row.status == DONE and row.identity:
+                self.fetched.add(row.identity)
+            elif row.status == FETCHED:
+                redo.append(row)  # handed out but never confirmed: fetch again
+            elif row.status == QUEUED:
+                queued.setdefault(row.depth, []).append(row.url)
+        depth = min(queued, default=0)
+        logger.info(
+            f"Resuming crawl at depth {depth}: {len(rows)} known pages, "
+            f"{sum(map(len, queued.values()))} queued, {len(redo)} to redo"
+        )
+        return (
+            depth,
+            queued.get(depth, []),
+            queued.get(depth + 1, []),
+            redo,
+            len(rows),
+        )
+
+    async def _redo(self, pages: List[PageState]) -> AsyncIterator[CrawledPage]:
+        """Fetch again pages lost after being handed out; links already admitted."""
+        for start in range(0, len(pages), self.batch_size):
+            batch = pages[start : start + self.batch_size]
+            results = await self._fetch_batch([p.url for p in batch])
+            for state, html in zip(batch, results):
+                if not html:
+                    self._mark(state.url, state.depth, FAILED, key=state.key)
+                    continue
+                identity = self.scraper.page_identity(state.url, html)
+                if not self.fetched.add(identity):
+                    self._mark(state.url, state.depth, DUPLICATE, identity, state.key)
+                    continue
+                page = CrawledPage(identity, state.depth, html, state.url)
+                yield page
+                if not self.confirm:
+                    self.complete(page)
+            self.flush()
+
+    async def crawl(self) -> AsyncIterator[CrawledPage]:
+        """
+        Yield every reachable page (non-empty content) level by level. With a
+        checkpoint and ``resume``, pages already processed are not fetched or
+        yielded again.
+        """
+        redo: List[PageState] = []
+        if self.checkpoint is not None and self.resume and self.checkpoint.counts():
+            depth, frontier, next_frontier, redo, admitted = self._restore()
+        else:
+            if self.checkpoint is not None:
+                self.checkpoint.clear()
+            root = self.scraper.root_target
+            self.visited.add(self.scraper.resolve(root))
+            self._mark(root, 0, QUEUED)
+            admitted, frontier, next_frontier, depth = 1, [root], [], 0
+
+        async for page in self._redo(redo):
+            yield page
+
+        while frontier:
+            for start in range(0, len(frontier), self.batch_size):
+                batch = []
+                for target in frontier[start : start + self.batch_size]:
+                    # An alias learned since admission may point at a done page
+                    if self.scraper.resolve(target) in self.fetched:
+                        self._mark(target, depth, DUPLICATE)
+                    else:
+                        batch.append(target)
+                for target, html in zip(batch, await self._fetch_batch(batch)):
+                    if not html:
+                        self._mark(target, depth, FAILED)
+                        continue
+                    identity = self.scraper.page_identity(target, html)
+                    if not self.fetched.add(identity):
+                        logger.debug(f"Duplicate of {identity}: {target}")
+                        self._mark(target, depth, DUPLICATE, identity)
+                        continue
+                    page = CrawledPage(identity, depth, html, target)
+                    self._mark(target, depth, FETCHED, identity)
+                    yield page
+                    if not self.confirm:
+                        self.complete(page)
+                    if depth >= self.max_depth or admitted >= self.max_pages:
+                        continue
+                    for link in self.scraper.extract_links(target, html):
+                        if admitted >= self.max_pages:
+                            break
+                        if not await self.scraper.can_fetch(link):
+                            continue  # never enters the frontier
+                        key = self.scraper.resolve(link)
+                        if self.visited.add(key):
+                            next_frontier.append(link)
+                            self._mark(link, depth + 1, QUEUED, key=key)
+                            admitted += 1
+                self.flush()  # one cheap checkpoint per batch
+            logger.debug(f"Crawled depth {depth}: {len(frontier)} pages")
+            frontier, next_frontier = next_frontier, []
+            depth += 1
+        self.flush()
+
+    async def collect(self) -> Dict[str, str]:
+        """``{target: main heading}`` of every crawled page, in crawl order."""
+        return {page.target: main_heading(page.html) async for page in self.crawl()}
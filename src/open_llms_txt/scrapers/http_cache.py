@@ -0,0 +1,182 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    location TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    fetched_at REAL NOT NULL,
+    body BLOB NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    status: int
+    body: bytes = b""
+    location: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+    fetched_at: float = 0.0
+
+    @property
+    def is_redirect(self) -> bool:
+        return 300 <= self.status < 400 and bool(self.location)
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this response."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> httpx.Response:
+        """Rebuild the response as the scraper would have received it."""
+        headers = {}
+        if self.content_type:
+            headers["Content-Type"] = self.content_type
+        if self.location:
+            headers["Location"] = self.location
+        return httpx.Response(
+            self.status,
+            headers=headers,
+            content=self.body,
+            request=httpx.Request("GET", self.url),
+        )
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache for scrapers, one SQLite file keyed by URL.
+
+    Successful responses are stored with their ``ETag``, ``Last-Modified`` and
+    ``Content-Type``, redirects with their ``Location``. On a re-crawl the
+    scraper sends the stored validators, so an unchanged page costs a 304
+    instead of a download. With ``offline=True`` the network is never used:
+    cached pages (and cached redirects) are served from disk and anything else
+    is a miss. Responses marked ``Cache-Control: no-store`` are not kept.
+    """
+
+    def __init__(self, path: Union[str, Path], *, offline: bool = False):
+        self.path = Path(path)
+        self.offline = offline
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        # Served from disk without a request / after a 304 / not servable from
+        # disk (downloaded in full, or missing offline) / responses written
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stored = 0
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, location, etag, last_modified, content_type,"
+                " fetched_at, body FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, location, etag, last_modified, content_type, fetched_at, body = row
+        return CachedResponse(
+            url=url,
+            status=status,
+            body=bytes(body),
+            location=location,
+            etag=etag,
+            last_modified=last_modified,
+            content_type=content_type,
+            fetched_at=fetched_at,
+        )
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        """Keep a 200 or a redirect; anything else is not worth replaying."""
+        if "no-store" in response.headers.get("cache-control", "").lower():
+            return
+        if response.status_code == 200:
+            body, location = response.content, None
+        elif response.is_redirect:
+            body, location = b"", response.headers["location"]
+        else:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, status, location, etag,"
+                " last_modified, content_type, fetched_at, body)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.status_code,
+                    location,
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    response.headers.get("content-type"),
+                    time.time(),
+                    body,
+                ),
+            )
+        self.stored += 1
+
+    def refresh(self, cached: CachedResponse, response: httpx.Response) -> None:
+        """Record a 304: keep the body, take any updated validators."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET etag = ?, last_modified = ?, fetched_at = ?"
+                " WHERE url = ?",
+                (
+                    response.headers.get("etag", cached.etag),
+                    response.headers.get("last-modified", cached.last_modified),
+                    time.time(),
+                    cached.url,
+                ),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of this instance plus the entries and bytes on disk."""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "stored": self.stored,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,63 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import importlib.util
+import logging
+from typing import Dict, Optional, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "open-llms-txt (+https://llmstxt.org)"
+
+
+def _installed(*modules: str) -> bool:
+    return any(importlib.util.find_spec(m) is not None for m in modules)
+
+
+def accept_encoding() -> str:
+    """
+    ``Accept-Encoding`` listing only what httpx can decode here: gzip and
+    deflate always, ``br`` with brotli/brotlicffi, ``zstd`` with zstandard.
+    """
+    encodings = []
+    if _installed("zstandard"):
+        encodings.append("zstd")
+    if _installed("brotli", "brotlicffi"):
+        encodings.append("br")
+    encodings += ["gzip", "deflate"]
+    return ", ".join(encodings)
+
+
+def build_client(
+    *,
+    limits: Optional[httpx.Limits] = None,
+    http2: bool = False,
+    timeout: Union[httpx.Timeout, float, None] = 10.0,
+    headers: Optional[Dict[str, str]] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """
+    ``httpx.AsyncClient`` tuned for crawling; share one between scrapers to
+    share its connection pool.
+
+    Redirects are left to the caller (``WebScraper`` follows them hop by hop).
+    ``http2=True`` multiplexes requests to a host over one connection; it
+    needs the ``h2`` package (``open-llms-txt[http2]``) and falls back to
+    HTTP/1.1 with a warning without it. ``transport`` replaces the network
+    one, e.g. with ``httpx.MockTransport`` in tests.
+    """
+    if http2 and not _installed("h2"):
+        logger.warning("⚠️ HTTP/2 requested but 'h2' is not installed: using HTTP/1.1")
+        http2 = False
+    default_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": accept_encoding()}
+    default_headers.update(headers or {})
+    return httpx.AsyncClient(
+        limits=limits or httpx.Limits(),
+        http2=http2,
+        timeout=timeout,
+        headers=default_headers,
+        follow_redirects=False,
+        transport=transport,
+    )
@@ -1,64 +1,85 @@
 # Copyright (c) 2025 Ricardo Espantaleón Pérez
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 
 from bs4 import BeautifulSoup, Tag
 
-from .base_scraper import BaseScraper
+from .base_scraper import BaseScraper, main_heading
 
 logger = logging.getLogger(__name__)
 
 
 class LocalScraper(BaseScraper):
-    def __init__(self, root: str):
-        super().__init__(root)
+    def __init__(
+        self,
+        root: str,
+        *,
+        max_workers: int = 8,
+        total_timeout: Optional[float] = None,
+    ):
+        super().__init__(root, total_timeout=total_timeout)
         self.root_file = Path(root).resolve()
         self.local_root_url = self.root_file.as_uri()
         self.base_dir = self.root_file.parent
         self.root_subpages = set()
+        # File reads block: they run here, at most max_workers at a time
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="llms-read"
+        )
 
     async def fetch_content(self, path: str) -> str:
         try:
-            content = Path(path).read_text(encoding="utf-8")
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(
+                self._executor, lambda: Path(path).read_text(encoding="utf-8")
+            )
             return content
         except Exception as e:
             logger.warning(f"⚠️ Could not read local file {path}: {e}")
             return ""
 
-    async def collect_root_subpages(self) -> Dict[str, str]:
-        content_map = {}
+    @property
+    def root_target(self) -> str:
+        return str(self.root_file)
 
+    async def collect_root_subpages(self) -> Dict[str, str]:
         root_html = await self.fetch_content(str(self.root_file))
         if not root_html:
             return {}
 
-        soup = BeautifulSoup(root_html, "html.parser")
+        discovered = self.extract_links(str(self.root_file), root_html)
+        # Always include the root file itself
+        discovered.append(str(self.root_file))
+        self.root_subpages.update(discovered)
+
+        # Read concurrently, reported in document order
+        return {
+            file_path: main_heading(html)
+            for file_path, html in (await self.fetch_all(discovered)).items()
+        }
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        soup = BeautifulSoup(html, "html.parser")
         links = soup.find_all("a", href=True)
+        base_dir = Path(source).parent
+        discovered: List[str] = []
 
         for link in links:
             if isinstance(link, Tag) and isinstance(link.get("href"), str):
                 href: str = str(link["href"])
-                target_path = (self.base_dir / href).resolve()
+                target_path = (base_dir / href).resolve()
 
                 if target_path.suffix == ".html" and target_path.exists():
                     logger.debug(f"Current subview detected: {target_path}")
-                    self.root_subpages.add(str(target_path))
-
-        # Always include the root file itself
-        self.root_subpages.add(str(self.root_file))
-
-        for file_path in self.root_subpages:
-            html = await self.fetch_content(file_path)
-            if html:
-                soup = BeautifulSoup(html, "html.parser")
-                main_heading = soup.find("h1")
-                header_text = (
-                    main_heading.get_text(strip=True) if main_heading else "Untitled"
-                )
+                    discovered.append(str(target_path))
 
-                content_map[file_path] = header_text
+        return discovered
 
-        return content_map
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        await super().close()
@@ -0,0 +1,243 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from open_llms_txt.generators.html_to_md import HtmlToMdGenerator
+from open_llms_txt.utils import ExportReport, atomic_write, content_hash
+
+from .crawler import CrawledPage, Crawler
+
+logger = logging.getLogger(__name__)
+
+# Generator of each worker process, built once by worker_initializer
+_GENERATOR: Optional[HtmlToMdGenerator] = None
+
+
+def worker_initializer(template_dir: Optional[str], template_name: str) -> None:
+    """
+    ``initializer`` of the render pool's workers, e.g.
+    ``ProcessPoolExecutor(initializer=worker_initializer,
+    initargs=(template_dir, template_name))`` for :class:`Pipeline`'s
+    ``executor``.
+    """
+    global _GENERATOR
+    _GENERATOR = HtmlToMdGenerator(
+        template_dir=template_dir, template_name=template_name
+    )
+
+
+def _render(html: str, root_url: str, source_url: str) -> str:
+    """Parse and render one page in a worker (CPU-bound: bs4 + Jinja)."""
+    assert _GENERATOR is not None, "worker not initialized"
+    return _GENERATOR.render(html, root_url=root_url, source_url=source_url)
+
+
+def output_path(target: str, root_target: str) -> str:
+    """
+    Relative ``.html.md`` file for a crawled page: ``https://x.org/docs/intro``
+    -> ``docs/intro.html.md``, ``/`` -> ``index.html.md``, and a local file is
+    placed relative to the root file's directory. Query strings get a short
+    hash suffix so distinct pages never share a file. ``/docs`` and
+    ``/docs.html`` both map to ``docs.html.md``; :class:`Pipeline` fails the
+    second page instead of overwriting the first.
+    """
+    parts = urlsplit(target)
+    if parts.scheme in ("http", "https"):
+        path = parts.path.strip("/") or "index"
+        if parts.query:
+            path += f"-{content_hash(parts.query)[:8]}"
+    else:
+        path = os.path.relpath(target, os.path.dirname(root_target))
+        path = path.replace(os.sep, "/")
+    if path == ".." or path.startswith("../") or "/../" in path:
+        raise ValueError(f"{target} is outside the crawled tree")
+    if not path.endswith(".html"):
+        path += ".html"
+    return f"{path}.md"
+
+
+class Pipeline:
+    """
+    Crawl, render and write a site as three concurrent stages connected by
+    bounded queues:
+
+    1. fetch: a :class:`Crawler` over the scraper (async I/O);
+    2. render: ``processes`` worker processes parse and render pages with
+       :class:`HtmlToMdGenerator` (CPU-bound, off the event loop);
+    3. write: rendered pages are written atomically under ``out_dir``.
+
+    A full queue suspends the stage feeding it, so the crawler stops fetching
+    while renderers are behind and memory stays flat: at most one crawler
+    batch, ``queue_size`` pages per queue and one page per worker are held.
+
+    When the crawler has a checkpoint, pages are confirmed to it once written,
+    so a resumed run (``Crawler(..., resume=True)``) rewrites exactly the pages
+    whose files were not written yet.
+
+    Parameters
+    ----------
+    crawler : Crawler
+        Source of pages (its scraper bounds network concurrency).
+    out_dir : str | Path
+        Output directory, e.g. the web root serving the mirrors.
+    template_name, template_dir :
+        Passed to :class:`HtmlToMdGenerator` in each worker.
+    root_url : str | None
+        ``root_url`` template metadata; ``scheme://host`` of the crawl root by
+        default.
+    processes : int | None
+        Render workers; ``os.cpu_count()`` by default.
+    queue_size : int | None
+        Capacity of each queue; ``2 * processes`` by default.
+    executor : Executor | None
+        Use this pool instead of starting one; its workers must be initialized
+        with :func:`worker_initializer`.
+    """
+
+    def __init__(
+        self,
+        crawler: Crawler,
+        out_dir: Union[str, Path],
+        *,
+        template_name: str = "scraper_template.jinja",
+        template_dir: Optional[str] = None,
+        root_url: Optional[str] = None,
+        processes: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.crawler = crawler
+        self.out_dir = Path(out_dir)
+        self.template_name = template_name
+        self.template_dir = template_dir
+        root = urlsplit(crawler.scraper.root_target)
+        self.root_url = (
+            root_url
+            if root_url is not None
+            else (f"{root.scheme}://{root.netloc}" if root.netloc else "")
+        )
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.queue_size = queue_size or 2 * self.processes
+        self.executor = executor
+        # With a checkpoint, a page is done once written, not once rendered
+        if crawler.checkpoint is not None:
+            crawler.confirm = True
+        # Pages in each stage, for progress reporting
+        self.fetched = 0
+        self.rendered = 0
+        # Page written to each output file, to catch pages sharing one
+        self._claimed: Dict[str, str] = {}
+
+    async def _fetch_stage(self, pages: asyncio.Queue) -> None:
+        try:
+            async for page in self.crawler.crawl():
+                self.fetched += 1
+                await pages.put(page)  # blocks the crawl while renderers lag
+        finally:
+            for _ in range(self.processes):
+                await pages.put(None)
+
+    async def _render_worker(
+        self,
+        pool: Executor,
+        pages: asyncio.Queue,
+        rendered: asyncio.Queue,
+        report: ExportReport,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        root_target = self.crawler.scraper.root_target
+        while True:
+            page: Optional[CrawledPage] = await pages.get()
+            if page is None:
+                return
+            try:
+                rel_file = output_path(page.target, root_target)
+            except ValueError as e:
+                report.failed[page.target] = str(e)
+                self.crawler.complete(page, ok=False)
+                continue
+            owner = self._claimed.setdefault(rel_file, page.target)
+            if owner != page.target:
+                report.failed[page.target] = f"{rel_file} is already {owner}"
+                self.crawler.complete(page, ok=False)
+                continue
+            try:
+                markdown = await loop.run_in_executor(
+                    pool, _render, page.html, self.root_url, page.target
+                )
+            except Exception as e:
+                report.failed[rel_file] = f"render error: {e}"
+                self.crawler.complete(page, ok=False)
+                continue
+            self.rendered += 1
+            await rendered.put((page, rel_file, markdown))
+
+    async def _render_stage(
+        self,
+        pool: Executor,
+        pages: asyncio.Queue,
+        rendered: asyncio.Queue,
+        report: ExportReport,
+    ) -> None:
+        try:
+            await asyncio.gather(
+                *(
+                    self._render_worker(pool, pages, rendered, report)
+                    for _ in range(self.processes)
+                )
+            )
+        finally:
+            await rendered.put(None)
+
+    async def _write_stage(self, rendered: asyncio.Queue, report: ExportReport) -> None:
+        while True:
+            item: Optional[Tuple[CrawledPage, str, str]] = await rendered.get()
+            if item is None:
+                return
+            page, rel_file, markdown = item
+            try:
+                await asyncio.to_thread(
+                    atomic_write, self.out_dir / rel_file, markdown.encode("utf-8")
+                )
+            except OSError as e:
+                report.failed[rel_file] = f"write error: {e}"
+                self.crawler.complete(page, ok=False)
+                continue
+            report.written.append(rel_file)
+            self.crawler.complete(page)
+
+    async def run(self) -> ExportReport:
+        """Run the three stages to completion; per-page errors end up in the report."""
+        report = ExportReport()
+        self._claimed.clear()
+        pages: asyncio.Queue = asyncio.Queue(self.queue_size)
+        rendered: asyncio.Queue = asyncio.Queue(self.queue_size)
+        pool = self.executor or ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=worker_initializer,
+            initargs=(self.template_dir, self.template_name),
+        )
+        tasks = [
+            asyncio.ensure_future(self._fetch_stage(pages)),
+            asyncio.ensure_future(self._render_stage(pool, pages, rendered, report)),
+            asyncio.ensure_future(self._write_stage(rendered, report)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.executor is None:
+                pool.shutdown(cancel_futures=True)
+            self.crawler.flush()
+        logger.info(
+            f"Pipeline done: {len(report.written)} written, {len(report.failed)} failed"
+        )
+        return report
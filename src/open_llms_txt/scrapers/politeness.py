@@ -0,0 +1,239 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from open_llms_txt.scrapers.concurrency import host_key
+
+logger = logging.getLogger(__name__)
+
+# Sends one GET without following redirects (WebScraper._request)
+Fetch = Callable[[str], Awaitable[httpx.Response]]
+
+
+class TokenBucket:
+    """
+    ``rate`` requests per second with bursts of up to ``burst``. Callers
+    reserve a token and sleep the returned delay, so waiting requests queue up
+    in order without a lock.
+    """
+
+    def __init__(
+        self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be > 0 and burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _parse_delay(key: str, value: str) -> Optional[float]:
+    """Seconds asked by a ``Crawl-delay`` or ``Request-rate`` (``n/seconds``)."""
+    try:
+        if key == "crawl-delay":
+            delay = float(value)
+        else:
+            requests, _, seconds = value.partition("/")
+            delay = float(seconds) / float(requests)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return delay if delay >= 0 else None
+
+
+def _groups(lines: Iterable[str]) -> List[Tuple[List[str], Optional[float]]]:
+    """
+    ``(user agents, delay)`` of each group of a ``robots.txt``, in order; the
+    delay comes from ``Crawl-delay``, else ``Request-rate``.
+    """
+    groups: List[Tuple[List[str], Dict[str, float]]] = []
+    in_rules = False
+    for line in lines:
+        key, _, value = line.split("#", 1)[0].partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if key == "user-agent":
+            if in_rules or not groups:
+                groups.append(([], {}))
+                in_rules = False
+            groups[-1][0].append(value.lower())
+        elif key and groups:
+            in_rules = True
+            if key in ("crawl-delay", "request-rate"):
+                delay = _parse_delay(key, value)
+                if delay is not None:
+                    groups[-1][1].setdefault(key, delay)
+    return [
+        (agents, delays.get("crawl-delay", delays.get("request-rate")))
+        for agents, delays in groups
+    ]
+
+
+class RobotsRules:
+    """
+    A host's ``robots.txt`` as fetched from ``url``. ``allow_all`` and
+    ``disallow_all`` record a fetch outcome that decides for every URL; else
+    the parsed rules do.
+
+    ``Crawl-delay`` and ``Request-rate`` are parsed here rather than by
+    :class:`RobotFileParser`, which drops fractional values such as
+    ``Crawl-delay: 0.5``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        text: str = "",
+        *,
+        allow_all: bool = False,
+        disallow_all: bool = False,
+    ):
+        self.url = url
+        self.allow_all = allow_all
+        self.disallow_all = disallow_all
+        lines = text.splitlines()
+        self._parser = RobotFileParser(url)
+        self._parser.parse(lines)
+        self._groups = _groups(lines)
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        if self.disallow_all:
+            return False
+        if self.allow_all:
+            return True
+        return self._parser.can_fetch(user_agent, url)
+
+    def delay(self, user_agent: str) -> Optional[float]:
+        """
+        Seconds between requests asked of ``user_agent``: its own group wins
+        over ``*``, matched like :class:`RobotFileParser` does.
+        """
+        token = user_agent.split("/")[0].lower()
+        for agents, delay in self._groups:
+            if any(agent != "*" and agent in token for agent in agents):
+                return delay
+        for agents, delay in self._groups:
+            if "*" in agents:
+                return delay
+        return None
+
+
+class PoliteScheduler:
+    """
+    Per-host politeness for :class:`WebScraper`: ``robots.txt`` is fetched once
+    per host (and again after ``robots_ttl`` seconds), disallowed URLs are
+    rejected, and requests to a host are spaced by its ``Crawl-delay`` (or
+    ``Request-rate``) through a token bucket. Hosts without a delay, and every
+    other host, are not slowed down.
+
+    Per RFC 9309, a ``robots.txt`` answering 4xx allows everything, while a 5xx
+    or an unreachable host disallows everything until the next fetch. Unlike
+    RFC 9309, which counts 401 and 403 among the 4xx, we treat them as
+    disallow: the site is denying the crawler access. Fetches go through the
+    scraper (and its cache, so offline runs keep working).
+
+    Parameters
+    ----------
+    user_agent : str
+        Product token matched against ``User-agent`` groups.
+    default_delay : float
+        Seconds between requests to hosts that set no delay; ``0`` for none.
+    max_delay : float
+        Upper bound for a site's delay, so one entry cannot stall a crawl.
+    robots_ttl : float
+        Seconds a fetched ``robots.txt`` is trusted.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = "open-llms-txt",
+        *,
+        default_delay: float = 0.0,
+        max_delay: float = 30.0,
+        robots_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.user_agent = user_agent
+        self.default_delay = default_delay
+        self.max_delay = max_delay
+        self.robots_ttl = robots_ttl
+        self.clock = clock
+        self._robots: Dict[str, Tuple[float, "asyncio.Task[RobotsRules]"]] = {}
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+
+    async def _fetch_robots(self, fetch: Fetch, host: str) -> RobotsRules:
+        robots_url = f"{host}/robots.txt"
+        try:
+            url = robots_url
+            response = await fetch(url)
+            for _ in range(5):  # RFC 9309 asks to follow at least five redirects
+                if not response.is_redirect:
+                    break
+                url = urljoin(url, response.headers["location"])
+                response = await fetch(url)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fetch {robots_url}: {e!r}")
+            return RobotsRules(robots_url, disallow_all=True)
+        status = response.status_code
+        # 401/403 disallow, deliberately stricter than RFC 9309's "4xx allow"
+        if status >= 500 or status in (401, 403):
+            logger.warning(f"⚠️ {robots_url} answered {status}")
+            return RobotsRules(robots_url, disallow_all=True)
+        if status >= 400:
+            return RobotsRules(robots_url, allow_all=True)
+        return RobotsRules(robots_url, response.text)
+
+    async def robots(self, fetch: Fetch, url: str) -> RobotsRules:
+        """The host's parsed ``robots.txt``; concurrent callers share one fetch."""
+        host = host_key(url)
+        cached = self._robots.get(host)
+        if cached is None or self.clock() >= cached[0]:
+            task = asyncio.ensure_future(self._fetch_robots(fetch, host))
+            self._robots[host] = (self.clock() + self.robots_ttl, task)
+            self._buckets.pop(host, None)  # the delay may have changed
+        else:
+            task = cached[1]
+        return await asyncio.shield(task)
+
+    async def can_fetch(self, fetch: Fetch, url: str) -> bool:
+        rules = await self.robots(fetch, url)
+        return rules.can_fetch(self.user_agent, url)
+
+    def _delay(self, rules: RobotsRules) -> float:
+        delay: Optional[float] = rules.delay(self.user_agent)
+        if delay is None:
+            delay = self.default_delay
+        return min(float(delay), self.max_delay)
+
+    async def wait(self, fetch: Fetch, url: str) -> None:
+        """Wait for the turn of ``url`` on its host."""
+        host = host_key(url)
+        if host not in self._buckets:
+            delay = self._delay(await self.robots(fetch, url))
+            self._buckets[host] = (
+                TokenBucket(1 / delay, clock=self.clock) if delay > 0 else None
+            )
+        bucket = self._buckets[host]
+        if bucket is not None:
+            await bucket.acquire()
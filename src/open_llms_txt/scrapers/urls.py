@@ -0,0 +1,116 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change the content; a trailing "*" is a prefix
+DEFAULT_TRACKING_PARAMS: FrozenSet[str] = frozenset(
+    {
+        "utm_*",
+        "gclid",
+        "dclid",
+        "fbclid",
+        "msclkid",
+        "yclid",
+        "mc_cid",
+        "mc_eid",
+        "_ga",
+        "_gl",
+        "ref_src",
+    }
+)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking(name: str, exact: FrozenSet[str], prefixes: tuple) -> bool:
+    lowered = name.lower()
+    return lowered in exact or lowered.startswith(prefixes)
+
+
+def canonicalize(
+    url: str, tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS
+) -> str:
+    """
+    Normalized form of an absolute URL: lowercase scheme and host, no default
+    port, no fragment, no trailing slash (except the root path), tracking
+    parameters dropped and the remaining query sorted.
+
+    ``https://Example.com:443/docs/?utm_source=x&b=2&a=1#intro`` ->
+    ``https://example.com/docs?a=1&b=2``
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port is not None and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query = ""
+    if parts.query:
+        params = [p.lower() for p in tracking_params]
+        exact = frozenset(p for p in params if not p.endswith("*"))
+        prefixes = tuple(p[:-1] for p in params if p.endswith("*"))
+        pairs = [
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking(k, exact, prefixes)
+        ]
+        query = urlencode(sorted(pairs))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class UrlCanonicalizer:
+    """
+    Canonicalizes URLs and remembers aliases learned while crawling: redirect
+    sources (``/old`` -> ``/new``) and pages declaring ``<link rel="canonical">``.
+    :meth:`resolve` maps any known alias to the URL its content lives at, so
+    the same content is never fetched twice.
+    """
+
+    def __init__(self, tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS):
+        self.tracking_params = frozenset(tracking_params)
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def canonicalize(self, url: str) -> str:
+        return canonicalize(url, self.tracking_params)
+
+    def resolve(self, url: str) -> str:
+        """Canonical form of ``url``, following recorded aliases."""
+        current = self.canonicalize(url)
+        for _ in range(16):  # alias chains are short; this also stops cycles
+            target = self._aliases.get(current)
+            if target is None or target == current:
+                break
+            current = target
+        return current
+
+    def record_alias(self, alias: str, target: str) -> Optional[str]:
+        """
+        Record that ``alias`` serves the content of ``target``. Returns the
+        resolved target, or ``None`` when nothing was recorded (same URL, or
+        a cycle back to ``alias``).
+        """
+        source = self.canonicalize(alias)
+        resolved = self.resolve(target)
+        if resolved == source:
+            return None
+        with self._lock:
+            self._aliases[source] = resolved
+        logger.debug(f"Alias recorded: {source} -> {resolved}")
+        return resolved
+
+    @property
+    def aliases(self) -> Dict[str, str]:
+        return dict(self._aliases)
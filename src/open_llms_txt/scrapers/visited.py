@@ -0,0 +1,143 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from array import array
+import hashlib
+import math
+from typing import Protocol
+
+
+def fingerprint(url: str) -> int:
+    """Non-zero 64-bit fingerprint of ``url`` (0 marks empty table slots)."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class VisitedSet(Protocol):
+    """What the crawler needs from its visited set."""
+
+    def add(self, url: str) -> bool:
+        """Record ``url``; ``True`` when it had not been seen before."""
+        ...
+
+    def __contains__(self, url: object) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+
+class FingerprintSet:
+    """
+    Exact-enough visited set storing 64-bit URL fingerprints in an
+    open-addressing ``array('Q')`` (linear probing, load factor <= 0.5).
+
+    It costs 16-32 bytes per URL instead of the ~150 of a ``set`` of strings.
+    Two distinct URLs share a fingerprint with probability ~n²/2⁶⁵, i.e. about
+    one in 37 million at 1M URLs.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 1 << max(3, (2 * capacity - 1).bit_length())
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._len = 0
+
+    def _insert(self, fp: int) -> bool:
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                table[i] = fp
+                return True
+            if slot == fp:
+                return False
+            i = (i + 1) & mask
+
+    def _grow(self) -> None:
+        old = self._table
+        size = 2 * len(old)
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        for fp in old:
+            if fp:
+                self._insert(fp)
+
+    def add(self, url: str) -> bool:
+        if 2 * (self._len + 1) > len(self._table):
+            self._grow()
+        if self._insert(fingerprint(url)):
+            self._len += 1
+            return True
+        return False
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        fp = fingerprint(url)
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                return False
+            if slot == fp:
+                return True
+            i = (i + 1) & mask
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        return self._table.itemsize * len(self._table)
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic visited set: about 1.8 MB for 1M URLs at a 0.1%
+    false-positive rate. A false positive makes the crawler skip a URL it has
+    never fetched; nothing is ever fetched twice.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be >= 1 and 0 < error_rate < 1")
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._len = 0
+
+    def _positions(self, url: str):
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return ((h1 + i * h2) % m for i in range(self.num_hashes))
+
+    def add(self, url: str) -> bool:
+        bits = self._bits
+        new = False
+        for pos in self._positions(url):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self._len += 1
+        return new
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(url))
+
+    def __len__(self) -> int:
+        """URLs added (approximate: false positives are not counted)."""
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
@@ -1,42 +1,339 @@
 # Copyright (c) 2025 Ricardo Espantaleón Pérez
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
 import logging
-from typing import Dict
-from urllib.parse import urljoin, urlparse
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urldefrag, urljoin, urlparse
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 import httpx
 
-from open_llms_txt.scrapers.base_scraper import BaseScraper
+from open_llms_txt.scrapers.base_scraper import BaseScraper, main_heading
+from open_llms_txt.scrapers.concurrency import (
+    OVERLOAD_STATUSES,
+    RETRY_STATUSES,
+    AdaptiveLimiter,
+    HostLimiter,
+    RetryPolicy,
+    parse_retry_after,
+)
+from open_llms_txt.scrapers.http_cache import HttpCache
+from open_llms_txt.scrapers.http_client import build_client
+from open_llms_txt.scrapers.politeness import PoliteScheduler
+from open_llms_txt.scrapers.urls import DEFAULT_TRACKING_PARAMS, UrlCanonicalizer
+from open_llms_txt.scrapers.visited import FingerprintSet
 
 logger = logging.getLogger(__name__)
 
 
+# Default ``accept_types``: what the HTML parser can make sense of
+HTML_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+
+# Describe the body on the wire, not the decoded bytes kept in memory
+_FRAMING_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+class ResponseSkippedError(Exception):
+    """A response abandoned on purpose (not HTML, too large); not a failure."""
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+def _canonical_link(html: str) -> Optional[str]:
+    """``href`` of the page's ``<link rel="canonical">``, if any."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("link"))
+    for link in soup.find_all("link", href=True):
+        # A multi-valued attribute: a list, or a string with a custom parser
+        value = link.get("rel")
+        rel: List[str] = value.split() if isinstance(value, str) else list(value or [])
+        if "canonical" in (r.lower() for r in rel):
+            href = link.get("href")
+            return href.strip() if isinstance(href, str) else None
+    return None
+
+
 class WebScraper(BaseScraper):
-    def __init__(self, root: str):
-        super().__init__(root)
-        self.domain = urlparse(self.root_page).netloc
-        self.client = httpx.AsyncClient(follow_redirects=True)
+    def __init__(
+        self,
+        root: str,
+        *,
+        max_concurrency: int = 10,
+        per_host_limit: int = 4,
+        request_timeout: Optional[float] = 10.0,
+        total_timeout: Optional[float] = None,
+        max_redirects: int = 20,
+        tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS,
+        cache: Optional[HttpCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        connect_timeout: Optional[float] = 5.0,
+        limiter: Optional[Union[HostLimiter, AdaptiveLimiter]] = None,
+        retry: Optional[RetryPolicy] = None,
+        scheduler: Optional[PoliteScheduler] = None,
+        max_body_size: int = 10 * 1024 * 1024,
+        accept_types: Iterable[str] = HTML_TYPES,
+    ):
+        if client is not None and transport is not None:
+            raise ValueError("Pass either client or transport, not both")
+        super().__init__(root, total_timeout=total_timeout)
+        self.domain = urlparse(self.root_page).netloc.lower()
+        # Links, redirect targets and canonical links all go through it, so
+        # /docs, /docs/, /docs#intro and /docs?utm_source=x are one page
+        self.urls = UrlCanonicalizer(tracking_params)
+        # Final URL of fetches that were redirected, by requested URL
+        self._locations: Dict[str, str] = {}
+        # Canonical URLs whose content was downloaded; redirects are followed
+        # by hand so a hop onto one of them is not fetched again
+        self._downloaded = FingerprintSet()
+        self.max_redirects = max_redirects
+        # Conditional re-crawls / offline runs; owned by the caller (not closed)
+        self.cache = cache
+        self.request_timeout = request_timeout
+        # Fixed limits by default; pass an AdaptiveLimiter to find them by AIMD
+        self.limiter = limiter or HostLimiter(max_concurrency, per_host_limit)
+        # No retries by default
+        self.retry = retry
+        # robots.txt and per-host crawl delays; none by default
+        self.scheduler = scheduler
+        # Bodies are streamed and abandoned past this size or when not HTML;
+        # every abandoned URL is kept in ``skipped`` with its reason
+        self.max_body_size = max_body_size
+        self.accept_types = frozenset(t.lower() for t in accept_types)
+        self.skipped: Dict[str, str] = {}
+        # An injected client is shared (its pool too) and left open on close();
+        # by default the pool matches the concurrency cap, all kept alive, and
+        # ``transport`` only swaps the network layer of that owned client
+        self._owns_client = client is None
+        self.client = client or build_client(
+            limits=limits
+            or httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            http2=http2,
+            timeout=httpx.Timeout(request_timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    def _check_type(self, url: str, response: httpx.Response) -> None:
+        content_type = response.headers.get("content-type", "")
+        media_type = content_type.split(";")[0].strip().lower()
+        # No Content-Type at all: let the parser have a go
+        if response.status_code == 200 and media_type:
+            if media_type not in self.accept_types:
+                raise ResponseSkippedError(url, f"content-type {media_type}")
+
+    async def _send(
+        self, url: str, headers: Optional[Dict[str, str]], html_only: bool
+    ) -> httpx.Response:
+        """
+        GET ``url`` streaming the body, abandoned as soon as the headers show a
+        non-HTML type or a size over ``max_body_size``, or once the bytes read
+        pass it.
+        """
+        async with self.client.stream(
+            "GET", url, headers=headers, follow_redirects=False
+        ) as response:
+            if html_only:
+                self._check_type(url, response)
+            declared = response.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > self.max_body_size:
+                raise ResponseSkippedError(url, f"content-length {declared}")
+            chunks: List[bytes] = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_body_size:
+                    raise ResponseSkippedError(
+                        url, f"body over {self.max_body_size} bytes"
+                    )
+                chunks.append(chunk)
+        # Rebuilt around the decoded body, so without its framing headers
+        return httpx.Response(
+            response.status_code,
+            headers=[
+                (name, value)
+                for name, value in response.headers.multi_items()
+                if name.lower() not in _FRAMING_HEADERS
+            ],
+            content=b"".join(chunks),
+            request=response.request,
+        )
+
+    async def _request(self, url: str, html_only: bool = True) -> httpx.Response:
+        """One GET, through ``self.cache`` when there is one."""
+        cache = self.cache
+        if cache is None:
+            return await self._send(url, None, html_only)
+        cached = cache.get(url)
+        if cache.offline:
+            if cached is None:
+                cache.misses += 1
+                raise LookupError(f"not in the offline cache: {url}")
+            cache.hits += 1
+            response = cached.to_response()
+            if html_only:
+                self._check_type(url, response)
+            return response
+
+        headers = cached.validators() if cached is not None else None
+        response = await self._send(url, headers, html_only)
+        if response.status_code == 304 and cached is not None:
+            cache.revalidated += 1
+            cache.refresh(cached, response)
+            return cached.to_response()
+        cache.misses += 1
+        cache.store(url, response)
+        return response
+
+    async def _get(self, url: str) -> Tuple[Optional[httpx.Response], str]:
+        """
+        GET ``url`` following redirects hop by hop, so each hop is recorded as
+        an alias. Stops early (``None``) at a URL whose content was already
+        downloaded. Returns the response and the URL it came from.
+        """
+        for _ in range(self.max_redirects + 1):
+            response = await self._request(url)
+            location = response.headers.get("location")
+            if not (300 <= response.status_code < 400 and location):
+                return response, url
+            target = urljoin(url, location)
+            if not await self.can_fetch(target):
+                raise ResponseSkippedError(
+                    url, f"redirect to {target} disallowed by robots.txt"
+                )
+            self.urls.record_alias(url, target)
+            if self.resolve(target) in self._downloaded:
+                logger.debug(f"Redirect to already fetched content: {url} -> {target}")
+                return None, target
+            url = target
+        raise httpx.TooManyRedirects(f"Exceeded {self.max_redirects} redirects")
+
+    async def _fetch_once(self, url: str) -> str:
+        """One attempt; raises on failure after reporting it to the limiter."""
+        async with self.limiter.slot(url) as feedback:
+            try:
+                # Bounds the whole exchange, body included (httpx's own
+                # timeout applies per socket operation)
+                response, final_url = await asyncio.wait_for(
+                    self._get(url), self.request_timeout
+                )
+            except (TimeoutError, httpx.TimeoutException):
+                feedback.overloaded()
+                raise
+            except httpx.TransportError:
+                feedback.failed()
+                raise
+            except Exception:
+                feedback.ignore()
+                raise
+            if response is None:
+                return ""
+            status = response.status_code
+            if status in OVERLOAD_STATUSES:
+                feedback.overloaded(
+                    parse_retry_after(response.headers.get("retry-after"))
+                )
+            elif status >= 500:
+                feedback.failed()
+        response.raise_for_status()
+        if final_url != url:
+            # Relative links resolve against where the content really is
+            self._locations[url] = final_url
+            self.urls.record_alias(url, final_url)
+        self._downloaded.add(self.resolve(final_url))
+        return response.text
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds before the next attempt, or ``None`` when not retrying."""
+        if self.retry is None or attempt + 1 >= self.retry.attempts:
+            return None
+        if isinstance(error, httpx.HTTPStatusError):
+            if error.response.status_code not in RETRY_STATUSES:
+                return None
+            retry_after = parse_retry_after(error.response.headers.get("retry-after"))
+            return self.retry.delay(attempt, retry_after)
+        if isinstance(error, (TimeoutError, httpx.TransportError)):
+            return self.retry.delay(attempt)
+        return None
+
+    async def _fetch_any(self, url: str) -> httpx.Response:
+        """``_request`` for non-page resources such as robots.txt."""
+        return await self._request(url, html_only=False)
+
+    async def can_fetch(self, target: str) -> bool:
+        if self.scheduler is None:
+            return True
+        return await self.scheduler.can_fetch(self._fetch_any, target)
+
+    def _skip(self, url: str, reason: str) -> None:
+        self.skipped[url] = reason
+        logger.info(f"Skipped {url}: {reason}")
 
     async def fetch_content(self, url: str) -> str:
-        try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            return response.text
-        except Exception as e:
-            logger.warning(f"⚠️ Could not fetch {url}: {e}")
+        if not await self.can_fetch(url):
+            self._skip(url, "disallowed by robots.txt")
             return ""
+        attempt = 0
+        while True:
+            try:
+                if self.scheduler is not None:
+                    # Before taking a slot: a slow host never holds global ones
+                    await self.scheduler.wait(self._fetch_any, url)
+                return await self._fetch_once(url)
+            except ResponseSkippedError as e:
+                self._skip(url, e.reason)
+                return ""
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    logger.warning(f"⚠️ Could not fetch {url}: {e!r}")
+                    return ""
+                logger.debug(f"Retrying {url} in {delay:.2f}s after {e!r}")
+                await asyncio.sleep(delay)
+                attempt += 1
 
     async def collect_root_subpages(self) -> Dict[str, str]:
         html = await self.fetch_content(self.root_page)
         if not html:
             return {}
 
+        root = self.page_identity(self.root_page, html)
+        discovered = [
+            url
+            for url in self.extract_links(self.root_page, html)
+            if self.resolve(url) != root
+        ]
+        self.root_subpages.update(discovered)
+
+        # Fetched concurrently, reported in document order under their
+        # canonical URL
+        return {
+            self.resolve(url): main_heading(content)
+            for url, content in (await self.fetch_all(discovered)).items()
+        }
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        """
+        Same-domain http(s) links without their fragment, one per canonical
+        URL (see :meth:`resolve`). They are returned as written rather than
+        canonicalized, since servers do not all treat ``/docs`` and ``/docs/``
+        alike.
+        """
         soup = BeautifulSoup(html, "html.parser")
         links = soup.find_all("a", href=True)
+        base = self._locations.get(source, source)
 
-        content_map = {}
+        discovered: List[str] = []
+        seen = set()
 
         for link in links:
             if not isinstance(link, Tag):
@@ -46,25 +343,39 @@ class WebScraper(BaseScraper):
             if not isinstance(href_value, str):
                 continue  # Skip non-string hrefs
 
-            parsed_href = urlparse(href_value)
+            full_url, _ = urldefrag(urljoin(base, href_value.strip()))
+            parsed_url = urlparse(full_url)
+            if parsed_url.scheme not in ("http", "https"):
+                continue  # mailto:, javascript:, ...
+            if parsed_url.netloc.lower() != self.domain:
+                continue
+
+            key = self.resolve(full_url)
+            if key in seen:
+                continue
+            seen.add(key)
+            logger.debug(f"Current subview detected: {full_url}")
+            discovered.append(full_url)
 
-            if parsed_href.netloc == "" or parsed_href.netloc == self.domain:
-                full_url = urljoin(self.root_page, href_value)
-                logger.debug(f"Current subview detected: {full_url}")
-                self.root_subpages.add(full_url)
+        return discovered
 
-        for url in self.root_subpages:
-            content = await self.fetch_content(url)
-            if content:
-                soup = BeautifulSoup(content, "html.parser")
-                main_heading = soup.find("h1")
-                header_text = (
-                    main_heading.get_text(strip=True) if main_heading else "Untitled"
-                )
-                content_map[url] = header_text
+    def resolve(self, target: str) -> str:
+        """Canonical URL of ``target``, following known redirects and aliases."""
+        return self.urls.resolve(target)
 
-        return content_map
+    def page_identity(self, target: str, html: str) -> str:
+        """
+        Canonical URL of a fetched page; a same-domain ``<link rel="canonical">``
+        is recorded as an alias of ``target`` first.
+        """
+        canonical = _canonical_link(html)
+        if canonical:
+            absolute = urljoin(self._locations.get(target, target), canonical)
+            if urlparse(absolute).netloc.lower() == self.domain:
+                self.urls.record_alias(target, absolute)
+        return self.urls.resolve(target)
 
     async def close(self) -> None:
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
         await super().close()
@@ -0,0 +1,66 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import contextlib
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Dict, List
+
+
+def content_hash(*parts: str) -> str:
+    """Stable SHA-256 hex digest of the given text parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write ``data`` to ``path`` atomically: readers (e.g. nginx) either see the
+    previous file or the complete new one, never a partially written body.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+@dataclass
+class ExportReport:
+    """
+    Machine-readable summary of a run writing Markdown files (the Flask static
+    export or the crawl pipeline).
+    """
+
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "written": sorted(self.written),
+            "unchanged": sorted(self.unchanged),
+            "removed": sorted(self.removed),
+            "failed": dict(sorted(self.failed.items())),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
@@ -0,0 +1,78 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import pytest
+
+from open_llms_txt.middleware.allowlist import AllowList, rule_to_glob
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/docs", True),
+        ("/docs/intro", False),
+        ("/api", False),
+        ("/api/v1/users", True),
+        ("/blog/hello", True),
+        ("/blog/hello/comments", False),
+        ("/shop/12/spec", True),
+        ("/shop/12/34/spec", False),
+        ("/files/a1.txt", True),
+        ("/files/c1.txt", False),
+        ("/any/depth/notes.md", True),
+        ("/missing", False),
+    ],
+)
+def test_exact_prefix_and_glob_rules(path: str, expected: bool):
+    allowed = AllowList(
+        [
+            "/docs",
+            "/api/**",
+            "/blog/*",
+            "/shop/*/spec",
+            "/files/[ab]?.txt",
+            "/**/*.md",
+        ]
+    )
+
+    assert (path in allowed) is expected
+    assert allowed(path) is expected
+
+
+def test_iterates_exact_rules_sorted():
+    allowed = AllowList(["/b", "/a", "/c/**", "/d/*"])
+    allowed.add("/0")
+
+    assert list(allowed) == ["/0", "/a", "/b"]
+    assert len(allowed) == 3
+    assert 42 not in allowed
+    allowed.clear()
+    assert list(allowed) == [] and "/a" not in allowed
+
+
+def test_rule_to_glob_maps_werkzeug_converters():
+    assert rule_to_glob("/blog/<slug>") == "/blog/*"
+    assert rule_to_glob("/u/<int:id>/<path:rest>") == "/u/*/**"
+    assert rule_to_glob("/c/<string(length=2):code>.json") == "/c/*.json"
+
+
+def test_lookups_only_visit_rules_anchored_along_the_path():
+    rules = [f"/s{i}/page" for i in range(100)]
+    rules += [f"/s{i}/p/**" for i in range(100)]
+    rules += [f"/s{i}/g/*.md" for i in range(100)]
+    allowed = AllowList(rules)
+
+    assert "/s7/page" in allowed
+    assert "/s7/p/a/b" in allowed
+    assert "/s7/g/x.md" in allowed
+    assert "/s7/g/x.txt" not in allowed
+    assert "/s7/nope" not in allowed
+    # Only the globs under /s7/g were compiled, not the other 99 branches'
+    compiled = [
+        name
+        for name, branch in allowed._root.children.items()
+        if branch.children["g"]._regex is not None
+    ]
+    assert compiled == ["s7"]
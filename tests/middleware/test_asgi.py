@@ -0,0 +1,288 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Pattern
+
+import httpx
+import pytest
+
+from open_llms_txt.middleware.asgi import LlmsTxtMiddleware, html2md, llmstxt
+from open_llms_txt.middleware.limiter import RenderLimiter
+
+
+@pytest.fixture
+def tmp_templates(tmp_path: Path):
+    (tmp_path / "html_to_md.jinja").write_text(
+        "# {{ title }}\n{{ h1 }}\n", encoding="utf-8"
+    )
+    (tmp_path / "llms.txt.jinja").write_text(
+        "SOURCE={{ metadata.source_url }}\n"
+        "ALLOWED={{ metadata.allowed_paths|join(',') }}\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+class Route:
+    def __init__(self, path: str, endpoint: Callable):
+        self.path = path
+        self.endpoint = endpoint
+        self.path_regex: Optional[Pattern[str]] = None
+
+    def matches(self, path: str) -> bool:
+        if self.path_regex is not None:
+            return self.path_regex.match(path) is not None
+        return re.fullmatch(re.sub(r"{\w+}", "[^/]+", self.path), path) is not None
+
+
+class MiniApp:
+    """Tiny ASGI router exposing a Starlette-like ``routes`` table."""
+
+    def __init__(self) -> None:
+        self.routes: List[Route] = []
+        self.calls: Dict[str, int] = {}
+
+    def get(self, path: str):
+        def register(endpoint: Callable) -> Callable:
+            self.routes.append(Route(path, endpoint))
+            return endpoint
+
+        return register
+
+    async def __call__(self, scope, receive, send):
+        for route in self.routes:
+            if route.matches(scope["path"]):
+                self.calls[route.path] = self.calls.get(route.path, 0) + 1
+                html = (await route.endpoint()).encode("utf-8")
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 200,
+                        "headers": [(b"content-type", b"text/html; charset=utf-8")],
+                    }
+                )
+                # Stream the body in two chunks like a StreamingResponse would
+                half = len(html) // 2
+                first = {"type": "http.response.body", "body": html[:half]}
+                await send({**first, "more_body": True})
+                await send({"type": "http.response.body", "body": html[half:]})
+                return
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b"not found"})
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.threads: List[str] = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        def run():
+            self.threads.append(threading.current_thread().name)
+            return fn(*args, **kwargs)
+
+        return super().submit(run)
+
+
+def make_app() -> MiniApp:
+    app = MiniApp()
+
+    @app.get("/")
+    @llmstxt()
+    async def home():
+        return "<html><head><title>Home</title></head><body></body></html>"
+
+    @app.get("/docs")
+    @html2md()
+    async def docs():
+        await asyncio.sleep(0.01)
+        return "<html><head><title>Docs</title></head><body><h1>Hi</h1></body></html>"
+
+    @app.get("/users/{id}")
+    @html2md()
+    async def user():
+        return "<html></html>"
+
+    @app.get("/private")
+    async def private():
+        return "<html><head><title>Private</title></head></html>"
+
+    return app
+
+
+def client_for(middleware: LlmsTxtMiddleware) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=middleware), base_url="http://testserver"
+    )
+
+
+async def test_mirror_renders_decorated_route_off_the_event_loop(tmp_templates: Path):
+    app = make_app()
+    executor = CountingExecutor()
+    mw = LlmsTxtMiddleware(app, template_dir=str(tmp_templates), executor=executor)
+
+    async with client_for(mw) as client:
+        res = await client.get("/docs.html.md")
+        html = await client.get("/docs")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/markdown")
+    assert res.text == "# Docs\nHi"
+    assert html.text.startswith("<html>")
+    assert executor.threads and all(
+        name != threading.current_thread().name for name in executor.threads
+    )
+
+
+async def test_undecorated_and_param_routes_are_not_mirrored(tmp_templates: Path):
+    mw = LlmsTxtMiddleware(make_app(), template_dir=str(tmp_templates))
+
+    async with client_for(mw) as client:
+        private = await client.get("/private.html.md")
+        param = await client.get("/users/{id}.html.md")
+        missing = await client.post("/docs.html.md")
+
+    assert private.status_code == 404
+    assert "not enabled" in private.text
+    assert param.status_code == 404
+    assert missing.status_code == 404  # non-GET requests go to the app
+
+
+async def test_param_routes_match_concrete_urls(tmp_templates: Path):
+    app = make_app()
+
+    @app.get("/blog/{slug}")
+    @html2md(allow_param_routes=True, cache_ttl=60)
+    async def post():
+        return "<html><head><title>Post</title></head></html>"
+
+    @app.get("/items/{id:int}")
+    @html2md(allow_param_routes=True)
+    async def item():
+        return "<html><head><title>Item</title></head></html>"
+
+    # Starlette compiles convertors into the route's own regex
+    app.routes[-1].path_regex = re.compile(r"^/items/(?P<id>[0-9]+)$")
+    mw = LlmsTxtMiddleware(app, template_dir=str(tmp_templates))
+
+    async with client_for(mw) as client:
+        post_md = await client.get("/blog/hello.html.md")
+        again = await client.get("/blog/hello.html.md")
+        nested = await client.get("/blog/a/b.html.md")
+        item_md = await client.get("/items/42.html.md")
+        not_int = await client.get("/items/abc.html.md")
+        not_opted_in = await client.get("/users/7.html.md")
+
+    assert post_md.status_code == 200
+    assert post_md.text.startswith("# Post")
+    assert again.text == post_md.text
+    assert app.calls["/blog/{slug}"] == 1  # the route's cache_ttl applies
+    assert nested.status_code == 404
+    assert item_md.status_code == 200
+    assert not_int.status_code == 404
+    assert not_opted_in.status_code == 404
+
+
+async def test_limiter_sheds_renders_over_capacity(tmp_templates: Path):
+    app = make_app()
+
+    @app.get("/slow/{n}")
+    @html2md(allow_param_routes=True)
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "<html><head><title>Slow</title></head></html>"
+
+    limiter = RenderLimiter(1, max_queue=0, retry_after=7)
+    mw = LlmsTxtMiddleware(app, template_dir=str(tmp_templates), limiter=limiter)
+
+    async with client_for(mw) as client:
+        results = await asyncio.gather(
+            *(client.get(f"/slow/{n}.html.md") for n in range(3))
+        )
+
+    statuses = sorted(r.status_code for r in results)
+    assert statuses == [200, 503, 503]
+    shed = next(r for r in results if r.status_code == 503)
+    assert shed.headers["retry-after"] == "7"
+    assert "over capacity" in shed.text
+    assert limiter.stats()["in_flight"] == 0
+
+
+async def test_manifest_uses_decorated_source_and_allow_list(tmp_templates: Path):
+    mw = LlmsTxtMiddleware(
+        make_app(), template_dir=str(tmp_templates), mount_prefix="/.llms"
+    )
+
+    async with client_for(mw) as client:
+        manifest = await client.get("/llms.txt")
+        mirror = await client.get("/.llms/docs.html.md")
+        unprefixed = await client.get("/docs.html.md")
+
+    assert manifest.status_code == 200
+    assert "SOURCE=http://testserver/" in manifest.text
+    assert "ALLOWED=/docs" in manifest.text
+    assert mirror.status_code == 200
+    assert unprefixed.status_code == 404  # passed through to the app
+
+
+async def test_cache_ttl_and_coalescing(tmp_templates: Path):
+    app = make_app()
+
+    @app.get("/slow")
+    @html2md(cache_ttl=60)
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "<html><head><title>Slow</title></head></html>"
+
+    mw = LlmsTxtMiddleware(app, template_dir=str(tmp_templates), paths=["/private"])
+
+    async with client_for(mw) as client:
+        results = await asyncio.gather(*(client.get("/slow.html.md") for _ in range(5)))
+        again = await client.get("/slow.html.md")
+        await client.get("/docs.html.md")
+        await client.get("/docs.html.md")
+        private = await client.get("/private.html.md")
+
+    assert [r.status_code for r in results] == [200] * 5
+    assert app.calls["/slow"] == 1  # coalesced, then served fresh from cache
+    assert again.text == results[0].text
+    assert app.calls["/docs"] == 2  # no TTL: revalidated against the HTML hash
+    assert private.status_code == 200  # explicitly configured path
+
+
+async def test_compressed_variant_is_negotiated(tmp_templates: Path):
+    app = make_app()
+
+    @app.get("/long")
+    @html2md()
+    async def long():
+        words = " ".join(f"word{i}" for i in range(400))
+        return f"<html><head><title>{words}</title></head></html>"
+
+    mw = LlmsTxtMiddleware(app, template_dir=str(tmp_templates))
+    async with client_for(mw) as client:
+        res = await client.get("/long.html.md", headers={"Accept-Encoding": "gzip"})
+        head = await client.head("/long.html.md")
+
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert res.text.startswith("# word0")  # decoded by httpx
+    assert head.status_code == 200
+    assert head.content == b""
+
+
+async def test_downstream_errors_become_markdown_errors(tmp_templates: Path):
+    mw = LlmsTxtMiddleware(make_app(), template_dir=str(tmp_templates), paths=["/gone"])
+
+    async with client_for(mw) as client:
+        res = await client.get("/gone.html.md")
+
+    assert res.status_code == 404
+    assert res.text == "# 404\nFailed to render `/gone`.\n"
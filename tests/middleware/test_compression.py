@@ -0,0 +1,74 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+
+import pytest
+
+from open_llms_txt.middleware.compression import (
+    AVAILABLE_ENCODINGS,
+    compress_variants,
+    select_encoding,
+)
+
+
+def test_compress_variants_skips_small_bodies():
+    assert compress_variants(b"# tiny\n") == {}
+
+
+def test_compress_variants_gzip_roundtrip():
+    body = ("# Docs\n" + "Lorem ipsum dolor sit amet. " * 200).encode("utf-8")
+    variants = compress_variants(body)
+
+    assert set(variants) == set(AVAILABLE_ENCODINGS)
+    assert gzip.decompress(variants["gzip"]) == body
+    assert all(len(v) < len(body) for v in variants.values())
+    # Deterministic output for the same content version
+    assert compress_variants(body)["gzip"] == variants["gzip"]
+
+
+@pytest.mark.parametrize(
+    "header,available,expected",
+    [
+        (None, ["gzip"], None),
+        ("", ["gzip"], None),
+        ("gzip", ["gzip"], "gzip"),
+        ("gzip, deflate", [], None),
+        ("deflate", ["gzip"], None),
+        ("gzip;q=0", ["gzip"], None),
+        ("*", ["gzip"], "gzip"),
+        ("*, gzip;q=0", ["gzip"], None),
+        ("GZIP ; q=0.5", ["gzip"], "gzip"),
+        ("gzip;q=abc", ["gzip"], None),
+    ],
+)
+def test_select_encoding(header, available, expected):
+    assert select_encoding(header, available) == expected
+
+
+def test_select_encoding_prefers_highest_q_then_server_order():
+    available = list(AVAILABLE_ENCODINGS)
+    assert select_encoding("gzip, br, zstd", available) == AVAILABLE_ENCODINGS[0]
+    if "br" in available:
+        assert select_encoding("gzip;q=1.0, br;q=0.5", available) == "gzip"
+
+
+def test_compress_variants_brotli_roundtrip():
+    brotli = pytest.importorskip("brotli")
+    body = ("# Docs\n" + "Lorem ipsum dolor sit amet. " * 200).encode("utf-8")
+
+    assert brotli.decompress(compress_variants(body)["br"]) == body
+
+
+def test_compress_variants_zstd_roundtrip_across_threads():
+    zstandard = pytest.importorskip("zstandard")
+    bodies = [
+        (f"# Page {i}\n" + "Lorem ipsum dolor sit amet. " * 200).encode("utf-8")
+        for i in range(32)
+    ]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        variants = list(pool.map(compress_variants, bodies))
+
+    decompressor = zstandard.ZstdDecompressor()
+    assert [decompressor.decompress(v["zstd"]) for v in variants] == bodies
@@ -3,24 +3,38 @@
 
 from __future__ import annotations
 
+from collections import Counter
+import dataclasses
+import gzip
+import json
+import os
 from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Dict
 
 from flask import Flask, render_template_string
 import pytest
 
+from open_llms_txt.middleware.cache import CacheEntry, CacheKey, RenderCache
+from open_llms_txt.middleware.export import export_static
 import open_llms_txt.middleware.flask as mw
-from open_llms_txt.middleware.flask import html2md, llmstxt
+from open_llms_txt.middleware.flask import (
+    enable_metrics,
+    html2md,
+    invalidate,
+    llmstxt,
+    use_render_cache,
+)
+from open_llms_txt.middleware.limiter import RenderLimiter
+from open_llms_txt.middleware.sqlite_cache import SqliteRenderCache
 
 
 @pytest.fixture(autouse=True)
 def reset_middleware_state():
     """Reset module-level global state so tests don't interfere with each other"""
 
-    mw._ALLOWED_PATHS.clear()
-    mw._DECORATED_ENDPOINTS.clear()
-    mw._ENDPOINT_POLICY.clear()
-    mw._BLUEPRINT_MOUNTED = False
-    mw._MANIFEST_BP_MOUNTED = False
+    mw._reset_state()
 
 
 @pytest.fixture
@@ -43,6 +57,89 @@ def make_app() -> Flask:
     return app
 
 
+def html(title: str) -> str:
+    return f"<html><head><title>{title}</title></head><body></body></html>"
+
+
+class Site:
+    """
+    App under test built route by route. Each view returns ``pages[rule]`` (a
+    body, a ``(body, status)`` tuple, or a callable taking the rule values)
+    and counts its calls in ``calls[rule]``; tests edit ``pages`` to change
+    what the upstream serves.
+    """
+
+    def __init__(self, tmp_templates: Path, *, mount_prefix: str = ""):
+        self.app = make_app()
+        self.template_dir = str(tmp_templates)
+        self.mount_prefix = mount_prefix
+        self.pages: Dict[str, Any] = {}
+        self.calls: Counter[str] = Counter()
+
+    def _view(self, rule: str, page: Any, endpoint: str | None) -> Callable:
+        self.pages[rule] = page
+
+        def view(**values):
+            self.calls[rule] += 1
+            page = self.pages[rule]
+            return page(**values) if callable(page) else page
+
+        name = rule.strip("/").replace("/", "_").replace("<", "").replace(">", "")
+        view.__name__ = endpoint or name or "index"
+        return view
+
+    def route(self, rule: str, page: Any, *, endpoint: str | None = None) -> Site:
+        """An undecorated route."""
+        self.app.add_url_rule(rule, view_func=self._view(rule, page, endpoint))
+        return self
+
+    def mirror(self, rule: str, page: Any, **options: Any) -> Site:
+        """A route decorated with ``html2md`` (``options`` override the defaults)."""
+        endpoint = options.pop("endpoint", None)
+        decorate = html2md(
+            self.app,
+            **{
+                "template_dir": self.template_dir,
+                "template_name": "html_to_md.jinja",
+                "mount_prefix": self.mount_prefix,
+                **options,
+            },
+        )
+        view = decorate(self._view(rule, page, endpoint))
+        self.app.add_url_rule(rule, view_func=view)
+        return self
+
+    def manifest(self, rule: str, page: Any, **options: Any) -> Site:
+        """The ``llmstxt`` source page (``options`` override the defaults)."""
+        decorate = llmstxt(
+            self.app,
+            **{
+                "template_dir": self.template_dir,
+                "template_name": "llms.txt.jinja",
+                "mount_prefix": self.mount_prefix,
+                **options,
+            },
+        )
+        view = decorate(self._view(rule, page, "home"))
+        self.app.add_url_rule(rule, view_func=view)
+        return self
+
+
+class KeyRecordingCache(RenderCache):
+    """``RenderCache`` remembering the keys it stored, so tests can ``get`` them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.keys: Dict[CacheKey, None] = {}
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        self.keys[key] = None
+        super().set(key, entry)
+
+    def key_for(self, path: str) -> CacheKey:
+        return next(key for key in self.keys if key[1] == path)
+
+
 def test_html2md_exposes_markdown_for_decorated_endpoint(tmp_templates: Path):
     app = make_app()
 
@@ -195,3 +292,823 @@ def test_llmstxt_returns_500_if_source_unresolvable(tmp_templates: Path):
 
     assert res.status_code == 500
     assert "Unable to resolve source page for llms.txt." in res.get_data(as_text=True)
+
+
+def _long_page(title: str) -> str:
+    return (
+        f"<html><head><title>{title}</title></head><body>"
+        f"<h1>{'Markdown mirrors compress well. ' * 40}</h1>"
+        "</body></html>"
+    )
+
+
+def test_html2md_serves_precompressed_variant_for_accept_encoding(
+    tmp_templates: Path,
+):
+    app = make_app()
+
+    @app.get("/docs")
+    @html2md(app, template_dir=str(tmp_templates), template_name="html_to_md.jinja")
+    def docs():
+        return _long_page("Docs")
+
+    client = app.test_client()
+
+    plain = client.get("/docs.html.md")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    res = client.get("/docs.html.md", headers={"Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert gzip.decompress(res.data) == plain.data
+
+
+def test_render_cache_reuses_render_while_html_is_unchanged(
+    tmp_templates: Path, monkeypatch
+):
+    app = make_app()
+    page = {"html": _long_page("v1"), "views": 0}
+
+    @app.get("/docs")
+    @html2md(app, template_dir=str(tmp_templates), template_name="html_to_md.jinja")
+    def docs():
+        page["views"] += 1
+        return page["html"]
+
+    renders = []
+    original = mw._render_markdown
+
+    def counting_render(html, **kwargs):
+        renders.append(1)
+        return original(html, **kwargs)
+
+    monkeypatch.setattr(mw, "_render_markdown", counting_render)
+    client = app.test_client()
+
+    assert client.get("/docs.html.md").status_code == 200
+    assert client.get("/docs.html.md").status_code == 200
+    assert page["views"] == 2  # no TTL: the view is still consulted
+    assert len(renders) == 1  # ...but the render is reused
+
+    page["html"] = _long_page("v2")
+    assert "# v2" in client.get("/docs.html.md").get_data(as_text=True)
+    assert len(renders) == 2
+
+
+def test_render_cache_ttl_skips_view_dispatch(tmp_templates: Path):
+    app = make_app()
+    calls = []
+
+    @app.get("/docs")
+    @html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="html_to_md.jinja",
+        cache_ttl=60,
+    )
+    def docs():
+        calls.append(1)
+        return _long_page("Docs")
+
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get("/docs.html.md").status_code == 200
+    # One dispatch from the mirror; direct /docs hits are not involved
+    assert len(calls) == 1
+
+
+def test_html2md_negotiates_markdown_on_original_route(
+    tmp_templates: Path, monkeypatch
+):
+    app = make_app()
+    calls = []
+
+    @app.get("/docs")
+    @html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="html_to_md.jinja",
+        negotiate=True,
+    )
+    def docs():
+        calls.append(1)
+        return "<html><head><title>Docs</title></head><body></body></html>"
+
+    def no_dispatch(*args, **kwargs):
+        raise AssertionError("negotiation must not re-dispatch via test_client")
+
+    monkeypatch.setattr(mw, "_dispatch_html", no_dispatch)
+    client = app.test_client()
+
+    md = client.get("/docs", headers={"Accept": "text/markdown, text/html;q=0.9"})
+    assert md.status_code == 200
+    assert md.mimetype == "text/markdown"
+    assert md.get_data(as_text=True).startswith("# Docs")
+    assert "Accept" in md.headers["Vary"]
+    assert len(calls) == 1
+
+    html = client.get("/docs", headers={"Accept": "text/html,*/*;q=0.8"})
+    assert html.mimetype == "text/html"
+    assert "Accept" in html.headers["Vary"]
+
+
+def test_html2md_negotiation_passes_through_errors_and_is_opt_in(
+    tmp_templates: Path,
+):
+    app = make_app()
+
+    @app.get("/broken")
+    @html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="html_to_md.jinja",
+        negotiate=True,
+    )
+    def broken():
+        return ("<h1>oops</h1>", 500)
+
+    @app.get("/plain")
+    @html2md(app, template_dir=str(tmp_templates), template_name="html_to_md.jinja")
+    def plain():
+        return "<html><head><title>Plain</title></head></html>"
+
+    client = app.test_client()
+    res = client.get("/broken", headers={"Accept": "text/markdown"})
+    assert res.status_code == 500
+    assert res.get_data(as_text=True) == "<h1>oops</h1>"
+
+    res = client.get("/plain", headers={"Accept": "text/markdown"})
+    assert res.mimetype == "text/html"
+    assert "Vary" not in res.headers
+
+
+def test_render_limiter_sheds_with_503_but_serves_cache_hits(tmp_templates: Path):
+    app = make_app()
+    limiter = RenderLimiter(1, max_queue=0, retry_after=7)
+
+    @app.get("/cached")
+    @html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="html_to_md.jinja",
+        cache_ttl=60,
+        limiter=limiter,
+    )
+    def cached():
+        return "<html><head><title>Cached</title></head></html>"
+
+    @app.get("/busy")
+    @html2md(app, template_dir=str(tmp_templates), template_name="html_to_md.jinja")
+    def busy():
+        return "<html><head><title>Busy</title></head></html>"
+
+    client = app.test_client()
+    assert client.get("/cached.html.md").status_code == 200  # warm the cache
+
+    assert limiter.acquire("default")  # every render slot is now taken
+    try:
+        shed = client.get("/busy.html.md")
+        assert shed.status_code == 503
+        assert shed.headers["Retry-After"] == "7"
+
+        hit = client.get("/cached.html.md")
+        assert hit.status_code == 200
+        assert "# Cached" in hit.get_data(as_text=True)
+    finally:
+        limiter.release("default")
+
+    assert client.get("/busy.html.md").status_code == 200
+    assert limiter.stats()["shed"] == 1
+
+
+def test_a_shed_leader_does_not_shed_waiters_of_another_class(tmp_templates: Path):
+    limiter = RenderLimiter(
+        2, max_queue=1, queue_timeout=0.5, class_limits={"crawler": 0}
+    )
+    site = Site(tmp_templates).mirror("/docs", html("Docs"), limiter=limiter)
+    client = site.app.test_client()
+    statuses = []
+
+    def crawl():
+        res = client.get("/docs.html.md", headers={"User-Agent": "GPTBot"})
+        statuses.append(res.status_code)
+
+    crawler = threading.Thread(target=crawl)
+    crawler.start()
+    deadline = time.monotonic() + 5
+    while not limiter.stats()["queue_depth"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # The crawler is queued (and will be shed) while a browser asks for the page
+    browser = client.get("/docs.html.md", headers={"User-Agent": "Firefox"})
+    crawler.join(timeout=5)
+    assert browser.status_code == 200
+    assert statuses == [503]
+
+
+def test_concurrent_mirror_requests_are_coalesced(tmp_templates: Path):
+    app = make_app()
+    calls = []
+
+    @app.get("/slow")
+    @html2md(app, template_dir=str(tmp_templates), template_name="html_to_md.jinja")
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return _long_page("Slow")
+
+    statuses = []
+    barrier = threading.Barrier(10)
+
+    def crawl():
+        client = app.test_client()
+        barrier.wait()
+        res = client.get("/slow.html.md", headers={"Accept-Encoding": "gzip"})
+        statuses.append((res.status_code, gzip.decompress(res.data)[:6]))
+
+    threads = [threading.Thread(target=crawl) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert statuses == [(200, b"# Slow")] * 10
+    assert len(calls) == 1
+    assert mw._SINGLE_FLIGHT.stats()["in_flight"] == 0
+
+
+def _manifest_site(tmp_templates: Path) -> Site:
+    site = Site(tmp_templates).manifest("/", html("Home"), cache_ttl=3600)
+    return site.mirror("/about", html("About"))
+
+
+def test_llmstxt_manifest_is_cached_until_invalidated(tmp_templates: Path):
+    site = _manifest_site(tmp_templates)
+    client = site.app.test_client()
+
+    first = client.get("/llms.txt").get_data(as_text=True)
+    for _ in range(3):
+        assert client.get("/llms.txt").get_data(as_text=True) == first
+    assert site.calls["/"] == 1
+
+    # Cached per host
+    client.get("/llms.txt", base_url="http://other.example")
+    assert site.calls["/"] == 2
+
+    assert invalidate("/llms.txt") == 2
+    client.get("/llms.txt")
+    assert site.calls["/"] == 3
+
+    assert invalidate() >= 1
+    client.get("/llms.txt")
+    assert site.calls["/"] == 4
+
+
+def test_llmstxt_manifest_rebuilds_when_template_changes(tmp_templates: Path):
+    site = _manifest_site(tmp_templates)
+    client = site.app.test_client()
+    assert client.get("/llms.txt").get_data(as_text=True).startswith("SOURCE=")
+
+    template = tmp_templates / "llms.txt.jinja"
+    template.write_text("MANIFEST v2 {{ title }}\n", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, (stat.st_atime, stat.st_mtime + 5))
+
+    assert client.get("/llms.txt").get_data(as_text=True) == "MANIFEST v2 Home"
+    assert site.calls["/"] == 2
+
+
+def test_allow_list_is_only_rebuilt_when_routes_change(
+    tmp_templates: Path, monkeypatch
+):
+    app = _manifest_site(tmp_templates).app
+    client = app.test_client()
+    client.get("/llms.txt")
+    client.get("/about.html.md")
+
+    rebuilds = []
+    original_iter_rules = app.url_map.iter_rules
+
+    def counting_iter_rules(*args, **kwargs):
+        rebuilds.append(1)
+        return original_iter_rules(*args, **kwargs)
+
+    monkeypatch.setattr(app.url_map, "iter_rules", counting_iter_rules)
+    client.get("/llms.txt")
+    client.get("/about.html.md")
+    assert rebuilds == []
+
+    mw._DECORATED_VERSION += 1  # e.g. another endpoint opted in
+    client.get("/about.html.md")
+    assert rebuilds
+
+
+def test_metrics_endpoint_reports_render_phases_cache_and_statuses(
+    tmp_templates: Path,
+):
+    app = _manifest_site(tmp_templates).app
+    metrics = enable_metrics(app)
+    client = app.test_client()
+
+    assert client.get("/about.html.md").status_code == 200  # miss
+    assert client.get("/about.html.md").status_code == 200  # revalidated
+    assert client.get("/llms.txt").status_code == 200  # miss
+    assert client.get("/llms.txt").status_code == 200  # hit (cache_ttl)
+    assert client.get("/nope.html.md").status_code == 404
+
+    res = client.get("/.llms/metrics")
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    text = res.get_data(as_text=True)
+
+    # Revalidation re-dispatches the view but skips parse/template on a hash match
+    assert 'llms_render_seconds_count{route="/about",phase="dispatch"} 2' in text
+    for phase in ("parse", "template"):
+        assert f'llms_render_seconds_count{{route="/about",phase="{phase}"}} 1' in text
+    assert 'llms_cache_requests_total{route="/about",result="miss"} 1' in text
+    assert 'llms_cache_requests_total{route="/about",result="revalidated"} 1' in text
+    assert 'llms_cache_requests_total{route="/llms.txt",result="hit"} 1' in text
+    assert 'llms_responses_total{route="/about",status="2xx"} 2' in text
+    assert 'llms_responses_total{route="unmatched",status="4xx"} 1' in text
+    assert "llms_renders_in_flight 0" in text
+    assert "llms_coalescing_leaders" in text
+    assert metrics.response_bytes.value(route="/llms.txt") > 0
+
+
+def test_shared_sqlite_cache_serves_renders_from_other_workers(
+    tmp_templates: Path, tmp_path: Path
+):
+    db = tmp_path / "cache" / "render.db"
+    calls: list = []
+    app = make_app()
+
+    @app.get("/docs")
+    @html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="html_to_md.jinja",
+        cache_ttl=3600,
+    )
+    def docs():
+        calls.append(1)
+        return "<html><head><title>Docs</title></head></html>"
+
+    use_render_cache(SqliteRenderCache(db))
+    client = app.test_client()
+    first = client.get("/docs.html.md", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert calls == [1]
+
+    # A fresh worker process opens the same file and serves the stored render
+    use_render_cache(SqliteRenderCache(db))
+    second = client.get("/docs.html.md", headers={"Accept-Encoding": "identity"})
+    assert second.get_data() == first.get_data()
+    assert calls == [1]
+
+    assert invalidate("/docs") == 1
+    assert client.get("/docs.html.md").status_code == 200
+    assert calls == [1, 1]
+
+
+def _blog_site(tmp_templates: Path, slugs: list, mount_prefix: str = "/.llms") -> Site:
+    """``/blog/<slug>`` enumerates ``slugs`` through ``url_values``."""
+    site = Site(tmp_templates, mount_prefix=mount_prefix)
+    site.manifest("/", html("Home"), mount_prefix="")
+
+    def post(slug: str):
+        return html(f"Post {slug}") if slug in slugs else ("missing", 404)
+
+    def blog_values():
+        site.calls["url_values"] += 1
+        return ({"slug": slug} for slug in slugs)
+
+    site.mirror("/blog/<slug>", post, allow_param_routes=True, url_values=blog_values)
+    site.mirror("/drafts/<slug>", "<html></html>")
+    return site.route("/users/<int:uid>", "<html></html>")
+
+
+def test_param_routes_are_matched_with_the_url_map(tmp_templates: Path):
+    app = _blog_site(tmp_templates, ["hello", "world"]).app
+    enable_metrics(app)
+    client = app.test_client()
+
+    res = client.get("/.llms/blog/hello.html.md")
+    assert res.status_code == 200
+    assert res.get_data(as_text=True).startswith("# Post hello")
+    assert client.get("/.llms/blog/nope.html.md").status_code == 404  # view's own 404
+    # Decorated without allow_param_routes, or not decorated at all
+    assert client.get("/.llms/drafts/x.html.md").status_code == 404
+    assert client.get("/.llms/users/1.html.md").status_code == 404
+
+    metrics = client.get("/.llms/metrics").get_data(as_text=True)
+    assert 'llms_responses_total{route="/blog/<slug>",status="2xx"} 1' in metrics
+
+
+def test_param_route_mirrors_win_over_the_route_without_a_prefix(
+    tmp_templates: Path,
+):
+    # `/blog/<slug>` also matches `/blog/hello.html.md` (with slug="hello.html.md")
+    site = _blog_site(tmp_templates, ["hello"], mount_prefix="")
+    app = site.app
+    enable_metrics(app)
+    client = app.test_client()
+
+    res = client.get("/blog/hello.html.md")
+    assert res.status_code == 200
+    assert res.mimetype == "text/markdown"
+    assert res.get_data(as_text=True).startswith("# Post hello")
+    assert client.get("/blog/hello").mimetype == "text/html"
+    assert client.get("/llms.txt").get_data(as_text=True).endswith("=/blog/hello")
+    # Not mirrored: left to the route that matched
+    assert client.get("/drafts/x.html.md").get_data() == b"<html></html>"
+
+    metrics = client.get("/.llms/metrics").get_data(as_text=True)
+    assert 'llms_responses_total{route="/blog/<slug>",status="2xx"} 1' in metrics
+
+
+def test_manifest_and_export_enumerate_param_routes(tmp_templates: Path, tmp_path):
+    site = _blog_site(tmp_templates, ["hello", "world"])
+    client = site.app.test_client()
+
+    manifest = client.get("/llms.txt").get_data(as_text=True)
+    assert manifest.endswith("ALLOWED=/blog/hello,/blog/world")
+    client.get("/.llms/blog/hello.html.md")
+    client.get("/llms.txt")
+    assert site.calls["url_values"] == 1  # enumerated once per allow-list rebuild
+
+    report = export_static(site.app, tmp_path / "out")
+    assert sorted(report.written) == [
+        ".llms/blog/hello.html.md",
+        ".llms/blog/world.html.md",
+        "llms.txt",
+    ]
+
+
+def test_failing_url_values_is_logged_and_rule_still_served(
+    tmp_templates: Path, caplog: pytest.LogCaptureFixture
+):
+    def broken_values():
+        yield {"slug": "hello"}
+        raise RuntimeError("database is down")
+
+    app = make_app()
+
+    @app.get("/blog/<slug>")
+    @html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="html_to_md.jinja",
+        mount_prefix="/.llms",
+        allow_param_routes=True,
+        url_values=broken_values,
+    )
+    def post(slug: str):
+        return f"<html><head><title>Post {slug}</title></head></html>"
+
+    res = app.test_client().get("/.llms/blog/world.html.md")
+
+    assert res.status_code == 200
+    assert "url_values() of endpoint 'post' failed" in caplog.text
+    assert "database is down" in caplog.text
+
+
+def test_url_values_requires_param_routes(tmp_templates: Path):
+    app = make_app()
+    with pytest.raises(ValueError):
+        html2md(app, template_name="html_to_md.jinja", url_values=lambda: [])
+
+
+def _stale_site(tmp_templates: Path, **stale: float) -> Site:
+    use_render_cache(KeyRecordingCache())
+    return Site(tmp_templates).mirror("/news", html("v1"), cache_ttl=60, **stale)
+
+
+def _age_entry(path: str, seconds: float) -> None:
+    cache = mw._RENDER_CACHE
+    assert isinstance(cache, KeyRecordingCache)
+    key = cache.key_for(path)
+    entry = cache.get(key)
+    assert entry is not None
+    cache.set(key, dataclasses.replace(entry, created_at=entry.created_at - seconds))
+
+
+def test_stale_while_revalidate_serves_stale_and_refreshes_in_background(
+    tmp_templates: Path,
+):
+    site = _stale_site(tmp_templates, stale_while_revalidate=30)
+    client = site.app.test_client()
+    assert client.get("/news.html.md").get_data(as_text=True).startswith("# v1")
+
+    site.pages["/news"] = html("v2")
+    _age_entry("/news", 70)  # expired, but inside the 30s stale window
+    stale = client.get("/news.html.md")
+    assert stale.get_data(as_text=True).startswith("# v1")
+
+    deadline = time.monotonic() + 5
+    while (mw._REVALIDATING or site.calls["/news"] < 2) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get("/news.html.md").get_data(as_text=True).startswith("# v2")
+    assert site.calls["/news"] == 2
+
+    # Past the maximum staleness the request renders in the foreground
+    site.pages["/news"] = html("v3")
+    _age_entry("/news", 200)
+    assert client.get("/news.html.md").get_data(as_text=True).startswith("# v3")
+
+
+def test_failed_background_revalidation_is_logged_and_counted(
+    tmp_templates: Path, caplog
+):
+    site = _stale_site(tmp_templates, stale_while_revalidate=30)
+    enable_metrics(site.app)
+    client = site.app.test_client()
+    client.get("/news.html.md")
+
+    def broken_view():
+        raise RuntimeError("bug in the view")
+
+    site.pages["/news"] = broken_view
+    _age_entry("/news", 70)
+    with caplog.at_level("WARNING"):
+        assert client.get("/news.html.md").get_data(as_text=True).startswith("# v1")
+        deadline = time.monotonic() + 5
+        while mw._REVALIDATING and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert any(
+        "revalidation of '/news' failed" in r.getMessage() for r in caplog.records
+    )
+    metrics = client.get("/.llms/metrics").get_data(as_text=True)
+    assert 'llms_revalidation_failures_total{route="/news"} 1' in metrics
+
+
+def test_stale_if_error_serves_stale_on_upstream_5xx(tmp_templates: Path):
+    site = _stale_site(tmp_templates, stale_if_error=300)
+    client = site.app.test_client()
+    client.get("/news.html.md")
+
+    site.pages["/news"] = ("upstream down", 503)
+    _age_entry("/news", 120)
+    res = client.get("/news.html.md")
+    assert res.status_code == 200
+    assert res.get_data(as_text=True).startswith("# v1")
+
+    _age_entry("/news", 1000)
+    assert client.get("/news.html.md").status_code == 503
+
+
+def test_stale_windows_require_cache_ttl(tmp_templates: Path):
+    with pytest.raises(ValueError):
+        html2md(make_app(), template_name="x.jinja", stale_while_revalidate=10)
+
+
+def _export_site(tmp_templates: Path) -> Site:
+    site = Site(tmp_templates, mount_prefix="/.llms")
+    site.manifest("/", html("Home"), mount_prefix="")
+    return site.mirror("/docs", html("Docs")).mirror("/guide/intro", html("Intro"))
+
+
+def test_export_static_mirrors_url_layout_and_is_incremental(
+    tmp_templates: Path, tmp_path: Path
+):
+    site = _export_site(tmp_templates)
+    app = site.app
+    out = tmp_path / "site"
+
+    report = export_static(app, out, base_url="https://example.com", jobs=2)
+    assert report.to_dict()["written"] == [
+        ".llms/docs.html.md",
+        ".llms/guide/intro.html.md",
+        "llms.txt",
+    ]
+    assert not report.failed
+    assert (out / ".llms/docs.html.md").read_text(encoding="utf-8").startswith("# Docs")
+    manifest = (out / "llms.txt").read_text(encoding="utf-8")
+    assert "SOURCE=https://example.com/" in manifest
+    assert "/docs" in manifest and "/guide/intro" in manifest
+
+    # Only the page whose HTML changed is rewritten on the next run
+    site.pages["/guide/intro"] = html("Intro v2")
+    report = export_static(app, out, base_url="https://example.com")
+    assert report.to_dict()["written"] == [".llms/guide/intro.html.md"]
+    assert report.to_dict()["unchanged"] == [".llms/docs.html.md", "llms.txt"]
+    assert "Intro v2" in (out / ".llms/guide/intro.html.md").read_text("utf-8")
+    assert not list(out.rglob("*.tmp"))
+
+
+@pytest.mark.parametrize("force", [False, True])
+def test_export_static_records_failures_and_removes_stale_files(
+    tmp_templates: Path, tmp_path: Path, force: bool
+):
+    app = _export_site(tmp_templates).mirror("/broken", ("oops", 500)).app
+    out = tmp_path / "site"
+    export_static(app, out)
+
+    # Pretend a previous export produced a file for a route no longer mirrored
+    state = json.loads((out / ".llms-export.json").read_text("utf-8"))
+    state["files"]["old.html.md"] = "deadbeef"
+    (out / ".llms-export.json").write_text(json.dumps(state), encoding="utf-8")
+    (out / "old.html.md").write_text("stale", encoding="utf-8")
+
+    report = export_static(app, out, force=force)
+    assert report.removed == ["old.html.md"]
+    assert not (out / "old.html.md").exists()
+    assert report.failed == {".llms/broken.html.md": "HTTP 500 from `/broken`"}
+
+
+def test_flask_llms_export_cli_prints_json_report(tmp_templates: Path, tmp_path: Path):
+    app = _export_site(tmp_templates).app
+    out = tmp_path / "site"
+
+    result = app.test_cli_runner().invoke(args=["llms", "export", str(out)])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert "llms.txt" in report["written"]
+    assert (out / ".llms/docs.html.md").is_file()
+
+
+def _sharded_site(tmp_templates: Path, **options: Any) -> Site:
+    (tmp_templates / "sharded.txt.jinja").write_text(
+        "{% for s in metadata.shards %}{{ s.name }}={{ s.url }}:{{ s.count }};"
+        "{% endfor %}",
+        encoding="utf-8",
+    )
+    site = Site(tmp_templates, mount_prefix="/.llms")
+    site.manifest("/", html("Home"), template_name="sharded.txt.jinja", **options)
+    for path in ("/docs/a", "/docs/b", "/blog/x", "/about"):
+        site.mirror(path, html("Page"))
+    return site
+
+
+def test_sharded_manifest_lists_sections_and_serves_them(tmp_templates: Path):
+    app = _sharded_site(tmp_templates, shard_by="prefix").app
+    client = app.test_client()
+
+    root = client.get("/llms.txt").get_data(as_text=True)
+    assert root == (
+        "blog=http://localhost/llms/blog.txt:1;"
+        "docs=http://localhost/llms/docs.txt:2;"
+        "main=http://localhost/llms/main.txt:1;"
+    )
+
+    docs = client.get("/llms/docs.txt")
+    assert docs.status_code == 200
+    text = docs.get_data(as_text=True)
+    assert "# docs" in text  # packaged shard template
+    assert "- [/docs/a](http://localhost/.llms/docs/a.html.md)" in text
+    assert "/blog/x" not in text
+    assert client.get("/llms/nope.txt").status_code == 404
+
+
+def test_shards_link_to_a_custom_manifest_path(tmp_templates: Path):
+    manifest_path = "/docs/llms.txt"
+    site = _sharded_site(tmp_templates, shard_by="prefix", manifest_path=manifest_path)
+    client = site.app.test_client()
+
+    root = client.get(manifest_path).get_data(as_text=True)
+    assert "docs=http://localhost/docs/llms/docs.txt" in root
+    text = client.get("/docs/llms/docs.txt").get_data(as_text=True)
+    assert "- Root: http://localhost/docs/llms.txt\n" in text
+    assert "- Source: http://localhost/docs/llms/docs.txt\n" in text
+
+
+def test_shards_are_cached_independently(tmp_templates: Path):
+    cache = KeyRecordingCache()
+    use_render_cache(cache)
+    client = _sharded_site(tmp_templates, shard_by="prefix").app.test_client()
+    client.get("/llms/docs.txt")
+    client.get("/llms/blog.txt")
+    assert [key[1] for key in cache.keys] == ["/llms/docs.txt", "/llms/blog.txt"]
+
+    first = cache.get(cache.key_for("/llms/docs.txt"))
+    client.get("/llms/docs.txt")
+    second = cache.get(cache.key_for("/llms/docs.txt"))
+    assert first is not None and second is not None
+    assert second.variants is first.variants  # revalidated, not re-rendered
+
+
+def test_shard_by_callable_and_validation(tmp_templates: Path):
+    app = _sharded_site(
+        tmp_templates,
+        shard_by=lambda path, endpoint: None if path == "/about" else "all",
+    ).app
+    root = app.test_client().get("/llms.txt").get_data(as_text=True)
+    assert root == "all=http://localhost/llms/all.txt:3;"
+
+    with pytest.raises(ValueError):
+        llmstxt(make_app(), template_name="llms.txt.jinja", shard_by="nope")(lambda: "")
+
+
+def test_export_static_writes_shards(tmp_templates: Path, tmp_path: Path):
+    app = _sharded_site(tmp_templates, shard_by="prefix").app
+    out = tmp_path / "out"
+
+    report = export_static(app, out)
+    assert [f for f in report.written if f.startswith("llms")] == [
+        "llms.txt",
+        "llms/blog.txt",
+        "llms/docs.txt",
+        "llms/main.txt",
+    ]
+    assert "/.llms/about.html.md" in (out / "llms/main.txt").read_text("utf-8")
+    report = export_static(app, out)
+    assert not report.written
+
+
+def _registry_site(tmp_templates: Path) -> Site:
+    (tmp_templates / "registry.txt.jinja").write_text(
+        "# {{ title }}\n"
+        "{% for r in metadata.routes %}"
+        "{{ r.path }}|{{ r.title }}|{{ r.description }}|{{ r.section }}|{{ r.url }}\n"
+        "{% endfor %}",
+        encoding="utf-8",
+    )
+    site = Site(tmp_templates, mount_prefix="/.llms")
+    site.manifest(
+        "/",
+        "<html></html>",
+        template_name="registry.txt.jinja",
+        from_registry=True,
+        title="Example",
+    )
+    site.mirror(
+        "/docs",
+        html("Docs page"),
+        title="Documentation",
+        description="How to use it",
+        section="guides",
+    )
+    return site.mirror(
+        "/pricing", "<html><h1>Pricing</h1><p>Plans and quotas.</p></html>", priority=1
+    )
+
+
+def test_registry_manifest_runs_no_views_and_captures_metadata(tmp_templates: Path):
+    site = _registry_site(tmp_templates)
+    client = site.app.test_client()
+
+    manifest = client.get("/llms.txt").get_data(as_text=True)
+    assert not site.calls
+    assert manifest == (
+        "# Example\n"
+        "/pricing||||http://localhost/.llms/pricing.html.md\n"
+        "/docs|Documentation|How to use it|guides|http://localhost/.llms/docs.html.md\n"
+    )
+
+    client.get("/.llms/pricing.html.md")
+    client.get("/.llms/docs.html.md")
+    manifest = client.get("/llms.txt").get_data(as_text=True)
+    assert "/pricing|Pricing|Plans and quotas.||" in manifest
+    assert "/docs|Documentation|How to use it|guides|" in manifest  # declared wins
+    assert site.calls["/"] == 0
+
+    mw.invalidate("/pricing")
+    assert "/pricing||||" in client.get("/llms.txt").get_data(as_text=True)
+
+
+def test_registry_manifest_export(tmp_templates: Path, tmp_path: Path):
+    site = _registry_site(tmp_templates)
+
+    report = export_static(site.app, tmp_path / "out", base_url="https://example.com")
+
+    assert "llms.txt" in report.written
+    manifest = (tmp_path / "out" / "llms.txt").read_text("utf-8")
+    assert "/pricing|Pricing|Plans and quotas.||https://example.com/.llms/" in manifest
+    assert site.calls["/"] == 0
+
+
+def test_templates_see_param_routes_as_allowed(tmp_templates: Path):
+    (tmp_templates / "links.jinja").write_text(
+        "{% for l in links %}{% if l.href in metadata.allowed_paths %}"
+        "{{ l.href }};{% endif %}{% endfor %}",
+        encoding="utf-8",
+    )
+    app = make_app()
+    decorate = html2md(
+        app,
+        template_dir=str(tmp_templates),
+        template_name="links.jinja",
+        mount_prefix="/.llms",
+        allow_param_routes=True,
+    )
+
+    @app.get("/blog/<slug>")
+    @decorate
+    def post(slug):
+        return f"<html><h1>{slug}</h1></html>"
+
+    @app.get("/blog")
+    @decorate
+    def blog():
+        return (
+            '<html><a href="/blog/hello">Hello post</a>'
+            '<a href="/blog/a/b">Nested link</a>'
+            '<a href="/private">Private page</a></html>'
+        )
+
+    res = app.test_client().get("/.llms/blog.html.md")
+
+    assert res.get_data(as_text=True) == "/blog/hello;"
+    assert list(mw._ALLOWLIST) == ["/blog", "/blog/<slug>"]
@@ -0,0 +1,75 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+
+import pytest
+
+from open_llms_txt.middleware.limiter import RenderLimiter, classify_by_user_agent
+
+
+def test_classify_by_user_agent():
+    assert classify_by_user_agent("Mozilla/5.0 GPTBot/1.1", "1.2.3.4") == "crawler"
+    assert classify_by_user_agent("ClaudeBot/1.0", None) == "crawler"
+    assert classify_by_user_agent("Mozilla/5.0 (X11; Linux)", None) == "default"
+    assert classify_by_user_agent(None, None) == "default"
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        RenderLimiter(0)
+    with pytest.raises(ValueError):
+        RenderLimiter(1, max_queue=-1)
+
+
+def test_sheds_when_slots_and_queue_are_full():
+    limiter = RenderLimiter(1, max_queue=0)
+    assert limiter.acquire() is True
+    assert limiter.acquire() is False
+    limiter.release()
+    assert limiter.acquire() is True
+    limiter.release()
+
+    stats = limiter.stats()
+    assert stats["admitted"] == 2
+    assert stats["shed"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_queued_request_gets_slot_when_released():
+    limiter = RenderLimiter(1, max_queue=1, queue_timeout=5)
+    assert limiter.acquire()
+    results = []
+
+    waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+    waiter.start()
+    deadline = time.monotonic() + 2
+    while limiter.stats()["queue_depth"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert limiter.stats()["queue_depth"] == 1
+
+    limiter.release()
+    waiter.join(timeout=2)
+    assert results == [True]
+    assert limiter.stats()["max_queue_depth"] == 1
+
+
+def test_queue_timeout_sheds():
+    limiter = RenderLimiter(1, max_queue=4, queue_timeout=0.05)
+    assert limiter.acquire()
+    assert limiter.acquire() is False
+    assert limiter.stats()["queue_depth"] == 0
+
+
+def test_per_class_limits_do_not_block_other_classes():
+    limiter = RenderLimiter(4, max_queue=0, class_limits={"crawler": 1})
+    with limiter.slot("crawler") as first:
+        assert first
+        with limiter.slot("crawler") as second:
+            assert not second
+        with limiter.slot("default") as human:
+            assert human
+        assert limiter.stats()["in_flight_by_class"] == {"crawler": 1}
+    assert limiter.stats()["shed_by_class"] == {"crawler": 1}
+    assert limiter.stats()["in_flight"] == 0
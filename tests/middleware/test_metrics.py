@@ -0,0 +1,62 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from open_llms_txt.middleware.metrics import MetricsRegistry, MiddlewareMetrics
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits", "Cache hits.", ("route",))
+    busy = registry.gauge("busy", "Busy workers.")
+
+    hits.inc(route="/docs")
+    hits.inc(2, route='/we"ird')
+    busy.inc()
+    busy.inc()
+    busy.dec()
+
+    text = registry.render()
+    assert "# HELP hits Cache hits.\n# TYPE hits counter\n" in text
+    assert 'hits_total{route="/docs"} 1\n' in text
+    assert 'hits_total{route="/we\\"ird"} 2\n' in text
+    assert "# TYPE busy gauge\nbusy 1\n" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("lat", "Latency.", ("phase",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, phase="parse")
+
+    text = registry.render()
+    assert 'lat_bucket{phase="parse",le="0.1"} 1\n' in text
+    assert 'lat_bucket{phase="parse",le="1"} 3\n' in text
+    assert 'lat_bucket{phase="parse",le="+Inf"} 4\n' in text
+    assert 'lat_count{phase="parse"} 4\n' in text
+    assert 'lat_sum{phase="parse"} 4.25\n' in text
+    assert latency.count(phase="parse") == 4
+
+
+def test_label_mismatch_and_duplicate_names_are_rejected():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits", "Cache hits.", ("route",))
+    with pytest.raises(ValueError):
+        hits.inc(path="/docs")
+    with pytest.raises(ValueError):
+        registry.counter("hits", "Again.")
+
+
+def test_middleware_metrics_stats_sources():
+    metrics = MiddlewareMetrics()
+    metrics.add_stats_source(
+        "llms_limiter", lambda: {"queue_depth": 3, "shed_by_class": {"crawler": 2}}
+    )
+    metrics.observe_response("/docs", 503, 120)
+
+    text = metrics.render()
+    assert "llms_limiter_queue_depth 3\n" in text
+    assert 'llms_limiter_shed_by_class{key="crawler"} 2\n' in text
+    assert 'llms_responses_total{route="/docs",status="5xx"} 1\n' in text
+    assert 'llms_response_bytes_total{route="/docs"} 120\n' in text
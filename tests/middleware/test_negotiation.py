@@ -0,0 +1,38 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from open_llms_txt.middleware.negotiation import parse_qlist, prefers_markdown
+
+
+def test_parse_qlist_keeps_order_and_q_values():
+    assert parse_qlist("text/markdown;charset=utf-8, text/html;q=0.5, ,*/*;q=x") == [
+        ("text/markdown", 1.0),
+        ("text/html", 0.5),
+        ("*/*", 0.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        (None, False),
+        ("", False),
+        ("*/*", False),
+        ("text/html", False),
+        ("text/html,application/xhtml+xml,*/*;q=0.8", False),
+        ("text/markdown", True),
+        ("text/x-markdown", True),
+        ("text/markdown, text/html;q=0.9, */*;q=0.8", True),
+        ("text/html, text/markdown;q=0.9", False),
+        ("text/markdown, text/html", True),
+        ("text/html, text/markdown", False),
+        ("text/markdown, */*", True),
+        ("text/*", False),
+        ("text/markdown;q=0", False),
+        ("text/markdown;q=0, */*", False),
+    ],
+)
+def test_prefers_markdown(accept, expected):
+    assert prefers_markdown(accept) is expected
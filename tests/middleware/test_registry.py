@@ -0,0 +1,55 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from open_llms_txt.middleware.registry import RouteMeta, RouteRegistry
+
+
+def _url(path: str) -> str:
+    return f"https://example.com{path}.html.md"
+
+
+def test_declared_metadata_wins_over_captured():
+    registry = RouteRegistry()
+    registry.declare("docs", RouteMeta(title="Docs", section="guides"))
+    registry.capture(
+        "/docs", {"title": "Docs | Site", "h1": "", "paragraphs": ["Intro text"]}
+    )
+
+    meta = registry.get("/docs", "docs")
+
+    assert meta == RouteMeta(title="Docs", description="Intro text", section="guides")
+
+
+def test_capture_prefers_h1_and_bumps_version_only_on_change():
+    registry = RouteRegistry()
+    context = {"title": "Page | Site", "h1": "Page", "paragraphs": []}
+
+    registry.capture("/page", context)
+    version = registry.version
+    registry.capture("/page", context)
+
+    assert registry.version == version
+    assert registry.get("/page", "page").title == "Page"
+    registry.forget("/page")
+    assert registry.get("/page", "page") == RouteMeta()
+
+
+def test_entries_skip_patterns_and_sort_by_priority():
+    registry = RouteRegistry()
+    registry.declare("a", RouteMeta(title="A"))
+    registry.declare("b", RouteMeta(title="B", priority=2))
+    endpoints = {"/a": "a", "/b": "b", "/c/<id>": "c"}
+
+    entries = registry.entries(["/", "/a", "/b", "/c/<id>"], endpoints, _url)
+
+    assert [e["path"] for e in entries] == ["/b", "/a"]
+    assert entries[0] == {
+        "path": "/b",
+        "url": "https://example.com/b.html.md",
+        "title": "B",
+        "description": "",
+        "section": "",
+        "priority": 2,
+    }
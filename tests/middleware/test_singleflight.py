@@ -0,0 +1,98 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+
+import pytest
+
+from open_llms_txt.middleware.singleflight import (
+    SingleFlight,
+    SingleFlightTimeoutError,
+)
+
+
+def _wait_for_waiters(flight: SingleFlight, n: int) -> None:
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < n and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_execution():
+    flight: SingleFlight[str] = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        release.wait(2)
+        return "rendered"
+
+    def caller():
+        results.append(flight.do("key", work))
+
+    threads = [threading.Thread(target=caller) for _ in range(8)]
+    for t in threads:
+        t.start()
+    # Let every caller join the flight before the leader finishes
+    _wait_for_waiters(flight, 7)
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["rendered"] * 8
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight: SingleFlight[int] = SingleFlight()
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.do("k", lambda: 2) == (2, False)
+
+
+def test_leader_exception_is_shared_with_waiters():
+    flight: SingleFlight[None] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def boom():
+        started.set()
+        release.wait(2)
+        raise RuntimeError("render failed")
+
+    def caller():
+        try:
+            flight.do("k", boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(2)
+    waiter = threading.Thread(target=caller)
+    waiter.start()
+    _wait_for_waiters(flight, 1)
+    release.set()
+    leader.join(timeout=5)
+    waiter.join(timeout=5)
+    assert errors == ["render failed", "render failed"]
+
+
+def test_waiter_times_out():
+    flight: SingleFlight[None] = SingleFlight(timeout=0.01)
+    started = threading.Event()
+    release = threading.Event()
+
+    leader = threading.Thread(
+        target=lambda: flight.do("k", lambda: (started.set(), release.wait(2)))
+    )
+    leader.start()
+    started.wait(2)
+    with pytest.raises(SingleFlightTimeoutError):
+        flight.do("k", lambda: None)
+    release.set()
+    leader.join(timeout=5)
@@ -0,0 +1,118 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from contextlib import closing
+import multiprocessing
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import List, Union
+
+from open_llms_txt.middleware.cache import CacheEntry, CacheKey
+from open_llms_txt.middleware.sqlite_cache import SqliteRenderCache
+
+
+def _key(path: str) -> CacheKey:
+    return ("http://localhost", path, ":html_to_md.jinja")
+
+
+def _write_many(db: str, worker: int, count: int) -> None:
+    cache = SqliteRenderCache(db)
+    for i in range(count):
+        cache.set(_key(f"/w{worker}/{i}"), CacheEntry.build(f"# {worker}-{i}\n", "h"))
+
+
+def test_round_trip_preserves_body_variants_and_deps(tmp_path: Path):
+    cache = SqliteRenderCache(tmp_path / "c.db")
+    entry = CacheEntry.build("# Docs\n" + "word " * 200, "hash-1", deps="d1")
+    cache.set(_key("/docs"), entry)
+
+    got = SqliteRenderCache(tmp_path / "c.db").get(_key("/docs"))
+    assert got is not None
+    assert got.body == entry.body
+    assert got.variants == entry.variants
+    assert "gzip" in got.variants
+    assert (got.source_hash, got.deps) == ("hash-1", "d1")
+    assert got.created_at == entry.created_at
+    assert cache.get(_key("/missing")) is None
+
+
+def test_ttl_expires_entries_and_touch_revalidates(tmp_path: Path):
+    cache = SqliteRenderCache(tmp_path / "c.db", ttl=60)
+    stale = CacheEntry(body=b"# old\n", source_hash="h", created_at=time.time() - 120)
+    cache.set(_key("/old"), stale)
+    assert cache.get(_key("/old")) is None
+
+    refreshed = cache.touch(_key("/old"), stale)
+    assert refreshed.age() < 1
+    got = cache.get(_key("/old"))
+    assert got is not None and got.body == b"# old\n"
+
+
+def test_size_bound_evicts_least_recently_read(tmp_path: Path):
+    cache = SqliteRenderCache(tmp_path / "c.db", max_bytes=250)
+    cache.ACCESS_RESOLUTION = 0
+    for name in ("a", "b"):
+        cache.set(_key(f"/{name}"), CacheEntry(body=b"x" * 100, source_hash=name))
+        time.sleep(0.01)
+    cache.get(_key("/a"))  # /b is now the least recently read
+    cache.set(_key("/c"), CacheEntry(body=b"x" * 100, source_hash="c"))
+
+    assert cache.get(_key("/b")) is None
+    assert cache.get(_key("/a")) is not None
+    assert cache.stats() == {"entries": 2, "bytes": 200}
+
+
+def test_stored_bytes_are_tracked_without_scanning(tmp_path: Path):
+    cache = SqliteRenderCache(tmp_path / "c.db", max_bytes=1000)
+    cache.set(_key("/a"), CacheEntry(body=b"x" * 100, source_hash="a"))
+    cache.set(_key("/b"), CacheEntry(body=b"x" * 300, source_hash="b"))
+    cache.set(_key("/a"), CacheEntry(body=b"x" * 50, source_hash="a2"))  # replaced
+    assert cache.stats() == {"entries": 2, "bytes": 350}
+    cache.invalidate(_key("/b"))
+    assert cache.stats() == {"entries": 1, "bytes": 50}
+    cache.invalidate()
+    assert cache.stats() == {"entries": 0, "bytes": 0}
+
+    with closing(sqlite3.connect(tmp_path / "c.db")) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM entries WHERE created_at < 0"
+        ).fetchall()
+    assert any("entries_created_at" in str(row) for row in plan)
+
+
+def test_invalidate_matching_and_all(tmp_path: Path):
+    cache = SqliteRenderCache(tmp_path / "c.db")
+    for path in ("/docs", "/about", "/llms.txt"):
+        cache.set(_key(path), CacheEntry.build(f"# {path}\n", path))
+
+    assert cache.invalidate_matching(lambda key: key[1] == "/docs") == 1
+    assert len(cache) == 2
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_concurrent_writers_across_threads_and_processes(tmp_path: Path):
+    db = str(tmp_path / "c.db")
+    SqliteRenderCache(db)
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_many, args=(db, w, 25)) for w in range(3)]
+    threads: List[threading.Thread] = [
+        threading.Thread(target=_write_many, args=(db, w, 25)) for w in range(3, 6)
+    ]
+    workers: List[Union[BaseProcess, threading.Thread]] = [*procs, *threads]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+    assert all(p.exitcode == 0 for p in procs)
+
+    cache = SqliteRenderCache(db)
+    assert len(cache) == 6 * 25
+    got = cache.get(_key("/w1/24"))
+    assert got is not None and got.body == b"# 1-24\n"
@@ -0,0 +1,175 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from werkzeug.test import Client
+
+from open_llms_txt.middleware.limiter import RenderLimiter
+from open_llms_txt.middleware.wsgi import LlmsTxtWSGIMiddleware
+
+PAGES: Dict[str, str] = {
+    "/": "<html><head><title>Home</title></head><body></body></html>",
+    "/docs": "<html><head><title>Docs</title></head><body><h1>Hi</h1></body></html>",
+    "/blog/hello": "<html><head><title>Hello</title></head></html>",
+    "/private": "<html><head><title>Private</title></head></html>",
+    "/api/v1/spec": "<html><head><title>Spec</title></head></html>",
+}
+
+
+@pytest.fixture
+def tmp_templates(tmp_path: Path):
+    (tmp_path / "html_to_md.jinja").write_text(
+        "# {{ title }}\n{{ h1 }}\n", encoding="utf-8"
+    )
+    (tmp_path / "llms.txt.jinja").write_text(
+        "SOURCE={{ metadata.source_url }}\n"
+        "ALLOWED={{ metadata.allowed_paths|join(',') }}\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+class ChunkedBody:
+    """Response iterable that records how it was consumed."""
+
+    def __init__(self, body: bytes, size: int = 8):
+        self.chunks = [body[i : i + size] for i in range(0, len(body), size)]
+        self.yielded = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.yielded += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class PlainApp:
+    def __init__(self) -> None:
+        self.bodies: List[ChunkedBody] = []
+        self.environs: List[dict] = []
+
+    def __call__(self, environ, start_response):
+        self.environs.append(environ)
+        page = PAGES.get(environ["PATH_INFO"])
+        if page is None:
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"missing"]
+        start_response("200 OK", [("Content-Type", "text/html; charset=utf-8")])
+        body = ChunkedBody(page.encode("utf-8"))
+        self.bodies.append(body)
+        return body
+
+
+def make(
+    tmp_templates: Path, patterns=("/docs", "/blog/*"), **kwargs
+) -> tuple[PlainApp, Client]:
+    app = PlainApp()
+    mw = LlmsTxtWSGIMiddleware(
+        app,
+        patterns=patterns,
+        template_dir=str(tmp_templates),
+        manifest_source="/",
+        **kwargs,
+    )
+    return app, Client(mw)
+
+
+def test_mirror_streams_and_closes_downstream_body(tmp_templates: Path):
+    app, client = make(tmp_templates)
+
+    res = client.get("/docs.html.md", headers={"Accept-Encoding": "gzip"})
+
+    assert res.status_code == 200
+    assert res.mimetype == "text/markdown"
+    assert res.get_data(as_text=True) == "# Docs\nHi"
+    body = app.bodies[0]
+    assert body.yielded == len(body.chunks) > 1
+    assert body.closed
+    sub_environ = app.environs[0]
+    assert sub_environ["HTTP_ACCEPT"] == "text/html"
+    assert "HTTP_ACCEPT_ENCODING" not in sub_environ
+
+
+def test_patterns_gate_mirrors_and_passthrough(tmp_templates: Path):
+    app, client = make(tmp_templates)
+
+    assert client.get("/blog/hello.html.md").status_code == 200
+    denied = client.get("/private.html.md")
+    assert denied.status_code == 404
+    assert "not enabled" in denied.get_data(as_text=True)
+    assert client.get("/private").get_data(as_text=True).startswith("<html>")
+    missing = client.get("/blog/nope.html.md")
+    assert missing.status_code == 404
+    assert missing.get_data(as_text=True) == "# 404\nFailed to render `/blog/nope`.\n"
+
+
+def test_manifest_lists_literal_patterns(tmp_templates: Path):
+    _, client = make(tmp_templates)
+
+    res = client.get("/llms.txt")
+
+    assert res.status_code == 200
+    text = res.get_data(as_text=True)
+    assert "SOURCE=http://localhost/" in text
+    assert "ALLOWED=/docs" in text
+
+
+def test_unchanged_html_reuses_cached_render(tmp_templates: Path):
+    app = PlainApp()
+    mw = LlmsTxtWSGIMiddleware(app, patterns=["/docs"], template_dir=str(tmp_templates))
+    client = Client(mw)
+
+    client.get("/docs.html.md")
+    key = ("http://localhost", "/docs", f"{tmp_templates}:html_to_md.jinja")
+    first = mw.cache.get(key)
+    client.get("/docs.html.md")
+    second = mw.cache.get(key)
+
+    assert first is not None and second is not None
+    assert len(app.bodies) == 2  # revalidated against the app...
+    assert second.variants is first.variants  # ...but not re-rendered
+
+
+def test_cache_ttl_skips_the_app(tmp_templates: Path):
+    app, client = make(tmp_templates, cache_ttl=60)
+
+    client.get("/docs.html.md")
+    client.get("/docs.html.md")
+
+    assert len(app.bodies) == 1
+
+
+def test_oversized_body_is_rejected(tmp_templates: Path):
+    app, client = make(tmp_templates, max_body_bytes=16)
+
+    res = client.get("/docs.html.md")
+
+    assert res.status_code == 502
+    assert app.bodies[0].yielded < len(app.bodies[0].chunks)
+    assert app.bodies[0].closed
+
+
+def test_limiter_sheds_renders(tmp_templates: Path):
+    limiter = RenderLimiter(1, max_queue=0)
+    assert limiter.acquire()  # occupy the only slot
+    _, client = make(tmp_templates, limiter=limiter)
+
+    res = client.get("/docs.html.md")
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+
+
+def test_prefix_patterns_cover_nested_paths(tmp_templates: Path):
+    _, client = make(tmp_templates, patterns=["/api/**"])
+
+    assert client.get("/api/v1/spec.html.md").status_code == 200
+    assert client.get("/blog/hello.html.md").status_code == 404
@@ -0,0 +1,97 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from open_llms_txt.scrapers.base_scraper import BaseScraper
+from open_llms_txt.scrapers.checkpoint import CrawlCheckpoint
+from open_llms_txt.scrapers.crawler import Crawler
+
+# A two-level tree: / -> /s0../s3 -> /s<i>/p0../p2 (17 pages)
+SITE: Dict[str, List[str]] = {"/": [f"/s{i}" for i in range(4)]}
+for i in range(4):
+    SITE[f"/s{i}"] = [f"/s{i}/p{j}" for j in range(3)]
+    SITE.update({f"/s{i}/p{j}": [] for j in range(3)})
+
+
+class TreeScraper(BaseScraper):
+    def __init__(self):
+        super().__init__("/")
+        self.fetched: List[str] = []
+
+    @property
+    def root_target(self) -> str:
+        return "/"
+
+    async def fetch_content(self, path: str) -> str:
+        self.fetched.append(path)
+        return f"<h1>{path}</h1>"
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        return SITE[source]
+
+    async def collect_root_subpages(self) -> Dict[str, str]:
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_without_refetching_completed_pages(tmp_path: Path):
+    db = tmp_path / "crawl.db"
+    first = TreeScraper()
+    crawler = Crawler(first, batch_size=2, checkpoint=CrawlCheckpoint(db))
+    seen = []
+    async for page in crawler.crawl():
+        seen.append(page.target)
+        if len(seen) == 8:
+            break  # the process dies mid-batch
+    checkpoint = CrawlCheckpoint(db)
+    counts = checkpoint.counts()
+    assert counts["done"] == 7  # the page being handed out is not confirmed
+    assert counts["queued"] > 0
+
+    second = TreeScraper()
+    resumed = await Crawler(
+        second, batch_size=2, checkpoint=checkpoint, resume=True
+    ).collect()
+
+    done_before = set(seen[:7])
+    assert not done_before & set(second.fetched)
+    assert done_before | set(resumed) == set(SITE)
+    assert checkpoint.counts() == {"done": len(SITE)}
+    assert checkpoint.status("/s3/p2") == "done"
+
+
+@pytest.mark.asyncio
+async def test_without_resume_the_checkpoint_starts_over(tmp_path: Path):
+    checkpoint = CrawlCheckpoint(tmp_path / "crawl.db")
+    await Crawler(TreeScraper(), checkpoint=checkpoint).collect()
+
+    again = TreeScraper()
+    assert len(await Crawler(again, checkpoint=checkpoint).collect()) == len(SITE)
+    assert len(again.fetched) == len(SITE)
+
+    idle = TreeScraper()
+    assert await Crawler(idle, checkpoint=checkpoint, resume=True).collect() == {}
+    assert idle.fetched == []
+
+
+@pytest.mark.asyncio
+async def test_confirm_mode_refetches_unconfirmed_pages_only(tmp_path: Path):
+    checkpoint = CrawlCheckpoint(tmp_path / "crawl.db")
+    crawler = Crawler(TreeScraper(), checkpoint=checkpoint, confirm=True)
+    async for page in crawler.crawl():
+        if page.target != "/s1":  # "/s1" was never written out
+            crawler.complete(page)
+    crawler.flush()
+    assert checkpoint.status("/s1") == "fetched"
+
+    again = TreeScraper()
+    resumed = Crawler(again, checkpoint=checkpoint, resume=True)
+    pages = [page async for page in resumed.crawl()]
+
+    assert again.fetched == ["/s1"]  # its links were already admitted
+    assert [(p.target, p.depth) for p in pages] == [("/s1", 1)]
+    assert checkpoint.status("/s1") == "done"
@@ -0,0 +1,152 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import time
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from open_llms_txt.scrapers.concurrency import (
+    AdaptiveLimiter,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+)
+from open_llms_txt.scrapers.web_scraper import WebScraper
+
+
+class Origin:
+    """
+    In-process origin for MockTransport: every request takes ``latency``
+    seconds; ``overload_above`` concurrent requests or more get a 429 with
+    ``Retry-After``; paths in ``broken`` always answer 500.
+    """
+
+    def __init__(self, latency=0.005, overload_above=None, retry_after="0"):
+        self.latency = latency
+        self.overload_above = overload_above
+        self.retry_after = retry_after
+        self.broken: set = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.statuses: Dict[int, int] = {}
+        self.times: List[float] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.times.append(time.monotonic())
+        try:
+            await asyncio.sleep(self.latency)
+            if request.url.path in self.broken:
+                status = 500
+            elif (
+                self.overload_above is not None and self.in_flight > self.overload_above
+            ):
+                status = 429
+            else:
+                status = 200
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            headers = {"Retry-After": self.retry_after} if status == 429 else {}
+            return httpx.Response(status, headers=headers, html="<h1>ok</h1>")
+        finally:
+            self.in_flight -= 1
+
+
+def _scraper(origin: Origin, **kwargs) -> WebScraper:
+    return WebScraper(
+        "https://example.com", transport=httpx.MockTransport(origin), **kwargs
+    )
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+
+
+def test_retry_delays_are_jittered_exponential_and_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    assert policy.delay(0, rng=lambda: 1.0) == 1
+    assert policy.delay(2, rng=lambda: 0.5) == 2
+    assert policy.delay(10, rng=lambda: 1.0) == 5
+    assert policy.delay(0, retry_after=60) == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrency_grows_while_latency_is_flat():
+    origin = Origin(latency=0.005)
+    limiter = AdaptiveLimiter(initial=1, max_limit=8)
+    scraper = _scraper(origin, limiter=limiter)
+
+    urls = [f"https://example.com/p{i}" for i in range(80)]
+    assert len(await scraper.fetch_all(urls)) == 80
+
+    assert limiter.limit(urls[0]) == 8
+    assert origin.max_in_flight > 4
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_overload_backs_off_and_retries_succeed():
+    origin = Origin(latency=0.005, overload_above=3, retry_after="0")
+    limiter = AdaptiveLimiter(initial=6, max_limit=6)
+    scraper = _scraper(
+        origin, limiter=limiter, retry=RetryPolicy(attempts=5, base_delay=0.01)
+    )
+
+    urls = [f"https://example.com/p{i}" for i in range(40)]
+    results = await scraper.fetch_all(urls)
+
+    assert len(results) == 40  # every 429 was retried until it went through
+    assert 1 <= origin.statuses[429] < 10  # the limit was halved, not hammered
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_the_host():
+    origin = Origin(latency=0, overload_above=0, retry_after="1")
+    limiter = AdaptiveLimiter(initial=1)
+    scraper = _scraper(origin, limiter=limiter, retry=RetryPolicy(attempts=1))
+
+    assert await scraper.fetch_content("https://example.com/a") == ""
+    origin.overload_above = None
+    started = time.monotonic()
+    assert await scraper.fetch_content("https://example.com/b") == "<h1>ok</h1>"
+    assert time.monotonic() - started >= 0.9
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_per_host_and_recovers():
+    now = [0.0]
+    origin = Origin(latency=0)
+    origin.broken.add("/down")
+    limiter = AdaptiveLimiter(
+        failure_threshold=3, reset_timeout=10, clock=lambda: now[0]
+    )
+    scraper = _scraper(origin, limiter=limiter)
+
+    for _ in range(3):
+        assert await scraper.fetch_content("https://example.com/down") == ""
+    assert limiter.is_open("https://example.com/")
+    assert origin.statuses[500] == 3
+
+    # Open: nothing is sent to this host; other hosts keep working
+    with pytest.raises(CircuitOpenError):
+        async with limiter.slot("https://example.com/up"):
+            pass
+    assert await scraper.fetch_content("https://other.org/up") == "<h1>ok</h1>"
+    assert origin.statuses[500] == 3
+
+    # After reset_timeout one probe goes through; its success closes the circuit
+    now[0] = 11
+    assert await scraper.fetch_content("https://example.com/up") == "<h1>ok</h1>"
+    assert not limiter.is_open("https://example.com/")
+    await scraper.close()
@@ -0,0 +1,168 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from open_llms_txt.scrapers.base_scraper import BaseScraper
+from open_llms_txt.scrapers.crawler import Crawler
+from open_llms_txt.scrapers.local_scraper import LocalScraper
+from open_llms_txt.scrapers.visited import BloomFilter
+from open_llms_txt.scrapers.web_scraper import WebScraper
+
+
+class SiteScraper(BaseScraper):
+    """In-memory site: ``{page: [linked pages]}``; fetches take a random-ish time."""
+
+    def __init__(self, links: Dict[str, List[str]]):
+        super().__init__("/")
+        self.links = links
+        self.fetched: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def root_target(self) -> str:
+        return "/"
+
+    async def fetch_content(self, path: str) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001 * (hash(path) % 5))
+        finally:
+            self.in_flight -= 1
+        self.fetched.append(path)
+        if path not in self.links:
+            return ""
+        return f"<h1>{path}</h1>"
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        return self.links[source]
+
+    async def collect_root_subpages(self) -> Dict[str, str]:
+        return {}
+
+
+SITE = {
+    "/": ["/a", "/b", "/missing"],
+    "/a": ["/", "/a/1", "/a/2"],
+    "/b": ["/a/1", "/b/1"],
+    "/a/1": ["/a/1/x"],
+    "/a/2": [],
+    "/b/1": ["/"],
+    "/a/1/x": [],
+}
+
+
+@pytest.mark.asyncio
+async def test_bfs_order_depths_and_no_refetch():
+    scraper = SiteScraper(SITE)
+
+    pages = [(p.target, p.depth) async for p in Crawler(scraper, workers=3).crawl()]
+
+    assert pages == [
+        ("/", 0),
+        ("/a", 1),
+        ("/b", 1),
+        ("/a/1", 2),
+        ("/a/2", 2),
+        ("/b/1", 2),
+        ("/a/1/x", 3),
+    ]
+    assert sorted(scraper.fetched) == sorted([*SITE, "/missing"])  # once each
+    assert scraper.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_max_depth_and_max_pages():
+    crawler = Crawler(SiteScraper(SITE), max_depth=1)
+    assert list(await crawler.collect()) == ["/", "/a", "/b"]
+
+    scraper = SiteScraper(SITE)
+    crawled = await Crawler(scraper, max_pages=4).collect()
+    assert list(crawled) == ["/", "/a", "/b"]  # "/missing" took the 4th slot
+    assert len(scraper.fetched) == 4
+
+
+@pytest.mark.asyncio
+async def test_bloom_filter_visited_set():
+    crawler = Crawler(SiteScraper(SITE), visited=BloomFilter(1000), batch_size=2)
+
+    crawled = await crawler.collect()
+
+    assert crawled["/a/1/x"] == "/a/1/x"
+    assert len(crawled) == 7
+
+
+@pytest.mark.asyncio
+async def test_recursive_local_crawl(tmp_path: Path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "index.html").write_text(
+        '<h1>Home</h1><a href="docs/intro.html">Intro</a>', encoding="utf-8"
+    )
+    (tmp_path / "docs" / "intro.html").write_text(
+        '<h1>Intro</h1><a href="api.html">API</a><a href="../index.html">Home</a>',
+        encoding="utf-8",
+    )
+    (tmp_path / "docs" / "api.html").write_text("<h1>API</h1>", encoding="utf-8")
+    scraper = LocalScraper(str(tmp_path / "index.html"))
+
+    crawled = await Crawler(scraper).collect()
+    await scraper.close()
+
+    assert list(crawled.values()) == ["Home", "Intro", "API"]
+
+
+@pytest.mark.asyncio
+async def test_web_crawl_fetches_each_content_once():
+    pages = {
+        "/": (
+            '<h1>Home</h1><a href="/docs">a</a><a href="/docs/">b</a>'
+            '<a href="/docs#intro">c</a><a href="/docs?utm_source=x">d</a>'
+            '<a href="/old">e</a><a href="/print">f</a><a href="mailto:x@y.z">g</a>'
+            '<a href="https://other.org/docs">h</a>'
+        ),
+        "/docs": '<h1>Docs</h1><a href="/DOCS-moved">i</a><a href="api">j</a>',
+        "/print": '<link rel="canonical" href="/docs/"><h1>Docs</h1>',
+        "/new": '<h1>New</h1><a href="/old#x">k</a><a href="guide">l</a>',
+        "/guide": "<h1>Guide</h1>",
+        "/api": "<h1>API</h1>",
+    }
+    requested: List[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path in ("/old", "/DOCS-moved"):
+            target = "/new" if request.url.path == "/old" else "/docs"
+            return httpx.Response(301, headers={"Location": target})
+        if request.url.path not in pages:
+            return httpx.Response(404)
+        return httpx.Response(200, html=pages[request.url.path])
+
+    scraper = WebScraper("https://example.com/", transport=httpx.MockTransport(handler))
+
+    crawled = await Crawler(scraper, workers=1).collect()
+    await scraper.close()
+
+    assert crawled == {
+        "https://example.com/": "Home",
+        "https://example.com/docs": "Docs",
+        "https://example.com/new": "New",
+        "https://example.com/api": "API",
+        "https://example.com/guide": "Guide",
+    }
+    # /print is only fetched to learn its canonical link; every other content
+    # is loaded once, whatever alias links to it
+    assert sorted(requested) == sorted(
+        ["/", "/docs", "/old", "/new", "/print", "/DOCS-moved", "/api", "/guide"]
+    )
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        Crawler(SiteScraper(SITE), max_pages=0)
@@ -0,0 +1,107 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+from typing import List
+
+import httpx
+import pytest
+
+from open_llms_txt.scrapers.http_cache import HttpCache
+from open_llms_txt.scrapers.web_scraper import WebScraper
+
+PAGES = {
+    "/": ('<h1>Home</h1><a href="/docs">Docs</a><a href="/old">Old</a>', '"v1"'),
+    "/docs": ("<h1>Docs</h1>", None),
+    "/new": ("<h1>New</h1>", '"n1"'),
+}
+LAST_MODIFIED = "Mon, 06 Oct 2025 10:00:00 GMT"
+
+
+class Site:
+    """/ has an ETag, /docs only Last-Modified, /old redirects to /new."""
+
+    def __init__(self):
+        self.log: List[tuple] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/old":
+            self.log.append((path, 301))
+            return httpx.Response(301, headers={"Location": "/new"})
+        text, etag = PAGES[path]
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if etag:
+            headers["ETag"] = etag
+        else:
+            headers["Last-Modified"] = LAST_MODIFIED
+        unchanged = (etag and request.headers.get("if-none-match") == etag) or (
+            not etag and request.headers.get("if-modified-since") == LAST_MODIFIED
+        )
+        status = 304 if unchanged else 200
+        self.log.append((path, status))
+        return httpx.Response(status, headers=headers, text=text)
+
+
+def _scraper(cache: HttpCache, transport: httpx.AsyncBaseTransport) -> WebScraper:
+    return WebScraper("https://example.com/", cache=cache, transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_recrawl_revalidates_with_conditional_requests(tmp_path: Path):
+    site = Site()
+    cache = HttpCache(tmp_path / "http.db")
+
+    first = _scraper(cache, httpx.MockTransport(site))
+    expected = {"https://example.com/docs": "Docs", "https://example.com/new": "New"}
+    assert await first.collect_root_subpages() == expected
+    await first.close()
+    assert all(status != 304 for _, status in site.log)
+
+    site.log.clear()
+    second = _scraper(cache, httpx.MockTransport(site))
+    assert await second.collect_root_subpages() == expected
+    await second.close()
+
+    assert sorted(site.log) == [
+        ("/", 304),
+        ("/docs", 304),
+        ("/new", 304),
+        ("/old", 301),
+    ]
+    stats = cache.stats()
+    assert stats["revalidated"] == 3
+    assert stats["entries"] == 4  # three pages and the redirect
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_offline_serves_pages_and_redirects_from_disk(tmp_path: Path):
+    online = _scraper(HttpCache(tmp_path / "http.db"), httpx.MockTransport(Site()))
+    await online.collect_root_subpages()
+    await online.close()
+
+    def no_network(request: httpx.Request) -> httpx.Response:
+        raise AssertionError(f"network used for {request.url}")
+
+    cache = HttpCache(tmp_path / "http.db", offline=True)
+    offline = _scraper(cache, httpx.MockTransport(no_network))
+    assert await offline.collect_root_subpages() == {
+        "https://example.com/docs": "Docs",
+        "https://example.com/new": "New",
+    }
+    assert await offline.fetch_content("https://example.com/missing") == ""
+    await offline.close()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 1)
+
+
+def test_no_store_responses_are_not_cached(tmp_path: Path):
+    cache = HttpCache(tmp_path / "http.db")
+    request = httpx.Request("GET", "https://example.com/private")
+    response = httpx.Response(
+        200, headers={"Cache-Control": "private, no-store"}, text="x", request=request
+    )
+    cache.store("https://example.com/private", response)
+    assert cache.get("https://example.com/private") is None
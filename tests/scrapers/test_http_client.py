@@ -0,0 +1,77 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import List
+
+import httpx
+import pytest
+
+from open_llms_txt.scrapers import http_client
+from open_llms_txt.scrapers.http_client import accept_encoding, build_client
+from open_llms_txt.scrapers.web_scraper import WebScraper
+
+
+def test_accept_encoding_lists_available_decoders(monkeypatch):
+    assert accept_encoding().endswith("gzip, deflate")
+
+    monkeypatch.setattr(http_client, "_installed", lambda *modules: True)
+    assert accept_encoding() == "zstd, br, gzip, deflate"
+
+
+def test_http2_without_h2_falls_back(monkeypatch, caplog):
+    monkeypatch.setattr(http_client, "_installed", lambda *modules: "h2" not in modules)
+    with caplog.at_level("WARNING"):
+        client = build_client(http2=True)
+    assert any("HTTP/2" in rec.getMessage() for rec in caplog.records)
+    assert client.headers["Accept-Encoding"] == accept_encoding()
+
+
+@pytest.mark.asyncio
+async def test_shared_client_serves_many_scrapers_and_stays_open():
+    seen: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path == "/moved":
+            return httpx.Response(302, headers={"Location": "/page"})
+        return httpx.Response(200, html=f"<h1>{request.url.host}</h1>")
+
+    shared = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        headers={"Accept-Encoding": accept_encoding()},
+        follow_redirects=True,
+    )
+    a = WebScraper("https://a.example", client=shared)
+    b = WebScraper("https://b.example", client=shared)
+
+    assert await a.fetch_content("https://a.example/moved") == "<h1>a.example</h1>"
+    assert await b.fetch_content("https://b.example/") == "<h1>b.example</h1>"
+    await a.close()
+    await b.close()
+
+    assert not shared.is_closed
+    # The scraper follows the redirect itself, even on a redirecting client
+    assert [r.url.path for r in seen] == ["/moved", "/page", "/"]
+    assert a.resolve("https://a.example/moved") == "https://a.example/page"
+    assert all("gzip" in r.headers["accept-encoding"] for r in seen)
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_transport_is_wrapped_in_an_owned_client():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, html="<h1>ok</h1>")
+
+    scraper = WebScraper("https://example.com", transport=httpx.MockTransport(handler))
+    assert await scraper.fetch_content("https://example.com/") == "<h1>ok</h1>"
+    assert scraper.client.headers["User-Agent"] == http_client.USER_AGENT
+    await scraper.close()
+    assert scraper.client.is_closed
+
+    async with httpx.AsyncClient() as shared:
+        with pytest.raises(ValueError):
+            WebScraper(
+                "https://example.com",
+                client=shared,
+                transport=httpx.MockTransport(handler),
+            )
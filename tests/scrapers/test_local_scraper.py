@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from pathlib import Path
+import threading
 
 import pytest
 
@@ -122,3 +123,32 @@ async def test_collect_root_subpages_empty_root_returns_empty_map(tmp_path: Path
     scraper = LocalScraper(str(root))
     out = await scraper.collect_root_subpages()
     assert out == {}
+
+
+@pytest.mark.asyncio
+async def test_collect_root_subpages_reads_in_thread_pool_in_order(
+    tmp_path: Path, monkeypatch
+):
+    root = tmp_path / "index.html"
+    names = [f"page{i}.html" for i in range(12)]
+    links = "".join(f'<a href="{name}">{name}</a>' for name in names)
+    root.write_text(f"<html><body><h1>Home</h1>{links}</body></html>", "utf-8")
+    for i, name in enumerate(names):
+        (tmp_path / name).write_text(f"<h1>Page {i}</h1>", encoding="utf-8")
+
+    threads = set()
+    read_text = Path.read_text
+
+    def tracking_read_text(self, *args, **kwargs):
+        threads.add(threading.current_thread().name)
+        return read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", tracking_read_text)
+    scraper = LocalScraper(str(root), max_workers=4)
+    content_map = await scraper.collect_root_subpages()
+    await scraper.close()
+
+    expected = [str((tmp_path / n).resolve()) for n in names] + [str(root.resolve())]
+    assert list(content_map) == expected
+    assert content_map[expected[5]] == "Page 5"
+    assert threads and all(name.startswith("llms-read") for name in threads)
@@ -0,0 +1,125 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import time
+from typing import Dict, List
+
+import pytest
+
+from open_llms_txt.scrapers import pipeline
+from open_llms_txt.scrapers.base_scraper import BaseScraper
+from open_llms_txt.scrapers.crawler import Crawler
+from open_llms_txt.scrapers.local_scraper import LocalScraper
+from open_llms_txt.scrapers.pipeline import Pipeline, output_path
+
+ROOT = "https://example.com"
+
+
+class WideSite(BaseScraper):
+    """``/`` links to ``pages`` leaf pages; tracks fetches ahead of renders."""
+
+    def __init__(self, pages: int):
+        super().__init__(ROOT)
+        self.pages = pages
+        self.fetches = 0
+        self.max_lag = 0
+        self.pipe: Pipeline
+
+    async def fetch_content(self, path: str) -> str:
+        await asyncio.sleep(0)
+        self.fetches += 1
+        self.max_lag = max(self.max_lag, self.fetches - self.pipe.rendered)
+        return f"<h1>{path}</h1>"
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        if source != ROOT:
+            return []
+        return [f"{ROOT}/p{i}" for i in range(self.pages)]
+
+    async def collect_root_subpages(self) -> Dict[str, str]:
+        return {}
+
+
+def test_output_path():
+    assert output_path(f"{ROOT}", ROOT) == "index.html.md"
+    assert output_path(f"{ROOT}/docs/intro/", ROOT) == "docs/intro.html.md"
+    assert output_path(f"{ROOT}/a.html", ROOT) == "a.html.md"
+    assert output_path(f"{ROOT}/s?q=1", ROOT).startswith("s-")
+    assert output_path("/site/docs/x.html", "/site/index.html") == "docs/x.html.md"
+    with pytest.raises(ValueError):
+        output_path("/etc/passwd", "/site/index.html")
+
+
+@pytest.mark.asyncio
+async def test_local_site_through_worker_processes(tmp_path: Path):
+    site = tmp_path / "site"
+    (site / "docs").mkdir(parents=True)
+    (site / "index.html").write_text(
+        '<h1>Home</h1><a href="docs/intro.html">Intro</a>', encoding="utf-8"
+    )
+    (site / "docs" / "intro.html").write_text(
+        "<h1>Intro</h1><p>Hello</p>", encoding="utf-8"
+    )
+    scraper = LocalScraper(str(site / "index.html"))
+
+    report = await Pipeline(Crawler(scraper), tmp_path / "out", processes=2).run()
+    await scraper.close()
+
+    assert sorted(report.written) == ["docs/intro.html.md", "index.html.md"]
+    assert not report.failed
+    assert "Intro" in (tmp_path / "out" / "docs" / "intro.html.md").read_text()
+
+
+@pytest.mark.asyncio
+async def test_backpressure_bounds_pages_in_flight(tmp_path: Path, monkeypatch):
+    def slow_render(html: str, root_url: str, source_url: str) -> str:
+        time.sleep(0.002)
+        return html
+
+    monkeypatch.setattr(pipeline, "_render", slow_render)
+    scraper = WideSite(60)
+    with ThreadPoolExecutor(1) as pool:
+        pipe = Pipeline(
+            Crawler(scraper, batch_size=4),
+            tmp_path,
+            processes=1,
+            queue_size=2,
+            executor=pool,
+        )
+        scraper.pipe = pipe
+        report = await pipe.run()
+
+    assert len(report.written) == 61
+    # One crawler batch + both queues + the page being rendered, not all 61
+    assert scraper.max_lag <= 4 + 2 + 2 + 1
+    assert (tmp_path / "p7.html.md").read_text() == f"<h1>{ROOT}/p7</h1>"
+
+
+class AliasedSite(WideSite):
+    """``/`` links to ``/docs`` and ``/docs.html``, which share an output file."""
+
+    def extract_links(self, source: str, html: str) -> List[str]:
+        return [f"{ROOT}/docs", f"{ROOT}/docs.html"] if source == ROOT else []
+
+
+@pytest.mark.asyncio
+async def test_pages_sharing_an_output_file_fail_instead_of_overwriting(
+    tmp_path: Path,
+):
+    scraper = AliasedSite(0)
+    with ThreadPoolExecutor(
+        1,
+        initializer=pipeline.worker_initializer,
+        initargs=(None, "scraper_template.jinja"),
+    ) as pool:
+        pipe = Pipeline(Crawler(scraper), tmp_path, executor=pool)
+        scraper.pipe = pipe
+        report = await pipe.run()
+
+    assert sorted(report.written) == ["docs.html.md", "index.html.md"]
+    [(loser, reason)] = report.failed.items()
+    winner = ({f"{ROOT}/docs", f"{ROOT}/docs.html"} - {loser}).pop()
+    assert reason == f"docs.html.md is already {winner}"
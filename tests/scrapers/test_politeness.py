@@ -0,0 +1,141 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+import pytest
+
+from open_llms_txt.scrapers.crawler import Crawler
+from open_llms_txt.scrapers.politeness import (
+    PoliteScheduler,
+    RobotsRules,
+    TokenBucket,
+)
+from open_llms_txt.scrapers.web_scraper import WebScraper
+
+ROBOTS = {
+    "a.example": "User-agent: *\nDisallow: /private\nRequest-rate: 10/1\n",
+    "b.example": "User-agent: other-bot\nDisallow: /\n",
+}
+
+
+class Sites:
+    """Every host serves ``ROBOTS`` and links to /private and /p0../p3."""
+
+    def __init__(self, robots: Dict[str, Tuple[int, str]]):
+        self.robots = robots
+        self.requests: List[Tuple[str, str, float]] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host, path = request.url.host, request.url.path
+        self.requests.append((host, path, time.monotonic()))
+        if path == "/robots.txt":
+            status, text = self.robots.get(host, (404, ""))
+            return httpx.Response(status, text=text)
+        links = "".join(f'<a href="/p{i}">p{i}</a>' for i in range(4))
+        return httpx.Response(
+            200, html=f'<h1>{host}{path}</h1><a href="/private">x</a>{links}'
+        )
+
+    def paths(self, host: str) -> List[str]:
+        return [path for h, path, _ in self.requests if h == host]
+
+
+def _scraper(sites: Sites, root: str, scheduler: PoliteScheduler) -> WebScraper:
+    return WebScraper(root, transport=httpx.MockTransport(sites), scheduler=scheduler)
+
+
+def test_token_bucket_spaces_reservations():
+    now = [0.0]
+    bucket = TokenBucket(rate=4, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.25, 0.5]
+    now[0] = 10
+    assert bucket.reserve() == 0  # refilled, capped at the burst
+
+
+@pytest.mark.asyncio
+async def test_disallowed_urls_never_enter_the_frontier():
+    sites = Sites({"a.example": (200, ROBOTS["a.example"])})
+    scheduler = PoliteScheduler(robots_ttl=60)
+    scraper = _scraper(sites, "https://a.example", scheduler)
+
+    crawled = await Crawler(scraper, max_depth=2).collect()
+
+    assert "https://a.example/private" not in crawled
+    assert len(crawled) == 5
+    assert "/private" not in sites.paths("a.example")
+    assert sites.paths("a.example").count("/robots.txt") == 1
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_crawl_delay_is_per_host():
+    sites = Sites({host: (200, text) for host, text in ROBOTS.items()})
+    scheduler = PoliteScheduler()
+    a = _scraper(sites, "https://a.example", scheduler)
+    b = _scraper(sites, "https://b.example", scheduler)
+
+    started = time.monotonic()
+    await asyncio.gather(
+        a.fetch_all([f"https://a.example/p{i}" for i in range(4)]),
+        b.fetch_all([f"https://b.example/p{i}" for i in range(4)]),
+    )
+
+    a_times = [
+        t for h, p, t in sites.requests if h == "a.example" and p != "/robots.txt"
+    ]
+    b_times = [
+        t for h, p, t in sites.requests if h == "b.example" and p != "/robots.txt"
+    ]
+    # a.example asks for 10 requests/s; b.example sets no delay
+    assert all(later - earlier >= 0.09 for earlier, later in zip(a_times, a_times[1:]))
+    assert max(b_times) - started < 0.09
+    await a.close()
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_robots_errors_follow_rfc_9309():
+    # other hosts answer 404
+    sites = Sites({"down.example": (503, ""), "denied.example": (403, "")})
+    scheduler = PoliteScheduler()
+    down = _scraper(sites, "https://down.example", scheduler)
+    denied = _scraper(sites, "https://denied.example", scheduler)
+    missing = _scraper(sites, "https://up.example", scheduler)
+
+    assert await down.fetch_content("https://down.example/p0") == ""
+    assert await denied.fetch_content("https://denied.example/p0") == ""
+    assert await missing.fetch_content("https://up.example/p0") != ""
+    assert sites.paths("down.example") == ["/robots.txt"]
+    assert sites.paths("denied.example") == ["/robots.txt"]
+
+    fetch = missing._fetch_any
+    rules = await scheduler.robots(fetch, "https://denied.example/p0")
+    assert rules.disallow_all and rules.url == "https://denied.example/robots.txt"
+    assert (await scheduler.robots(fetch, "https://up.example/")).allow_all
+    for scraper in (down, denied, missing):
+        await scraper.close()
+
+
+def test_delays_are_parsed_per_group_including_fractions():
+    rules = RobotsRules(
+        "https://example.com/robots.txt",
+        "User-agent: *\n"
+        "Crawl-delay: 0.5\n"
+        "\n"
+        "User-agent: open-llms-txt\n"
+        "User-agent: other-bot\n"
+        "Request-rate: 4/1\n"
+        "Disallow: /private\n"
+        "\n"
+        "User-agent: slow-bot\n"
+        "Crawl-delay: soon\n",
+    )
+    assert rules.delay("open-llms-txt/1.0") == 0.25
+    assert rules.delay("unknown-bot") == 0.5
+    assert rules.delay("slow-bot") is None  # its own group wins, even without one
+    assert not rules.can_fetch("open-llms-txt", "https://example.com/private")
+    assert PoliteScheduler(max_delay=0.1)._delay(rules) == 0.1
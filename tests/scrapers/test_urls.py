@@ -0,0 +1,51 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from open_llms_txt.scrapers.urls import UrlCanonicalizer, canonicalize
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/docs",
+        "https://example.com/docs/",
+        "https://example.com/docs#intro",
+        "https://example.com/docs?utm_source=x&utm_medium=y",
+        "https://EXAMPLE.com:443/docs/?fbclid=1#top",
+        "HTTPS://example.com/docs",
+    ],
+)
+def test_canonicalize_aliases_of_one_page(url):
+    assert canonicalize(url) == "https://example.com/docs"
+
+
+def test_canonicalize_query_and_root():
+    assert canonicalize("https://example.com") == "https://example.com/"
+    assert canonicalize("https://example.com/?#x") == "https://example.com/"
+    assert (
+        canonicalize("https://example.com/s?b=2&a=1&utm_campaign=z&a=0")
+        == "https://example.com/s?a=0&a=1&b=2"
+    )
+    assert canonicalize("http://example.com:8080/x") == "http://example.com:8080/x"
+    # Path case is significant
+    assert canonicalize("https://example.com/Docs") == "https://example.com/Docs"
+
+
+def test_canonicalize_custom_tracking_params():
+    url = "https://example.com/p?ref=home&utm_source=x&page=2"
+    assert canonicalize(url, ["ref"]) == "https://example.com/p?page=2&utm_source=x"
+    assert canonicalize(url, ["ref", "utm_*"]) == "https://example.com/p?page=2"
+
+
+def test_aliases_follow_chains_and_ignore_cycles():
+    urls = UrlCanonicalizer()
+    assert urls.record_alias("https://example.com/a", "https://example.com/b/")
+    assert urls.record_alias("https://example.com/b", "https://example.com/c")
+    assert urls.resolve("https://example.com/a#x") == "https://example.com/c"
+
+    # c -> a would close a cycle: c resolves to itself and nothing is recorded
+    assert urls.record_alias("https://example.com/c", "https://example.com/a") is None
+    assert urls.record_alias("https://example.com/x/", "https://example.com/x") is None
+    assert urls.resolve("https://example.com/c") == "https://example.com/c"
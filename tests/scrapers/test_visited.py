@@ -0,0 +1,42 @@
+# Copyright (c) 2025 Ricardo Espantaleón Pérez
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from open_llms_txt.scrapers.visited import BloomFilter, FingerprintSet, fingerprint
+
+
+def test_fingerprint_is_stable_and_non_zero():
+    assert fingerprint("https://example.com/") == fingerprint("https://example.com/")
+    assert fingerprint("a") != fingerprint("b")
+    assert 0 < fingerprint("") < 2**64
+
+
+def test_fingerprint_set_grows_and_dedupes():
+    visited = FingerprintSet(capacity=4)
+    urls = [f"https://example.com/p{i}" for i in range(5000)]
+
+    assert all(visited.add(url) for url in urls)
+    assert not any(visited.add(url) for url in urls[::7])
+    assert len(visited) == 5000
+    assert urls[1234] in visited
+    assert "https://example.com/other" not in visited
+    assert visited.nbytes <= 4 * 8 * 5000  # load factor kept in (0.25, 0.5]
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"/seen/{i}")
+
+    assert all(f"/seen/{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"/unseen/{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+    assert not bloom.add("/seen/42")
+
+
+def test_bloom_filter_validates_parameters():
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+    with pytest.raises(ValueError):
+        BloomFilter(10, error_rate=1.5)
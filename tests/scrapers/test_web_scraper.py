@@ -1,57 +1,56 @@
 # Copyright (c) 2025 Ricardo Espantaleón Pérez
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import gzip
 from typing import Dict, Optional
 
+import httpx
 import pytest
 
 from open_llms_txt.scrapers.web_scraper import WebScraper
 
 
-class DummyResponse:
-    def __init__(self, text: str, status_code: int = 200):
-        self.text = text
-        self.status_code = status_code
-
-    def raise_for_status(self):
-        if self.status_code >= 400:
-            raise RuntimeError(f"HTTP {self.status_code}")
-
-
-class DummyAsyncClient:
+class Routes:
     """
-    Minimal stand-in for httpx.AsyncClient used in tests.
-    Provide a mapping of url -> (text, status_code) to control responses.
+    ``httpx.MockTransport`` handler serving ``routes`` (url -> HTML) after
+    ``delays[url]`` seconds, 404 for anything else; tracks concurrency.
     """
 
-    def __init__(self, routes: Optional[Dict[str, DummyResponse]] = None):
-        self._routes = routes or {}
-        self._closed = False
-
-    async def get(self, url: str):
-        if url not in self._routes:
-            raise RuntimeError(f"Unknown URL {url}")
-        resp = self._routes[url]
-        if isinstance(resp, str):
-            resp = DummyResponse(resp, 200)
-        resp.raise_for_status()
-        return resp
-
-    async def aclose(self):
-        self._closed = True
-
-    @property
-    def is_closed(self) -> bool:
-        return self._closed
+    def __init__(
+        self,
+        routes: Dict[str, str],
+        delays: Optional[Dict[str, float]] = None,
+        default_delay: float = 0,
+    ):
+        self.routes = routes
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(url, self.default_delay))
+        finally:
+            self.in_flight -= 1
+        if url not in self.routes:
+            return httpx.Response(404)
+        return httpx.Response(200, html=self.routes[url])
+
+
+def _scraper(root: str, routes: Routes, **kwargs) -> WebScraper:
+    return WebScraper(root, transport=httpx.MockTransport(routes), **kwargs)
 
 
 @pytest.mark.asyncio
 async def test_fetch_content_success():
     root = "https://example.com/"
-    scraper = WebScraper(root)
-
     html_ok = "<html><body><h1>OK</h1></body></html>"
-    scraper.client = DummyAsyncClient(routes={f"{root}page": html_ok})
+    scraper = _scraper(root, Routes({f"{root}page": html_ok}))
 
     out = await scraper.fetch_content(f"{root}page")
     assert "<h1>OK</h1>" in out
@@ -62,9 +61,7 @@ async def test_fetch_content_success():
 @pytest.mark.asyncio
 async def test_fetch_content_failure_logs_and_returns_empty(caplog):
     root = "https://example.com/"
-    scraper = WebScraper(root)
-
-    scraper.client = DummyAsyncClient(routes={})
+    scraper = _scraper(root, Routes({}))
 
     with caplog.at_level("WARNING"):
         out = await scraper.fetch_content(f"{root}missing")
@@ -84,7 +81,6 @@ async def test_collect_root_subpages_same_domain_only():
       - #top / ["not-a-string"]       -> ignored for expectations
     """
     root = "https://example.com/"
-    scraper = WebScraper(root)
 
     root_html = """
     <html><body>
@@ -118,7 +114,7 @@ async def test_collect_root_subpages_same_domain_only():
         # external_url intentionally omitted (shouldn't be requested at all)
     }
 
-    scraper.client = DummyAsyncClient(routes=routes)
+    scraper = _scraper(root, Routes(routes))
 
     content_map = await scraper.collect_root_subpages()
 
@@ -136,9 +132,7 @@ async def test_collect_root_subpages_same_domain_only():
 @pytest.mark.asyncio
 async def test_collect_root_subpages_empty_root_returns_empty_map():
     root = "https://example.com/"
-    scraper = WebScraper(root)
-
-    scraper.client = DummyAsyncClient(routes={root: ""})  # empty HTML
+    scraper = _scraper(root, Routes({root: ""}))  # empty HTML
     out = await scraper.collect_root_subpages()
     assert out == {}
 
@@ -148,9 +142,132 @@ async def test_collect_root_subpages_empty_root_returns_empty_map():
 @pytest.mark.asyncio
 async def test_close_closes_httpx_client():
     root = "https://example.com/"
-    scraper = WebScraper(root)
-    scraper.client = DummyAsyncClient(routes={})
+    scraper = _scraper(root, Routes({}))
     assert scraper.client.is_closed is False
 
     await scraper.close()
     assert scraper.client.is_closed is True
+
+
+def _site(n: int):
+    root = "https://example.com"
+    links = "".join(f'<a href="/p{i}">Page {i}</a>' for i in range(n))
+    routes = {root: f"<html><body>{links}</body></html>"}
+    for i in range(n):
+        routes[f"{root}/p{i}"] = f"<html><body><h1>Title {i}</h1></body></html>"
+    return root, routes
+
+
+@pytest.mark.asyncio
+async def test_subpages_are_fetched_concurrently_within_limits_in_order():
+    root, routes = _site(20)
+    origin = Routes(
+        routes,
+        delays={f"{root}/p0": 0.05},  # the first page finishes last
+        default_delay=0.01,
+    )
+    scraper = _scraper(root, origin, max_concurrency=8, per_host_limit=5)
+
+    content_map = await scraper.collect_root_subpages()
+
+    assert list(content_map) == [f"{root}/p{i}" for i in range(20)]
+    assert content_map[f"{root}/p3"] == "Title 3"
+    # Concurrent, but capped per host (below the global limit)
+    assert 1 < origin.max_in_flight <= 5
+
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_global_limit_applies_across_hosts():
+    urls = [f"https://{host}.com/{i}" for host in "abc" for i in range(4)]
+    origin = Routes({url: "<html></html>" for url in urls}, default_delay=0.01)
+    scraper = _scraper("https://a.com", origin, max_concurrency=3, per_host_limit=3)
+
+    results = await scraper.fetch_all(urls)
+
+    assert list(results) == urls
+    assert origin.max_in_flight == 3
+
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_request_and_total_timeouts_drop_slow_pages(caplog):
+    root, routes = _site(3)
+    origin = Routes(routes, delays={f"{root}/p1": 1})
+    scraper = _scraper(root, origin, request_timeout=0.05)
+
+    with caplog.at_level("WARNING"):
+        content_map = await scraper.collect_root_subpages()
+    assert list(content_map) == [f"{root}/p0", f"{root}/p2"]
+    assert any("TimeoutError" in rec.getMessage() for rec in caplog.records)
+
+    await scraper.close()
+
+    origin = Routes(routes, delays={f"{root}/p2": 1})
+    scraper = _scraper(root, origin, request_timeout=None, total_timeout=0.1)
+    content_map = await scraper.collect_root_subpages()
+    assert list(content_map) == [f"{root}/p0", f"{root}/p1"]
+
+    await scraper.close()
+
+
+def test_limits_must_be_positive():
+    with pytest.raises(ValueError):
+        WebScraper("https://example.com", per_host_limit=0)
+
+
+class StreamingOrigin:
+    """Serves bodies as 1 KiB chunks and counts how many were pulled."""
+
+    def __init__(self):
+        self.pulled = 0
+
+    def body(self, chunks: int):
+        async def stream():
+            for _ in range(chunks):
+                self.pulled += 1
+                yield b"x" * 1024
+
+        return stream()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/manual.pdf":
+            headers = {"Content-Type": "application/pdf"}
+            return httpx.Response(200, headers=headers, content=self.body(100))
+        if path == "/video":
+            headers = {"Content-Type": "text/html", "Content-Length": "500000000"}
+            return httpx.Response(200, headers=headers, content=self.body(100))
+        if path == "/endless":
+            headers = {"Content-Type": "text/html"}  # chunked, no length
+            return httpx.Response(200, headers=headers, content=self.body(100))
+        html = b"<h1>Compressed</h1>"
+        headers = {"Content-Type": "text/html", "Content-Encoding": "gzip"}
+        return httpx.Response(200, headers=headers, content=gzip.compress(html))
+
+
+@pytest.mark.asyncio
+async def test_non_html_and_oversized_bodies_are_abandoned_early():
+    origin = StreamingOrigin()
+    scraper = WebScraper(
+        "https://example.com",
+        transport=httpx.MockTransport(origin),
+        max_body_size=8 * 1024,
+    )
+    root = "https://example.com"
+
+    assert await scraper.fetch_content(f"{root}/manual.pdf") == ""
+    assert await scraper.fetch_content(f"{root}/video") == ""
+    assert origin.pulled == 0  # rejected on headers alone
+    assert await scraper.fetch_content(f"{root}/endless") == ""
+    assert origin.pulled == 9  # stopped right after passing 8 KiB
+    assert await scraper.fetch_content(f"{root}/page") == "<h1>Compressed</h1>"
+
+    assert scraper.skipped == {
+        f"{root}/manual.pdf": "content-type application/pdf",
+        f"{root}/video": "content-length 500000000",
+        f"{root}/endless": "body over 8192 bytes",
+    }
+    await scraper.close()